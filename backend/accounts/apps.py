@@ -3,3 +3,12 @@ from django.apps import AppConfig
 
 class AccountsConfig(AppConfig):
     name = 'accounts'
+
+    def ready(self):
+        from nextshopsphere.uploads import UploadTarget, register_upload_target
+        from .models import User
+
+        register_upload_target(UploadTarget(
+            User, 'avatar', 'avatars',
+            status_field='avatar_status', error_field='avatar_error', path_field='avatar_upload_path',
+        ))
@@ -1,12 +1,27 @@
+# accounts/google_auth.py
+"""
+Google sign-in.
+
+google_auth is a plain async view: under the ASGI entry point the call to
+Google's tokeninfo endpoint is awaited instead of holding a worker thread,
+and user lookups go through the async ORM. (Under WSGI Django runs it in
+its own event loop per request, with the same behaviour.)
+"""
+
+import json
+import logging
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from rest_framework import status
-from django.conf import settings
-from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken
-import requests
-import logging
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -21,9 +36,32 @@ def get_tokens_for_user(user):
     }
 
 
-@api_view(['POST'])
-@permission_classes([AllowAny])
-def google_auth(request):
+def error(message, status=400):
+    return JsonResponse({'error': message}, status=status)
+
+
+async def verify_google_token(credential):
+    """The token's claims from Google's tokeninfo endpoint, or None if it isn't valid"""
+    async with httpx.AsyncClient(timeout=settings.GOOGLE_TOKENINFO_TIMEOUT) as client:
+        response = await client.get(settings.GOOGLE_TOKENINFO_URL, params={'id_token': credential})
+    if response.status_code != 200:
+        return None
+    return response.json()
+
+
+async def unique_username(email):
+    base_username = username = email.split('@')[0]
+    counter = 1
+    while await User.objects.filter(username=username).aexists():
+        username = f"{base_username}{counter}"
+        counter += 1
+    return username
+
+
+# CSRF doesn't apply: the request carries a Google credential, not a session
+@csrf_exempt
+@require_POST
+async def google_auth(request):
     """
     Authenticate user with Google OAuth token.
 
@@ -31,106 +69,71 @@ def google_auth(request):
     Returns: JWT tokens + user data
     """
     try:
-        credential = request.data.get('credential')
+        try:
+            credential = json.loads(request.body or b'{}').get('credential')
+        except (ValueError, AttributeError):
+            credential = None
 
         if not credential:
-            return Response(
-                {'error': 'Google credential is required'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # Verify the Google token using Google's API
-        google_url = f"https://oauth2.googleapis.com/tokeninfo?id_token={credential}"
+            return error('Google credential is required')
 
         try:
-            google_response = requests.get(google_url)
-            if google_response.status_code != 200:
-                return Response(
-                    {'error': 'Invalid Google token'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            idinfo = google_response.json()
+            idinfo = await verify_google_token(credential)
         except Exception as e:
             logger.error(f"Google token verification failed: {e}")
-            return Response(
-                {'error': 'Failed to verify Google token'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            return error('Failed to verify Google token')
+        if idinfo is None:
+            return error('Invalid Google token')
 
         # Verify the token is for our app
         if idinfo.get('aud') != settings.GOOGLE_OAUTH_CLIENT_ID:
-            return Response(
-                {'error': 'Invalid token audience'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            return error('Invalid token audience')
 
         # Extract user info from Google token
         email = idinfo.get('email')
         first_name = idinfo.get('given_name', '')
         last_name = idinfo.get('family_name', '')
-        picture = idinfo.get('picture', '')
 
         if not email:
-            return Response(
-                {'error': 'Email not provided by Google'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            return error('Email not provided by Google')
 
-        # Check if user exists
-        user = User.objects.filter(email=email).first()
+        user = await User.objects.filter(email=email).afirst()
 
         if user:
             # Existing user - log them in
             is_new_user = False
             logger.info(f"Google login for existing user: {email}")
         else:
-            # New user - create account
-            username = email.split('@')[0]
-
-            # Ensure unique username
-            base_username = username
-            counter = 1
-            while User.objects.filter(username=username).exists():
-                username = f"{base_username}{counter}"
-                counter += 1
-
-            user = User.objects.create_user(
+            user = await sync_to_async(User.objects.create_user)(
                 email=email,
-                username=username,
+                username=await unique_username(email),
                 first_name=first_name,
                 last_name=last_name,
                 password=None,  # No password for OAuth users
             )
-
             is_new_user = True
             logger.info(f"Created new user via Google: {email}")
 
-        # Generate JWT tokens
-        tokens = get_tokens_for_user(user)
-
-        # Prepare user data
-        user_data = {
-            'id': user.id,
-            'email': user.email,
-            'username': user.username,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-        }
+        # Writes an OutstandingToken row (token blacklist app)
+        tokens = await sync_to_async(get_tokens_for_user)(user)
 
-        return Response({
+        return JsonResponse({
             'success': True,
             'message': 'Welcome to NextShopSphere!' if is_new_user else 'Welcome back!',
             'is_new_user': is_new_user,
-            'user': user_data,
+            'user': {
+                'id': user.id,
+                'email': user.email,
+                'username': user.username,
+                'first_name': user.first_name,
+                'last_name': user.last_name,
+            },
             'tokens': tokens,
         })
 
     except Exception as e:
         logger.error(f"Google auth error: {str(e)}")
-        return Response(
-            {'error': 'Authentication failed. Please try again.'},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
+        return error('Authentication failed. Please try again.', status=500)
 
 
 @api_view(['GET'])
@@ -0,0 +1,38 @@
+# accounts/management/commands/ensure_superuser.py
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the superuser from DJANGO_SUPERUSER_EMAIL / _USERNAME / _PASSWORD, "
+        "or reset that user's password and superuser/staff flags if the email exists."
+    )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+
+        # ---------------- Superuser credentials ----------------
+        email = os.environ.get('DJANGO_SUPERUSER_EMAIL', 'claraberi63@gmail.com')
+        username = os.environ.get('DJANGO_SUPERUSER_USERNAME', 'clara')
+        password = os.environ.get('DJANGO_SUPERUSER_PASSWORD', 'cla19980')
+
+        try:
+            # Check if a user with this email already exists
+            user = User.objects.get(email=email)
+
+            # Update password and superuser/staff privileges
+            user.set_password(password)
+            user.is_superuser = True
+            user.is_staff = True
+            user.save()
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ Existing user '{user.username}' found. Password reset and superuser privileges granted."
+            ))
+
+        except User.DoesNotExist:
+            # Create a new superuser
+            user = User.objects.create_superuser(username=username, email=email, password=password)
+            self.stdout.write(self.style.SUCCESS(f"✅ Superuser '{user.username}' created successfully!"))
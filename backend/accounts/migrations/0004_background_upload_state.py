@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_alter_user_avatar'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='avatar_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='avatar_status',
+            field=models.CharField(blank=True, choices=[('', 'None'), ('pending', 'Pending'), ('uploading', 'Uploading'), ('failed', 'Failed')], default='', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='avatar_upload_path',
+            field=models.CharField(blank=True, help_text='Spooled file awaiting upload', max_length=500),
+        ),
+    ]
@@ -2,6 +2,8 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 from cloudinary.models import CloudinaryField  # Add this import
 
+from nextshopsphere.uploads import UPLOAD_STATUS_CHOICES
+
 
 class User(AbstractUser):
     """Custom User model for NextShopSphere"""
@@ -39,6 +41,10 @@ class User(AbstractUser):
         null=True,
         folder='avatars',  # Organizes files in Cloudinary
     )
+    # Background avatar upload (nextshopsphere/uploads.py)
+    avatar_status = models.CharField(max_length=20, choices=UPLOAD_STATUS_CHOICES, blank=True, default='')
+    avatar_error = models.TextField(blank=True)
+    avatar_upload_path = models.CharField(max_length=500, blank=True, help_text="Spooled file awaiting upload")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
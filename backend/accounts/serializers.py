@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from urllib.parse import unquote
+from nextshopsphere.uploads import UploadRejected, upload_status, validate_image
 import re
 
 User = get_user_model()
@@ -59,12 +60,15 @@ class UserSerializer(serializers.ModelSerializer):
     """Serializer for user details and profile updates"""
 
     avatar_url = serializers.SerializerMethodField()
+    avatar_status = serializers.SerializerMethodField()
+    avatar_error = serializers.SerializerMethodField()
 
     class Meta:
         model = User
         fields = [
             'id', 'email', 'username', 'first_name', 'last_name',
             'phone', 'address', 'city', 'country', 'avatar', 'avatar_url',
+            'avatar_status', 'avatar_error',
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'email', 'username', 'created_at', 'updated_at', 'avatar_url']
@@ -73,6 +77,13 @@ class UserSerializer(serializers.ModelSerializer):
         """Return full URL for avatar (Cloudinary compatible)"""
         return get_cloudinary_url(obj.avatar)
 
+    def get_avatar_status(self, obj):
+        """'processing' while a new avatar uploads, 'failed' if it couldn't be stored, else None"""
+        return upload_status(obj.avatar_status)[0]
+
+    def get_avatar_error(self, obj):
+        return upload_status(obj.avatar_status)[1]
+
     def update(self, instance, validated_data):
         """Update user profile fields"""
         instance.first_name = validated_data.get('first_name', instance.first_name)
@@ -82,11 +93,15 @@ class UserSerializer(serializers.ModelSerializer):
         instance.city = validated_data.get('city', instance.city)
         instance.country = validated_data.get('country', instance.country)
 
+        fields = ['first_name', 'last_name', 'phone', 'address', 'city', 'country', 'updated_at']
+
         # Handle avatar if provided
         if 'avatar' in validated_data:
             instance.avatar = validated_data.get('avatar')
+            fields.append('avatar')
 
-        instance.save()
+        # Only these columns: the worker may be writing the avatar upload state meanwhile
+        instance.save(update_fields=fields)
         return instance
 
 
@@ -100,16 +115,11 @@ class AvatarUploadSerializer(serializers.ModelSerializer):
     def validate_avatar(self, value):
         """Validate the uploaded avatar"""
         if value:
-            # Check file size (max 5MB)
-            if value.size > 5 * 1024 * 1024:
-                raise serializers.ValidationError("Image size must be less than 5MB")
-
-            # Check file type
-            allowed_types = ['image/jpeg', 'image/png', 'image/gif', 'image/webp']
-            if value.content_type not in allowed_types:
-                raise serializers.ValidationError(
-                    "Only JPEG, PNG, GIF, and WebP images are allowed"
-                )
+            # Sniffs the real type and checks size/dimensions
+            try:
+                validate_image(value)
+            except UploadRejected as e:
+                raise serializers.ValidationError(str(e))
         return value
 
 
@@ -1,3 +1,101 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+import cloudinary
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from nextshopsphere.uploads import process_uploads, requeue_interrupted_uploads
+
+from .models import User
+
+
+def setUpModule():
+    # Image URLs are built locally from the cloud name; nothing is uploaded
+    cloudinary.config(cloud_name='nextshopsphere-test')
+
+
+def png_upload(name='avatar.png'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8), 'red').save(buffer, format='PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+def uploaded(public_id='avatars/abc'):
+    return {'public_id': public_id, 'version': 1, 'format': 'png', 'type': 'upload', 'resource_type': 'image'}
+
+
+# ============ AVATAR UPLOADS ============
+
+class AvatarUploadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='user@example.com', username='user')
+
+    def setUp(self):
+        self.spool_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.spool_dir, ignore_errors=True)
+        spool = override_settings(IMAGE_UPLOAD_SPOOL_DIR=self.spool_dir)
+        spool.enable()
+        self.addCleanup(spool.disable)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload_avatar(self):
+        response = self.client.post('/api/accounts/profile/avatar/', {'avatar': png_upload()}, secure=True)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['avatar_status'], 'processing')
+        self.user.refresh_from_db()
+        self.assertTrue(os.path.exists(self.user.avatar_upload_path))
+        return self.user.avatar_upload_path
+
+    def profile(self):
+        # As JWT auth would: the user row as it is now
+        self.client.force_authenticate(User.objects.get(pk=self.user.pk))
+        return self.client.get('/api/accounts/profile/', secure=True).data
+
+    def test_worker_stores_the_avatar(self):
+        path = self.upload_avatar()
+        with mock.patch('cloudinary.uploader.upload', return_value=uploaded()) as upload:
+            self.assertEqual(process_uploads(), 1)
+        self.assertEqual(upload.call_args.kwargs['folder'], 'avatars')
+
+        profile = self.profile()
+        self.assertIsNone(profile['avatar_status'])
+        self.assertIn('avatars/abc', profile['avatar_url'])
+        self.assertFalse(os.path.exists(path))
+
+    def test_failure_is_reported_to_the_client(self):
+        path = self.upload_avatar()
+        with mock.patch('cloudinary.uploader.upload', side_effect=RuntimeError('cloudinary down')):
+            process_uploads()
+
+        profile = self.profile()
+        self.assertEqual(profile['avatar_status'], 'failed')
+        self.assertTrue(profile['avatar_error'])
+        self.assertFalse(os.path.exists(path))
+        self.user.refresh_from_db()
+        self.assertIn('cloudinary down', self.user.avatar_error)
+
+    def test_interrupted_upload_is_sent_after_a_restart(self):
+        self.upload_avatar()
+        User.objects.filter(pk=self.user.pk).update(avatar_status='uploading')
+        with mock.patch('cloudinary.uploader.upload', return_value=uploaded()):
+            self.assertEqual(process_uploads(), 0)
+            self.assertEqual(requeue_interrupted_uploads(), 1)
+            self.assertEqual(process_uploads(), 1)
+        self.assertIsNone(self.profile()['avatar_status'])
+
+    def test_profile_update_keeps_upload_state(self):
+        self.upload_avatar()
+        stale = User.objects.get(pk=self.user.pk)
+        User.objects.filter(pk=self.user.pk).update(avatar_status='', avatar_upload_path='')
+        self.client.force_authenticate(stale)
+        self.client.patch('/api/accounts/profile/', {'city': 'Lisbon'}, secure=True)
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.city, self.user.avatar_status), ('Lisbon', ''))
@@ -4,6 +4,7 @@ from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django.contrib.auth import get_user_model
 from drf_spectacular.utils import extend_schema
+from nextshopsphere.uploads import StreamedImageUploadMixin, UploadRejected, oversized, queue_upload, size_error, validate_image
 from .serializers import UserSerializer, RegisterSerializer
 
 User = get_user_model()
@@ -45,13 +46,16 @@ class ProfileView(generics.RetrieveUpdateAPIView):
 
 
 @extend_schema(tags=['Accounts'])
-class AvatarUploadView(APIView):
+class AvatarUploadView(StreamedImageUploadMixin, APIView):
     """Upload or delete user avatar"""
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
     def post(self, request):
-        """Upload a new avatar"""
+        """Upload a new avatar; it's sent to Cloudinary in the background (202)"""
+        if oversized(request, 'avatar'):
+            return Response({'error': size_error()}, status=status.HTTP_400_BAD_REQUEST)
+
         if 'avatar' not in request.FILES:
             return Response(
                 {'error': 'No avatar file provided'},
@@ -59,39 +63,23 @@ class AvatarUploadView(APIView):
             )
 
         avatar_file = request.FILES['avatar']
+        try:
+            validate_image(avatar_file)
+        except UploadRejected as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Validate file size (max 5MB)
-        if avatar_file.size > 5 * 1024 * 1024:
-            return Response(
-                {'error': 'Image size must be less than 5MB'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # Validate file type
-        allowed_types = ['image/jpeg', 'image/png', 'image/gif', 'image/webp']
-        if avatar_file.content_type not in allowed_types:
-            return Response(
-                {'error': 'Only JPEG, PNG, GIF, and WebP images are allowed'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # For CloudinaryField, just assign the new file (old one stays in Cloudinary)
-        # If you want to delete old avatar from Cloudinary, use cloudinary.uploader.destroy()
-
-        # Save new avatar
-        request.user.avatar = avatar_file
-        request.user.save()
+        # Sent by the worker; the old avatar stays in Cloudinary
+        queue_upload(request.user, avatar_file)
 
-        # Return updated user data
         serializer = UserSerializer(request.user, context={'request': request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
 
     def delete(self, request):
         """Remove avatar"""
         if request.user.avatar:
             # For CloudinaryField, set to None/empty
             request.user.avatar = None
-            request.user.save()
+            request.user.save(update_fields=['avatar', 'updated_at'])
 
         serializer = UserSerializer(request.user, context={'request': request})
         return Response(serializer.data, status=status.HTTP_200_OK)
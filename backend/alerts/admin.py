@@ -2,7 +2,8 @@ from django.contrib import admin
 
 # Register your models here.
 from django.contrib import admin
-from .models import UserNotification
+from .counters import reconcile_counters
+from .models import UserNotification, NotificationCounter, PromoCampaign
 
 
 @admin.register(UserNotification)
@@ -11,4 +12,50 @@ class UserNotificationAdmin(admin.ModelAdmin):
     list_filter = ['type', 'is_read', 'created_at']
     search_fields = ['title', 'message', 'user__email']
     list_editable = ['is_read']
-    ordering = ['-created_at']
\ No newline at end of file
+    ordering = ['-created_at']
+
+    def delete_queryset(self, request, queryset):
+        # Queryset deletes skip UserNotification.delete(); fix the affected counters
+        user_ids = set(queryset.values_list('user_id', flat=True).order_by())
+        super().delete_queryset(request, queryset)
+        reconcile_counters(user_ids)
+
+
+@admin.register(NotificationCounter)
+class NotificationCounterAdmin(admin.ModelAdmin):
+    list_display = ['user', 'unread', 'updated_at']
+    search_fields = ['user__email']
+    readonly_fields = ['user', 'unread', 'updated_at']
+
+
+@admin.register(PromoCampaign)
+class PromoCampaignAdmin(admin.ModelAdmin):
+    list_display = ['title', 'segment', 'status', 'sent_count', 'created_at', 'finished_at']
+    list_filter = ['segment', 'status']
+    search_fields = ['title']
+    raw_id_fields = ['product', 'category']
+    readonly_fields = ['status', 'sent_count', 'last_user_id', 'error', 'created_at', 'started_at', 'finished_at']
+    actions = ['send_campaigns', 'resume_campaigns']
+
+    def queue(self, request, queryset, from_statuses):
+        """Hand campaigns to the worker; a conditional UPDATE so each is queued once"""
+        queued = 0
+        for campaign in queryset.filter(status__in=from_statuses):
+            if campaign.segment == 'wishlist' and not campaign.product_id:
+                self.message_user(request, f"'{campaign}' needs a product.", level='error')
+                continue
+            if campaign.segment == 'category' and not campaign.category_id:
+                self.message_user(request, f"'{campaign}' needs a category.", level='error')
+                continue
+            queued += PromoCampaign.objects.filter(pk=campaign.pk, status__in=from_statuses).update(status='queued')
+        return queued
+
+    @admin.action(description="Send selected campaigns")
+    def send_campaigns(self, request, queryset):
+        queued = self.queue(request, queryset, ['draft'])
+        self.message_user(request, f"Queued {queued} campaign(s) for the worker; refresh to follow sent_count.")
+
+    @admin.action(description="Resume selected campaigns (failed, or stuck sending after a worker restart)")
+    def resume_campaigns(self, request, queryset):
+        queued = self.queue(request, queryset, ['failed', 'sending'])
+        self.message_user(request, f"Queued {queued} campaign(s) to resume after their last recipient.")
@@ -0,0 +1,90 @@
+# alerts/broker.py
+"""
+In-process pub/sub for live user events (notifications, order status,
+payments).
+
+SSE connections subscribe with an asyncio queue per connection; publishers
+may be sync code on any thread (views, model saves) and hand events to the
+subscriber's event loop with call_soon_threadsafe. Only subscribers in the
+same process are reached: the stream view also polls the database on an
+interval, which is the cross-process fallback when the API runs several
+workers.
+"""
+
+import asyncio
+import itertools
+import logging
+import threading
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+# Slow consumers drop their oldest events rather than growing without bound
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class Subscription:
+    def __init__(self, user_id, loop):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def deliver(self, event):
+        """Runs on the subscriber's loop"""
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+
+class EventBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._ids = itertools.count(1)
+
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def publish(self, user_id, event_type, data):
+        """Thread-safe; returns how many local subscribers were notified"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        if not subscribers:
+            return 0
+        event = {'seq': next(self._ids), 'type': event_type, 'data': data}
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # Loop already closed; the connection is going away
+                self.unsubscribe(subscription)
+        return len(subscribers)
+
+    def subscribed_user_ids(self):
+        with self._lock:
+            return list(self._subscribers)
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+broker = EventBroker()
+
+
+def publish_on_commit(user_id, event_type, data):
+    """Publish once the surrounding transaction commits (immediately if none)"""
+    transaction.on_commit(lambda: broker.publish(user_id, event_type, data))
@@ -0,0 +1,94 @@
+# alerts/counters.py
+"""
+Unread notification counters.
+
+The header badge polls unread_count constantly, so instead of COUNT(*) over
+UserNotification the number lives in NotificationCounter (one row per user)
+and is adjusted atomically with F() on every write. Reads are a primary-key
+lookup on that row rather than a cache entry, so every worker sees a write
+immediately; a missing row is rebuilt from a COUNT once. reconcile_counters()
+repairs any drift (e.g. rows changed with raw queryset updates).
+"""
+
+from django.db import connection
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import NotificationCounter, UserNotification
+
+def _upsert_kwargs():
+    kwargs = {'update_conflicts': True, 'update_fields': ['unread', 'updated_at']}
+    if connection.features.supports_update_conflicts_with_target:
+        kwargs['unique_fields'] = ['user']
+    return kwargs
+
+
+def count_unread(user_id):
+    return UserNotification.objects.filter(user_id=user_id, is_read=False).count()
+
+
+def set_unread(user_id, value):
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=user_id, unread=value)], **_upsert_kwargs()
+    )
+
+
+def adjust_unread(user_id, delta):
+    """Atomically add `delta` (never going below zero)"""
+    updated = NotificationCounter.objects.filter(user_id=user_id).update(
+        unread=Greatest(F('unread') + delta, 0)
+    )
+    if not updated:
+        # First write for this user: seed the row from the table itself
+        set_unread(user_id, count_unread(user_id))
+
+
+def unread_count(user_id):
+    """Badge value: one primary-key lookup"""
+    value = NotificationCounter.objects.filter(user_id=user_id).values_list('unread', flat=True).first()
+    if value is None:
+        value = count_unread(user_id)
+        set_unread(user_id, value)
+    return value
+
+
+def reconcile_counters(user_ids=None, batch_size=1000):
+    """
+    Recompute counters from UserNotification with one grouped query per batch.
+    Returns (users checked, counters that were wrong).
+    """
+    if user_ids is None:
+        from django.contrib.auth import get_user_model
+        user_ids = get_user_model().objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=batch_size)
+
+    checked = fixed = 0
+    batch = []
+    for user_id in user_ids:
+        batch.append(user_id)
+        if len(batch) >= batch_size:
+            fixed += _reconcile_batch(batch)
+            checked += len(batch)
+            batch = []
+    if batch:
+        fixed += _reconcile_batch(batch)
+        checked += len(batch)
+    return checked, fixed
+
+
+def _reconcile_batch(user_ids):
+    actual = dict(
+        UserNotification.objects.filter(user_id__in=user_ids, is_read=False)
+        .values_list('user_id')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    stored = dict(NotificationCounter.objects.filter(user_id__in=user_ids).values_list('user_id', 'unread'))
+
+    wrong = [
+        NotificationCounter(user_id=user_id, unread=actual.get(user_id, 0))
+        for user_id in user_ids
+        if stored.get(user_id) != actual.get(user_id, 0)
+    ]
+    if wrong:
+        NotificationCounter.objects.bulk_create(wrong, **_upsert_kwargs())
+    return len(wrong)
@@ -0,0 +1,231 @@
+# alerts/fanout.py
+"""
+Promotion fan-out.
+
+Writes one `promo` UserNotification per user in a segment. Recipients are
+streamed as ids (server-side iterator, never a full list in memory), written
+with chunked bulk_create in short transactions, and paced by a rows/second
+ceiling so a large campaign doesn't starve live traffic. Unread counters are
+bumped per chunk with one UPDATE; connected SSE clients pick the rows up
+through the stream's database poll.
+
+Campaigns are queued from the admin and sent by the worker
+(process_order_events). A sender first claims the campaign with a
+conditional UPDATE, and every chunk commits together with the campaign's
+sent_count and last_user_id, so a failed or interrupted campaign resumes
+after the last user it reached.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce, Now
+from django.utils import timezone
+
+from .models import NotificationCounter, PromoCampaign, UserNotification
+
+logger = logging.getLogger(__name__)
+
+SEGMENTS = ('all', 'wishlist', 'category')
+
+
+def segment_user_ids(segment, product_id=None, category_id=None, chunk_size=None, after=None):
+    """Stream distinct recipient ids for a segment, in id order (only ids above `after` if given)"""
+    chunk_size = chunk_size or settings.PROMO_FANOUT_CHUNK_SIZE
+
+    if segment == 'all':
+        users = get_user_model().objects.filter(is_active=True).order_by('pk')
+        if after:
+            users = users.filter(pk__gt=after)
+        return users.values_list('pk', flat=True).iterator(chunk_size=chunk_size)
+
+    if segment == 'wishlist':
+        if not product_id:
+            raise ValueError("The wishlist segment needs a product")
+        from wishlist.models import WishlistItem
+        rows = WishlistItem.objects.filter(product_id=product_id, user__is_active=True)
+        if after:
+            rows = rows.filter(user_id__gt=after)
+        return rows.order_by('user_id').values_list('user_id', flat=True).distinct().iterator(chunk_size=chunk_size)
+
+    if segment == 'category':
+        if not category_id:
+            raise ValueError("The category segment needs a category")
+        from orders.models import OrderItem
+        from products.models import Category
+        # The category and its direct subcategories
+        category_ids = [category_id, *Category.objects.filter(parent_id=category_id).values_list('pk', flat=True)]
+        rows = OrderItem.objects.filter(
+            product__category_id__in=category_ids,
+            order__user__is_active=True,
+        ).exclude(order__status='cancelled')
+        if after:
+            rows = rows.filter(order__user_id__gt=after)
+        return (
+            rows.order_by('order__user_id')
+            .values_list('order__user_id', flat=True)
+            .distinct()
+            .iterator(chunk_size=chunk_size)
+        )
+
+    raise ValueError(f"Unknown segment: {segment}")
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _paced_chunks(user_ids, chunk_size, rate, started):
+    """Chunks of `user_ids`, sleeping between them to stay under `rate` rows/second"""
+    sent = 0
+    for chunk in _chunks(user_ids, chunk_size):
+        yield chunk
+        sent += len(chunk)
+        if rate:
+            # Sleep until we're back under the rows/second ceiling
+            ahead = sent / rate - (time.monotonic() - started)
+            if ahead > 0:
+                time.sleep(ahead)
+
+
+def write_chunk(user_ids, title, message, link, campaign=None):
+    with transaction.atomic():
+        UserNotification.objects.bulk_create([
+            UserNotification(user_id=user_id, type='promo', title=title, message=message, link=link)
+            for user_id in user_ids
+        ])
+        # Users without a counter row get one seeded on their next badge read
+        NotificationCounter.objects.filter(user_id__in=user_ids).update(unread=F('unread') + 1)
+        if campaign is not None:
+            # Committed with the rows, so a resume starts exactly after this chunk
+            PromoCampaign.objects.filter(pk=campaign.pk).update(
+                sent_count=F('sent_count') + len(user_ids), last_user_id=user_ids[-1],
+            )
+    if campaign is not None:
+        campaign.sent_count += len(user_ids)
+        campaign.last_user_id = user_ids[-1]
+
+
+def fan_out(user_ids, title, message, link=None, chunk_size=None, rate=None, progress=None, dry_run=False):
+    """
+    Send a promo notification to every id in `user_ids` (any iterable).
+
+    `rate` caps rows per second (0/None = settings.PROMO_FANOUT_RATE, which
+    may itself be 0 for unthrottled). `progress(sent, elapsed)` is called
+    after each chunk. Returns the number of notifications written.
+    """
+    chunk_size = chunk_size or settings.PROMO_FANOUT_CHUNK_SIZE
+    rate = settings.PROMO_FANOUT_RATE if rate is None else rate
+    started = time.monotonic()
+    sent = 0
+
+    for chunk in _paced_chunks(user_ids, chunk_size, rate, started):
+        if not dry_run:
+            write_chunk(chunk, title, message, link)
+        sent += len(chunk)
+        if progress:
+            progress(sent, time.monotonic() - started)
+
+    logger.info(f"Promo fan-out '{title}': {sent} notifications in {time.monotonic() - started:.1f}s")
+    return sent
+
+
+# ============ CAMPAIGNS ============
+
+def claim_campaign(campaign_id, statuses=('queued',)):
+    """
+    Move a campaign from one of `statuses` to 'sending' with one conditional
+    UPDATE. False means someone else claimed it first (or it isn't in one of
+    those states), and the caller must not send it.
+    """
+    return bool(PromoCampaign.objects.filter(pk=campaign_id, status__in=statuses).update(
+        status='sending', error='', started_at=Coalesce('started_at', Now()),
+    ))
+
+
+def campaign_user_ids(campaign, chunk_size=None):
+    """Recipients the campaign hasn't reached yet"""
+    return segment_user_ids(
+        campaign.segment, campaign.product_id, campaign.category_id, chunk_size, after=campaign.last_user_id,
+    )
+
+
+def send_campaign(campaign, chunk_size=None, rate=None, progress=None, max_seconds=None):
+    """
+    Send a claimed campaign (see claim_campaign) from where it left off.
+
+    With `max_seconds`, stops after the chunk that crosses it and leaves the
+    campaign 'sending' so the next call carries on; otherwise runs to the end.
+    `progress(sent_count, elapsed)` is called after each chunk. Returns the
+    number of notifications written by this call; campaign.status says
+    whether it finished.
+    """
+    chunk_size = chunk_size or settings.PROMO_FANOUT_CHUNK_SIZE
+    rate = settings.PROMO_FANOUT_RATE if rate is None else rate
+    campaigns = PromoCampaign.objects.filter(pk=campaign.pk)
+    started = time.monotonic()
+    sent = 0
+
+    try:
+        for chunk in _paced_chunks(campaign_user_ids(campaign, chunk_size), chunk_size, rate, started):
+            write_chunk(chunk, campaign.title, campaign.message, campaign.link, campaign=campaign)
+            sent += len(chunk)
+            elapsed = time.monotonic() - started
+            if progress:
+                progress(campaign.sent_count, elapsed)
+            if max_seconds is not None and elapsed >= max_seconds:
+                return sent
+    except Exception as e:
+        logger.exception(f"Promo campaign {campaign.pk} failed")
+        campaigns.update(status='failed', error=str(e))
+        campaign.status = 'failed'
+        raise
+
+    campaigns.update(status='sent', finished_at=timezone.now())
+    campaign.status = 'sent'
+    logger.info(f"Promo campaign {campaign.pk} sent to {campaign.sent_count} users")
+    return sent
+
+
+class CampaignRunner:
+    """
+    Worker-side campaign scheduling: claims queued campaigns and sends each
+    in slices of `slice_seconds` per step, so one large campaign doesn't hold
+    up the worker's other jobs. A campaign stays with the runner that claimed
+    it until it's sent or fails.
+    """
+
+    def __init__(self, slice_seconds):
+        self.slice_seconds = slice_seconds
+        self.campaigns = {}
+
+    def step(self):
+        """Claim and advance campaigns; returns notifications written"""
+        for campaign_id in PromoCampaign.objects.filter(status='queued').order_by('id').values_list('pk', flat=True):
+            if claim_campaign(campaign_id):
+                self.campaigns[campaign_id] = PromoCampaign.objects.get(pk=campaign_id)
+
+        sent = 0
+        for campaign_id, campaign in list(self.campaigns.items()):
+            try:
+                sent += send_campaign(campaign, max_seconds=self.slice_seconds)
+            except Exception:
+                pass  # already logged and recorded on the campaign
+            if campaign.status != 'sending':
+                del self.campaigns[campaign_id]
+        return sent
+
+    @property
+    def busy(self):
+        return bool(self.campaigns)
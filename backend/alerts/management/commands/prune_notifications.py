@@ -0,0 +1,66 @@
+# alerts/management/commands/prune_notifications.py
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from alerts.retention import prune_bounds, prune_range, retention_filter
+from nextshopsphere.exports import iter_buffered, iter_gzip, iter_ndjson
+
+
+class Command(BaseCommand):
+    help = "Delete notifications past their per-type retention, in primary-key range batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help="Primary keys per DELETE")
+        parser.add_argument('--sleep', type=float, default=0.05, help="Pause between batches (seconds)")
+        parser.add_argument('--type', action='append', dest='types',
+                            choices=sorted(settings.NOTIFICATION_RETENTION_DAYS.keys()),
+                            help="Only prune this type (repeatable)")
+        parser.add_argument('--archive', help="Also write pruned rows to this .ndjson.gz file (appends)")
+        parser.add_argument('--dry-run', action='store_true', help="Count what would be pruned")
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        condition = retention_filter(now, options['types'])
+        first_id, last_id = prune_bounds(now)
+        if first_id is None or last_id is None:
+            self.stdout.write(self.style.SUCCESS("✅ Nothing to prune"))
+            return
+
+        archive_file = None
+        archive = None
+        if options['archive']:
+            if options['dry_run']:
+                raise CommandError("--archive can't be combined with --dry-run")
+            archive_file = open(options['archive'], 'ab')
+
+            def archive(fields, rows):
+                # One gzip member per batch; concatenated members are a valid .gz.
+                # Flushed to disk before the batch is deleted.
+                for block in iter_gzip(iter_buffered(iter_ndjson(fields, rows))):
+                    archive_file.write(block)
+                archive_file.flush()
+                os.fsync(archive_file.fileno())
+
+        batch_size = options['batch_size']
+        started = time.monotonic()
+        pruned = 0
+        try:
+            for start in range(first_id, last_id + 1, batch_size):
+                pruned += prune_range(start, start + batch_size, condition, archive, options['dry_run'])
+                done = (start + batch_size - first_id) / (last_id + 1 - first_id)
+                if (start - first_id) // batch_size % 20 == 0:
+                    self.stdout.write(f"  … id {start:,} ({min(done, 1):.0%}), {pruned:,} pruned")
+                if options['sleep'] and not options['dry_run']:
+                    time.sleep(options['sleep'])
+        finally:
+            if archive_file:
+                archive_file.close()
+
+        verb = "Would prune" if options['dry_run'] else "Pruned"
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {verb} {pruned:,} notifications in {time.monotonic() - started:.1f}s"
+        ))
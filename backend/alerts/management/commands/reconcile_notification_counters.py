@@ -0,0 +1,24 @@
+# alerts/management/commands/reconcile_notification_counters.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from alerts.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute per-user unread notification counters from the notifications table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help="Only this user id (repeatable)")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        checked, fixed = reconcile_counters(options['user_ids'], options['batch_size'])
+
+        style = self.style.WARNING if fixed else self.style.SUCCESS
+        self.stdout.write(style(
+            f"✅ Checked {checked:,} users, corrected {fixed:,} counters in {time.monotonic() - started:.1f}s"
+        ))
@@ -0,0 +1,73 @@
+# alerts/management/commands/send_promo.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from alerts.fanout import SEGMENTS, campaign_user_ids, claim_campaign, fan_out, segment_user_ids, send_campaign
+from alerts.models import PromoCampaign
+
+
+class Command(BaseCommand):
+    help = "Fan a promo notification out to a user segment (a saved campaign or ad-hoc)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--campaign', type=int,
+                            help="PromoCampaign id to send now (draft, queued, or failed to resume)")
+        parser.add_argument('--segment', choices=SEGMENTS, default='all')
+        parser.add_argument('--product', type=int, help="Product id (wishlist segment)")
+        parser.add_argument('--category', type=int, help="Category id (category segment)")
+        parser.add_argument('--title')
+        parser.add_argument('--message')
+        parser.add_argument('--link')
+        parser.add_argument('--chunk-size', type=int, default=settings.PROMO_FANOUT_CHUNK_SIZE)
+        parser.add_argument('--rate', type=int, default=settings.PROMO_FANOUT_RATE,
+                            help="Max notifications per second (0 = unthrottled)")
+        parser.add_argument('--dry-run', action='store_true', help="Count recipients without writing")
+
+    def progress(self, sent, elapsed):
+        rate = sent / elapsed if elapsed else 0
+        self.stdout.write(f"  … {sent:,} sent ({rate:,.0f}/s)")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+
+        if options['campaign']:
+            try:
+                campaign = PromoCampaign.objects.get(pk=options['campaign'])
+            except PromoCampaign.DoesNotExist:
+                raise CommandError(f"Campaign {options['campaign']} not found")
+            label = str(campaign)
+            if options['dry_run']:
+                sent = fan_out(
+                    campaign_user_ids(campaign, options['chunk_size']), campaign.title, campaign.message,
+                    chunk_size=options['chunk_size'], rate=0, progress=self.progress, dry_run=True,
+                )
+            else:
+                if not claim_campaign(campaign.pk, statuses=('draft', 'queued', 'failed')):
+                    campaign.refresh_from_db(fields=['status'])
+                    raise CommandError(f"Campaign {campaign.pk} is already {campaign.status}")
+                campaign.refresh_from_db()
+                if campaign.last_user_id:
+                    self.stdout.write(f"  ↻ resuming after user {campaign.last_user_id} ({campaign.sent_count:,} sent)")
+                sent = send_campaign(campaign, options['chunk_size'], options['rate'], self.progress)
+        else:
+            if not options['title'] or not options['message']:
+                raise CommandError("--title and --message are required without --campaign")
+            try:
+                user_ids = segment_user_ids(
+                    options['segment'], options['product'], options['category'], options['chunk_size'],
+                )
+            except ValueError as e:
+                raise CommandError(str(e))
+            label = options['title']
+            sent = fan_out(
+                user_ids, options['title'], options['message'], options['link'],
+                chunk_size=options['chunk_size'], rate=options['rate'],
+                progress=self.progress, dry_run=options['dry_run'],
+            )
+
+        verb = "Would send" if options['dry_run'] else "Sent"
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {verb} '{label}' to {sent:,} users in {time.monotonic() - started:.1f}s"
+        ))
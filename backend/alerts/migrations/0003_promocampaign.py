@@ -0,0 +1,34 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0002_notificationcounter'),
+        ('products', '0005_alter_productimage_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PromoCampaign',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('message', models.TextField()),
+                ('link', models.CharField(blank=True, max_length=500, null=True)),
+                ('segment', models.CharField(choices=[('all', 'All active users'), ('wishlist', 'Users with the product in their wishlist'), ('category', 'Users who ordered from the category')], default='all', max_length=20)),
+                ('status', models.CharField(choices=[('draft', 'Draft'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='draft', max_length=20)),
+                ('sent_count', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('category', models.ForeignKey(blank=True, help_text='Required for the category segment', null=True, on_delete=django.db.models.deletion.SET_NULL, to='products.category')),
+                ('product', models.ForeignKey(blank=True, help_text='Required for the wishlist segment', null=True, on_delete=django.db.models.deletion.SET_NULL, to='products.product')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0004_usernotification_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='promocampaign',
+            name='last_user_id',
+            field=models.BigIntegerField(blank=True, help_text='Recipients are sent in user id order; a resumed send continues after this id', null=True),
+        ),
+        migrations.AlterField(
+            model_name='promocampaign',
+            name='status',
+            field=models.CharField(choices=[('draft', 'Draft'), ('queued', 'Queued'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='draft', max_length=20),
+        ),
+    ]
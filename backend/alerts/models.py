@@ -30,6 +30,117 @@ class UserNotification(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Notification'
         verbose_name_plural = 'Notifications'
+        indexes = [
+            # A user's notification list, newest first
+            models.Index(fields=['user', '-created_at'], name='notification_user_recent_idx'),
+            # Unread counts / reconciliation
+            models.Index(fields=['user', 'is_read'], name='notification_user_unread_idx'),
+            # Retention cutoff lookups
+            models.Index(fields=['created_at'], name='notification_created_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.title} - {self.user.email}"
\ No newline at end of file
+        return f"{self.title} - {self.user.email}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_is_read = instance.__dict__.get('is_read')
+        return instance
+
+    def save(self, *args, **kwargs):
+        from .counters import adjust_unread
+
+        adding = self._state.adding
+        was_read = getattr(self, '_loaded_is_read', None)
+        super().save(*args, **kwargs)
+
+        # Keep NotificationCounter in step with unread rows
+        if adding:
+            if not self.is_read:
+                adjust_unread(self.user_id, 1)
+            from .broker import publish_on_commit
+            from .stream import serialize_notification
+            publish_on_commit(self.user_id, 'notification', serialize_notification(self))
+        elif was_read is not None and was_read != self.is_read:
+            adjust_unread(self.user_id, -1 if self.is_read else 1)
+        self._loaded_is_read = self.is_read
+
+    def delete(self, *args, **kwargs):
+        from .counters import adjust_unread
+
+        unread = not self.is_read
+        result = super().delete(*args, **kwargs)
+        if unread:
+            adjust_unread(self.user_id, -1)
+        return result
+
+
+class NotificationCounter(models.Model):
+    """Per-user unread notification count, maintained on every write"""
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='notification_counter'
+    )
+    unread = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread} unread"
+
+
+class PromoCampaign(models.Model):
+    """A promotion notification fanned out to a user segment"""
+
+    SEGMENT_CHOICES = [
+        ('all', 'All active users'),
+        ('wishlist', 'Users with the product in their wishlist'),
+        ('category', 'Users who ordered from the category'),
+    ]
+
+    STATUS_CHOICES = [
+        ('draft', 'Draft'),
+        ('queued', 'Queued'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    link = models.CharField(max_length=500, blank=True, null=True)
+    segment = models.CharField(max_length=20, choices=SEGMENT_CHOICES, default='all')
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        help_text="Required for the wishlist segment"
+    )
+    category = models.ForeignKey(
+        'products.Category',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        help_text="Required for the category segment"
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
+    sent_count = models.PositiveIntegerField(default=0)
+    last_user_id = models.BigIntegerField(
+        null=True,
+        blank=True,
+        help_text="Recipients are sent in user id order; a resumed send continues after this id"
+    )
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.title} ({self.get_segment_display()})"
@@ -0,0 +1,77 @@
+# alerts/retention.py
+"""
+Notification retention.
+
+settings.NOTIFICATION_RETENTION_DAYS gives a TTL per notification type for
+read notifications; unread ones are kept until
+NOTIFICATION_UNREAD_RETENTION_DAYS. Pruning walks the table in primary-key
+ranges so every DELETE touches a bounded slice and holds its locks briefly.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .counters import reconcile_counters
+from .models import UserNotification
+
+ARCHIVE_FIELDS = ['id', 'user_id', 'type', 'title', 'message', 'link', 'is_read', 'created_at']
+
+
+def retention_filter(now=None, types=None):
+    """Q matching notifications past their retention"""
+    now = now or timezone.now()
+    unread_cutoff = now - timedelta(days=settings.NOTIFICATION_UNREAD_RETENTION_DAYS)
+    condition = Q(pk__in=[])
+    for notification_type, days in settings.NOTIFICATION_RETENTION_DAYS.items():
+        if types and notification_type not in types:
+            continue
+        cutoff = now - timedelta(days=days)
+        condition |= Q(type=notification_type, created_at__lt=cutoff) & (
+            Q(is_read=True) | Q(created_at__lt=unread_cutoff)
+        )
+    return condition
+
+
+def prune_bounds(now=None):
+    """(first id, last id) of the range that can contain expired rows"""
+    now = now or timezone.now()
+    ttls = list(settings.NOTIFICATION_RETENTION_DAYS.values()) + [settings.NOTIFICATION_UNREAD_RETENTION_DAYS]
+    # Nothing newer than the shortest TTL can have expired
+    latest_cutoff = now - timedelta(days=min(ttls))
+    first_id = UserNotification.objects.order_by('id').values_list('id', flat=True).first()
+    last_id = (
+        UserNotification.objects.filter(created_at__lt=latest_cutoff)
+        .order_by('-created_at').values_list('id', flat=True).first()
+    )
+    return first_id, last_id
+
+
+def prune_range(start, end, condition, archive=None, dry_run=False):
+    """
+    Delete expired rows with start <= id < end. With `archive`, a callable
+    receiving (fields, rows), rows are handed over before they are deleted.
+    Returns the number of rows pruned.
+    """
+    expired = UserNotification.objects.filter(condition, id__gte=start, id__lt=end)
+
+    if dry_run:
+        return expired.count()
+
+    if archive is not None:
+        rows = list(expired.order_by('id').values_list(*ARCHIVE_FIELDS))
+        if not rows:
+            return 0
+        archive(ARCHIVE_FIELDS, rows)
+        ids = [row[0] for row in rows]
+        unread_users = {row[1] for row in rows if not row[6]}
+        deleted = UserNotification.objects.filter(id__in=ids).delete()[0]
+    else:
+        unread_users = set(expired.filter(is_read=False).values_list('user_id', flat=True).order_by())
+        deleted = expired.delete()[0]
+
+    if unread_users:
+        reconcile_counters(sorted(unread_users))
+    return deleted
@@ -0,0 +1,255 @@
+# alerts/stream.py
+"""
+Server-sent events endpoint: GET /api/notifications/stream/
+
+Pushes `notification`, `order_status` and `payment` events for the
+authenticated user. The view is async, so under the ASGI entry point
+(nextshopsphere.asgi, e.g. uvicorn) an idle connection is a parked
+coroutine rather than a blocked gthread worker.
+
+Delivery:
+  - same process: alerts.broker publishes directly to the connection queue
+  - other processes: one DatabasePoller per event loop queries new
+    notifications / order changes for *all* locally connected users on an
+    interval and feeds them through the broker; the stream de-duplicates
+
+EventSource can't send headers, so browsers first POST
+/api/notifications/stream_ticket/ and connect with ?ticket=: a signed user id
+valid for ALERTS_STREAM_TICKET_SECONDS and only for this endpoint. Query
+strings end up in access logs, so the JWT itself is only accepted as a Bearer
+header. Connections close after ALERTS_STREAM_MAX_SECONDS; browsers reconnect
+with Last-Event-ID and resume from that notification (after fetching a fresh
+ticket once the old one is refused).
+"""
+
+import asyncio
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .broker import broker
+
+logger = logging.getLogger(__name__)
+
+POLL_CHUNK = 1000
+
+TICKET_SALT = 'alerts.stream.ticket'
+
+
+def serialize_notification(notification):
+    from .serializers import NotificationSerializer
+    return NotificationSerializer(notification).data
+
+
+def order_event(order_id, status, payment_status, previous_status=None):
+    return {
+        'order_id': order_id,
+        'status': status,
+        'payment_status': payment_status,
+        'previous_status': previous_status,
+    }
+
+
+# ============ DATABASE FALLBACK ============
+
+class DatabasePoller:
+    """
+    Cross-process fallback: every interval, fetch notifications and order
+    changes for the users connected to this process (chunked IN lists) and
+    publish them locally. One poller per event loop, whatever the number of
+    subscribers.
+    """
+
+    _pollers = {}
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.notification_cursor = None
+        self.orders_since = None
+        self.task = None
+
+    @classmethod
+    def ensure_running(cls, loop):
+        poller = cls._pollers.get(loop)
+        if poller is None or poller.task.done():
+            poller = cls(settings.ALERTS_STREAM_POLL_INTERVAL)
+            poller.task = loop.create_task(poller.run())
+            cls._pollers[loop] = poller
+        return poller
+
+    async def run(self):
+        try:
+            while broker.subscriber_count:
+                try:
+                    await sync_to_async(self.poll)()
+                except Exception:
+                    logger.exception("Notification stream poll failed")
+                await asyncio.sleep(self.interval)
+        finally:
+            self._pollers.pop(asyncio.get_running_loop(), None)
+
+    def poll(self):
+        from orders.models import Order
+        from .models import UserNotification
+
+        close_old_connections()
+        user_ids = broker.subscribed_user_ids()
+        now = timezone.now()
+
+        if self.notification_cursor is None:
+            # First pass only establishes the starting point
+            self.notification_cursor = (
+                UserNotification.objects.order_by('-id').values_list('id', flat=True).first() or 0
+            )
+            self.orders_since = now
+            return
+
+        max_id = self.notification_cursor
+        for start in range(0, len(user_ids), POLL_CHUNK):
+            chunk = user_ids[start:start + POLL_CHUNK]
+            notifications = UserNotification.objects.filter(
+                user_id__in=chunk, id__gt=self.notification_cursor
+            ).order_by('id')
+            for notification in notifications:
+                broker.publish(notification.user_id, 'notification', serialize_notification(notification))
+                max_id = max(max_id, notification.id)
+
+            orders = Order.objects.filter(
+                user_id__in=chunk, updated_at__gt=self.orders_since
+            ).values_list('id', 'user_id', 'status', 'payment_status')
+            for order_id, user_id, status, payment_status in orders:
+                broker.publish(user_id, 'order_status', order_event(order_id, status, payment_status))
+
+        self.notification_cursor = max_id
+        self.orders_since = now
+
+
+# ============ STREAM ============
+
+def format_event(event_type, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data, cls=DjangoJSONEncoder)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+async def event_stream(user_id, last_notification_id, backlog=()):
+    loop = asyncio.get_running_loop()
+    subscription = broker.subscribe(user_id)
+    DatabasePoller.ensure_running(loop)
+
+    heartbeat = settings.ALERTS_STREAM_HEARTBEAT
+    deadline = loop.time() + settings.ALERTS_STREAM_MAX_SECONDS
+    order_states = {}
+
+    try:
+        yield f"retry: {settings.ALERTS_STREAM_RETRY_MS}\n\n"
+        for data in backlog:
+            last_notification_id = max(last_notification_id, data['id'])
+            yield format_event('notification', data, event_id=data['id'])
+        while loop.time() < deadline:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+
+            data = event['data']
+            if event['type'] == 'notification':
+                # The poller may re-deliver what the broker already pushed
+                if data['id'] <= last_notification_id:
+                    continue
+                last_notification_id = data['id']
+                yield format_event('notification', data, event_id=data['id'])
+            elif event['type'] == 'order_status':
+                state = (data['status'], data['payment_status'])
+                if order_states.get(data['order_id']) == state:
+                    continue
+                order_states[data['order_id']] = state
+                yield format_event('order_status', data)
+            else:
+                yield format_event(event['type'], data)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def issue_ticket(user_id):
+    return signing.dumps(user_id, salt=TICKET_SALT)
+
+
+def bearer_user_id(request):
+    """
+    user id from the Bearer header, without a database hit; None without one.
+    Raises InvalidToken for a malformed or expired token, as JWTAuthentication does.
+    """
+    header = request.headers.get('Authorization', '')
+    if not header.startswith('Bearer '):
+        return None
+    try:
+        token = AccessToken(header[len('Bearer '):])
+    except TokenError as e:
+        raise InvalidToken(e.args[0]) from e
+    # Claims are strings; the broker is keyed by the pk as the ORM returns it
+    return get_user_model()._meta.pk.to_python(token.get(jwt_settings.USER_ID_CLAIM))
+
+
+def authenticate_token(request):
+    """user id from the Bearer header or a ?ticket=, without a database hit; None if neither is valid"""
+    if request.headers.get('Authorization', '').startswith('Bearer '):
+        try:
+            return bearer_user_id(request)
+        except InvalidToken:
+            return None
+
+    ticket = request.GET.get('ticket')
+    if not ticket:
+        return None
+    try:
+        return signing.loads(ticket, salt=TICKET_SALT, max_age=settings.ALERTS_STREAM_TICKET_SECONDS)
+    except signing.BadSignature:  # includes SignatureExpired
+        return None
+
+
+def parse_last_event_id(request):
+    value = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+async def notification_stream(request):
+    """Server-sent events for the authenticated user"""
+    user_id = authenticate_token(request)
+    if user_id is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+    from .models import UserNotification
+
+    notifications = UserNotification.objects.filter(user_id=user_id)
+    last_id = parse_last_event_id(request)
+    backlog = []
+    if last_id is None:
+        last_id = await notifications.order_by('-id').values_list('id', flat=True).afirst() or 0
+    else:
+        # Reconnect: replay what was missed while disconnected
+        missed = notifications.filter(id__gt=last_id).order_by('id')[:settings.ALERTS_STREAM_BACKLOG]
+        backlog = [serialize_notification(n) async for n in missed]
+
+    response = StreamingHttpResponse(event_stream(user_id, last_id, backlog), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,3 +1,201 @@
-from django.test import TestCase
+import time
+from datetime import timedelta
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import User
+from nextshopsphere.querybudget import query_budget
+
+from .fanout import CampaignRunner, claim_campaign
+from .counters import unread_count
+from .models import NotificationCounter, PromoCampaign, UserNotification
+from .retention import prune_range, retention_filter
+from .stream import authenticate_token, issue_ticket
+
+
+# ============ QUERY BUDGETS ============
+
+class NotificationQueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='reader@example.com', username='reader')
+        for i in range(15):
+            UserNotification.objects.create(user=cls.user, title=f'Note {i}', message='-', is_read=i % 3 == 0)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertWithinBudget(self, view_name, path):
+        with query_budget(settings.QUERY_BUDGETS[view_name]):
+            response = self.client.get(path, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_notification_list(self):
+        self.assertWithinBudget('notification-list', '/api/notifications/')
+
+    def test_unread_count(self):
+        response = self.assertWithinBudget('notification-unread-count', '/api/notifications/unread_count/')
+        self.assertEqual(response.json()['count'], 10)
+
+
+# ============ UNREAD COUNTERS ============
+
+class UnreadCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='reader@example.com', username='reader')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for i in range(4):
+            UserNotification.objects.create(user=self.user, title=f'Note {i}', message='-', is_read=i == 0)
+
+    def badge(self):
+        return self.client.get('/api/notifications/unread_count/', secure=True).json()['count']
+
+    def test_badge_reads_the_counter_row(self):
+        self.assertEqual(self.badge(), 3)
+        # A write from any process is visible on the next read
+        NotificationCounter.objects.filter(user=self.user).update(unread=7)
+        self.assertEqual(self.badge(), 7)
+
+    def test_mark_all_read(self):
+        response = self.client.post('/api/notifications/mark_all_read/', secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.badge(), 0)
+        UserNotification.objects.create(user=self.user, title='New', message='-')
+        self.assertEqual(self.badge(), 1)
+
+    def test_clear_all(self):
+        response = self.client.delete('/api/notifications/clear_all/', secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.badge(), 0)
+        self.assertFalse(UserNotification.objects.filter(user=self.user).exists())
+
+    def test_notifications_cannot_be_created_by_clients(self):
+        response = self.client.post('/api/notifications/', {'title': 'x', 'message': 'y'}, secure=True)
+        self.assertEqual(response.status_code, 405)
+
+
+# ============ RETENTION ============
+
+@override_settings(NOTIFICATION_RETENTION_DAYS={'promo': 30}, NOTIFICATION_UNREAD_RETENTION_DAYS=90)
+class PruneRangeTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='reader@example.com', username='reader')
+        self.now = timezone.now()
+        self.notify(days=100, is_read=False)  # unread, past the unread TTL
+        self.notify(days=40, is_read=True)    # read, past the promo TTL
+        self.notify(days=40, is_read=False)   # unread, kept
+        self.notify(days=1, is_read=False)    # recent, kept
+        self.ids = list(UserNotification.objects.order_by('id').values_list('id', flat=True))
+
+    def notify(self, days, is_read):
+        notification = UserNotification.objects.create(
+            user=self.user, type='promo', title='Sale', message='-', is_read=is_read,
+        )
+        UserNotification.objects.filter(pk=notification.pk).update(created_at=self.now - timedelta(days=days))
+
+    def prune(self, **kwargs):
+        return prune_range(self.ids[0], self.ids[-1] + 1, retention_filter(self.now), **kwargs)
+
+    def test_dry_run_counts_only(self):
+        self.assertEqual(self.prune(dry_run=True), 2)
+        self.assertEqual(UserNotification.objects.count(), 4)
+
+    def test_unread_counter_is_reconciled(self):
+        self.assertEqual(unread_count(self.user.pk), 3)
+        self.assertEqual(self.prune(), 2)
+        self.assertEqual(unread_count(self.user.pk), 2)
+
+    def test_archived_rows_are_handed_over_first(self):
+        archived = []
+        self.assertEqual(self.prune(archive=lambda fields, rows: archived.extend(rows)), 2)
+        self.assertEqual([row[0] for row in archived], self.ids[:2])
+        self.assertEqual(unread_count(self.user.pk), 2)
+
+
+# ============ STREAM AUTH ============
+
+class StreamAuthTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='reader@example.com', username='reader')
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_ticket_from_the_api(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        ticket = client.post('/api/notifications/stream_ticket/', secure=True).json()['ticket']
+        request = self.factory.get('/api/notifications/stream/', {'ticket': ticket})
+        self.assertEqual(authenticate_token(request), self.user.id)
+
+    def test_bearer_header(self):
+        token = str(AccessToken.for_user(self.user))
+        request = self.factory.get('/api/notifications/stream/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(authenticate_token(request), self.user.id)
+
+    def test_jwt_in_query_string_is_refused(self):
+        token = str(AccessToken.for_user(self.user))
+        request = self.factory.get('/api/notifications/stream/', {'token': token, 'ticket': token})
+        self.assertIsNone(authenticate_token(request))
+
+    @override_settings(ALERTS_STREAM_TICKET_SECONDS=0)
+    def test_expired_ticket_is_refused(self):
+        ticket = issue_ticket(self.user.id)
+        time.sleep(1)
+        request = self.factory.get('/api/notifications/stream/', {'ticket': ticket})
+        self.assertIsNone(authenticate_token(request))
+
+
+# ============ PROMO CAMPAIGNS ============
+
+@override_settings(PROMO_FANOUT_CHUNK_SIZE=2, PROMO_FANOUT_RATE=0)
+class PromoCampaignTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [User.objects.create_user(email=f'user{i}@example.com', username=f'user{i}') for i in range(5)]
+
+    def setUp(self):
+        self.campaign = PromoCampaign.objects.create(title='Sale', message='-', status='queued')
+
+    def recipients(self):
+        return list(UserNotification.objects.filter(type='promo').order_by('user_id').values_list('user_id', flat=True))
+
+    def test_campaign_is_claimed_once(self):
+        self.assertTrue(claim_campaign(self.campaign.pk))
+        self.assertFalse(claim_campaign(self.campaign.pk))
+
+    def test_runner_sends_in_slices_and_resumes(self):
+        runner = CampaignRunner(slice_seconds=0)
+        runner.step()
+        self.campaign.refresh_from_db()
+        self.assertEqual((self.campaign.status, self.campaign.sent_count), ('sending', 2))
+        self.assertTrue(runner.busy)
+
+        # A new sender (e.g. after a restart) carries on after the last recipient
+        PromoCampaign.objects.filter(pk=self.campaign.pk).update(status='queued')
+        runner = CampaignRunner(slice_seconds=60)
+        runner.step()
+        self.campaign.refresh_from_db()
+        self.assertEqual((self.campaign.status, self.campaign.sent_count), ('sent', 5))
+        self.assertFalse(runner.busy)
+        self.assertEqual(self.recipients(), [user.pk for user in self.users])
+
+    def test_failure_is_recorded(self):
+        PromoCampaign.objects.filter(pk=self.campaign.pk).update(segment='wishlist')
+        CampaignRunner(slice_seconds=60).step()
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, 'failed')
+        self.assertIn('product', self.campaign.error)
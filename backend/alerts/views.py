@@ -1,39 +1,65 @@
 from django.shortcuts import render
 
 # Create your views here.
-from rest_framework import viewsets, permissions, status
+from django.conf import settings
+from django.db import transaction
+from rest_framework import mixins, viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from .counters import adjust_unread, unread_count
 from .models import UserNotification
+from .stream import issue_ticket
 from .serializers import NotificationSerializer
 
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(mixins.ListModelMixin,
+                          mixins.RetrieveModelMixin,
+                          mixins.UpdateModelMixin,
+                          mixins.DestroyModelMixin,
+                          viewsets.GenericViewSet):
+    # No create: notifications are written by the server. POST is only for mark_all_read.
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
-    http_method_names = ['get', 'patch', 'delete']
+    http_method_names = ['get', 'post', 'patch', 'delete']
 
     def get_queryset(self):
         return UserNotification.objects.filter(user=self.request.user)
 
     @action(detail=False, methods=['get'])
     def unread_count(self, request):
-        count = self.get_queryset().filter(is_read=False).count()
-        return Response({'count': count})
+        return Response({'count': unread_count(request.user.id)})
+
+    @action(detail=False, methods=['post'])
+    def stream_ticket(self, request):
+        """Short-lived ?ticket= for the SSE stream (EventSource can't send the Authorization header)"""
+        return Response({
+            'ticket': issue_ticket(request.user.id),
+            'expires_in': settings.ALERTS_STREAM_TICKET_SECONDS,
+        })
 
     @action(detail=False, methods=['post'])
     def mark_all_read(self, request):
-        self.get_queryset().update(is_read=True)
+        # Take off exactly the rows this UPDATE flipped, in the same transaction:
+        # a notification arriving meanwhile keeps its own +1
+        with transaction.atomic():
+            updated = self.get_queryset().filter(is_read=False).update(is_read=True)
+            if updated:
+                adjust_unread(request.user.id, -updated)
         return Response({'message': 'All notifications marked as read'})
 
     @action(detail=True, methods=['patch'])
     def mark_read(self, request, pk=None):
         notification = self.get_object()
-        notification.is_read = True
-        notification.save()
+        if not notification.is_read:
+            notification.is_read = True
+            notification.save(update_fields=['is_read'])
         return Response(NotificationSerializer(notification).data)
 
     @action(detail=False, methods=['delete'])
     def clear_all(self, request):
-        self.get_queryset().delete()
+        with transaction.atomic():
+            deleted = self.get_queryset().filter(is_read=False).delete()[1].get(UserNotification._meta.label, 0)
+            self.get_queryset().delete()
+            if deleted:
+                adjust_unread(request.user.id, -deleted)
         return Response({'message': 'All notifications cleared'})
\ No newline at end of file
@@ -0,0 +1,405 @@
+# benchmarks/api_latency.py
+"""
+API latency benchmark.
+
+Replays a weighted mix of catalog, review, wishlist, notification, checkout
+and payment requests and reports p50/p95/p99 latency, queries per request and
+throughput per scenario. Results are written as JSON so runs on different
+commits can be compared.
+
+Run from backend/:
+
+    # In-process (Django test client, every request's SQL is counted).
+    # Writes (checkout, payments) are rolled back at the end.
+    python -m benchmarks.api_latency --requests 2000
+
+    # Against a running server, or a local gunicorn started for the run
+    python -m benchmarks.api_latency --base-url http://127.0.0.1:8000 --concurrency 8
+    python -m benchmarks.api_latency --gunicorn --concurrency 8
+
+    # Compare with an earlier run
+    python -m benchmarks.api_latency --compare benchmarks/results/api_latency-abc123-....json
+
+Seed data first, e.g. `python manage.py generate_catalog --products 50000`.
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import (
+    BACKEND_DIR, load_results, print_comparison, setup_django, summarize, write_results,
+)
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from rest_framework.throttling import SimpleRateThrottle  # noqa: E402
+from rest_framework_simplejwt.tokens import RefreshToken  # noqa: E402
+
+from orders.models import Order, OrderItem  # noqa: E402
+from products.models import Brand, Category, Product  # noqa: E402
+
+User = get_user_model()
+
+BENCH_EMAIL = 'benchmark-user@example.com'
+
+# name: (weight, needs auth)
+TRAFFIC_MIX = {
+    'products:list': (20, False),
+    'products:list_by_category': (8, False),
+    'products:detail': (15, False),
+    'products:featured': (4, False),
+    'products:new_arrivals': (3, False),
+    'products:search': (5, False),
+    'products:related': (3, False),
+    'categories:list': (4, False),
+    'categories:tree': (6, False),
+    'brands:list': (2, False),
+    'reviews:by_product': (8, False),
+    'reviews:stats': (8, False),
+    'wishlist:list': (3, True),
+    'wishlist:check': (4, True),
+    'notifications:unread_count': (5, True),
+    'notifications:list': (2, True),
+    'orders:list': (2, True),
+    'checkout:create_order': (1, True),
+    'payments:process': (1, True),
+}
+
+
+class Sample:
+    """Ids and slugs sampled from the database to build request URLs"""
+
+    def __init__(self, rng, size=500):
+        self.rng = rng
+        self.products = list(
+            Product.objects.filter(is_available=True, stock__gt=10)
+            .order_by('id').values_list('id', 'slug', 'name')[:size]
+        )
+        self.categories = list(Category.objects.filter(is_active=True).values_list('slug', flat=True)[:size])
+        self.brands = list(Brand.objects.filter(is_active=True).values_list('slug', flat=True)[:size])
+        if not self.products or not self.categories:
+            sys.exit("No products/categories found - seed data first (manage.py generate_catalog).")
+
+    def product(self):
+        return self.rng.choice(self.products)
+
+    def category(self):
+        return self.rng.choice(self.categories)
+
+    def search_term(self):
+        return self.product()[2].split()[0]
+
+
+def build_request(name, sample, user):
+    """Return (method, path, json body or None) for one scenario"""
+    product_id, product_slug, _ = sample.product()
+    if name == 'products:list':
+        return 'GET', f'/api/products/?page={sample.rng.randint(1, 5)}', None
+    if name == 'products:list_by_category':
+        return 'GET', f'/api/products/?category={sample.category()}', None
+    if name == 'products:detail':
+        return 'GET', f'/api/products/{product_slug}/', None
+    if name == 'products:featured':
+        return 'GET', '/api/products/featured/', None
+    if name == 'products:new_arrivals':
+        return 'GET', '/api/products/new_arrivals/', None
+    if name == 'products:search':
+        return 'GET', f'/api/products/search/?q={sample.search_term()}', None
+    if name == 'products:related':
+        return 'GET', f'/api/products/{product_slug}/related/', None
+    if name == 'categories:list':
+        return 'GET', '/api/categories/', None
+    if name == 'categories:tree':
+        return 'GET', '/api/categories/tree/', None
+    if name == 'brands:list':
+        return 'GET', '/api/brands/', None
+    if name == 'reviews:by_product':
+        return 'GET', f'/api/reviews/?product={product_slug}', None
+    if name == 'reviews:stats':
+        return 'GET', f'/api/reviews/product/{product_slug}/stats/', None
+    if name == 'wishlist:list':
+        return 'GET', '/api/wishlist/', None
+    if name == 'wishlist:check':
+        return 'GET', f'/api/wishlist/check/{product_id}/', None
+    if name == 'notifications:unread_count':
+        return 'GET', '/api/notifications/unread_count/', None
+    if name == 'notifications:list':
+        return 'GET', '/api/notifications/', None
+    if name == 'orders:list':
+        return 'GET', '/api/orders/', None
+    if name == 'checkout:create_order':
+        return 'POST', '/api/orders/', {
+            'shipping_address': '1 Benchmark Way',
+            'shipping_city': 'Benchville',
+            'shipping_country': 'Benchland',
+            'shipping_phone': '+10000000000',
+            'items': [{'product_id': product_id, 'quantity': 1}],
+        }
+    if name == 'payments:process':
+        # A fresh pending order per payment; created outside the timed request
+        order = Order.objects.create(
+            user=user, shipping_address='1 Benchmark Way', shipping_city='Benchville',
+            shipping_country='Benchland', shipping_phone='+10000000000',
+        )
+        product = Product.objects.get(id=product_id)
+        OrderItem.objects.create(
+            order=order, product=product, product_name=product.name,
+            product_price=product.price, product_slug=product.slug, quantity=1,
+        )
+        order.calculate_totals()
+        return 'POST', '/api/payments/process/', {
+            'order_id': order.id,
+            'card_number': '4242424242424242',
+            'card_expiry': '12/30',
+            'card_cvv': '123',
+            'card_holder_name': 'Bench Mark',
+        }
+    raise ValueError(name)
+
+
+def pick_scenarios(rng, count):
+    names = list(TRAFFIC_MIX)
+    weights = [TRAFFIC_MIX[name][0] for name in names]
+    return rng.choices(names, weights=weights, k=count)
+
+
+def bench_user():
+    user, created = User.objects.get_or_create(
+        email=BENCH_EMAIL, defaults={'username': 'benchmark-user'}
+    )
+    if created:
+        user.set_unusable_password()
+        user.save()
+    return user, str(RefreshToken.for_user(user).access_token)
+
+
+def parse_server_timing(header):
+    """Extract the db query count from a Server-Timing header, if present"""
+    for part in (header or '').split(','):
+        fields = [f.strip() for f in part.split(';')]
+        if fields[0] == 'db':
+            for field in fields[1:]:
+                if field.startswith('desc='):
+                    try:
+                        return int(field[5:].strip('"').split()[0])
+                    except (ValueError, IndexError):
+                        return None
+    return None
+
+
+# ============ IN-PROCESS RUNNER ============
+
+def run_in_process(args, rng):
+    # Benchmarks measure the handlers, not the rate limiter or SSL redirect
+    SimpleRateThrottle.allow_request = lambda self, request, view: True
+    if 'testserver' not in settings.ALLOWED_HOSTS:
+        settings.ALLOWED_HOSTS.append('testserver')
+
+    results = {}
+    with transaction.atomic():
+        user, token = bench_user()
+        sample = Sample(rng)
+        # Public endpoints are hit anonymously, like most real catalog traffic
+        clients = {True: Client(HTTP_AUTHORIZATION=f'Bearer {token}'), False: Client()}
+
+        for name in pick_scenarios(rng, args.warmup):
+            method, path, body = build_request(name, sample, user)
+            send(clients[TRAFFIC_MIX[name][1]], method, path, body)
+
+        started = time.perf_counter()
+        for name in pick_scenarios(rng, args.requests):
+            method, path, body = build_request(name, sample, user)
+            client = clients[TRAFFIC_MIX[name][1]]
+            with CaptureQueriesContext(connection) as queries:
+                t0 = time.perf_counter()
+                response = send(client, method, path, body)
+                elapsed_ms = (time.perf_counter() - t0) * 1000
+            record(results, name, elapsed_ms, len(queries), response.status_code)
+        wall = time.perf_counter() - started
+
+        if not args.keep_data:
+            transaction.set_rollback(True)
+
+    return results, wall
+
+
+def send(client, method, path, body):
+    if method == 'GET':
+        return client.get(path, secure=True)
+    return client.post(path, data=json.dumps(body), content_type='application/json', secure=True)
+
+
+# ============ LIVE SERVER RUNNER ============
+
+def run_live(args, rng, base_url):
+    import requests
+
+    user, token = bench_user()
+    sample = Sample(rng)
+    session = requests.Session()
+    auth_headers = {'Authorization': f'Bearer {token}'}
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=args.concurrency)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    # Build requests up front so DB work for payment orders isn't timed
+    plan = [(name, build_request(name, sample, user)) for name in pick_scenarios(rng, args.warmup + args.requests)]
+
+    def fire(item):
+        name, (method, path, body) = item
+        t0 = time.perf_counter()
+        headers = auth_headers if TRAFFIC_MIX[name][1] else None
+        response = session.request(method, base_url + path, json=body, headers=headers, timeout=60)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        return name, elapsed_ms, parse_server_timing(response.headers.get('Server-Timing')), response.status_code
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(fire, plan[:args.warmup]))
+        started = time.perf_counter()
+        for name, elapsed_ms, queries, status_code in pool.map(fire, plan[args.warmup:]):
+            record(results, name, elapsed_ms, queries, status_code)
+        wall = time.perf_counter() - started
+    return results, wall
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_gunicorn(args):
+    port = free_port()
+    command = [
+        sys.executable, '-m', 'gunicorn', 'nextshopsphere.wsgi:application',
+        '--bind', f'127.0.0.1:{port}',
+        '--workers', str(args.workers), '--threads', str(args.threads),
+        '--worker-class', 'gthread', '--log-level', 'warning', '--max-requests', '0',
+    ]
+    env = dict(os.environ, SECURE_SSL_REDIRECT='False')
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+
+    import requests
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f'http://127.0.0.1:{port}/api/health/', timeout=1)
+            return process, f'http://127.0.0.1:{port}'
+        except requests.ConnectionError:
+            time.sleep(0.25)
+    process.terminate()
+    sys.exit("gunicorn did not start within 30s")
+
+
+# ============ REPORTING ============
+
+def record(results, name, elapsed_ms, queries, status_code):
+    entry = results.setdefault(name, {'latencies': [], 'queries': [], 'errors': 0})
+    entry['latencies'].append(elapsed_ms)
+    if queries is not None:
+        entry['queries'].append(queries)
+    if status_code >= 400:
+        entry['errors'] += 1
+
+
+def build_report(results, wall):
+    scenarios = {}
+    all_latencies = []
+    total_errors = 0
+    for name, entry in results.items():
+        stats = summarize(entry['latencies'])
+        stats['errors'] = entry['errors']
+        if entry['queries']:
+            stats['queries_mean'] = round(sum(entry['queries']) / len(entry['queries']), 1)
+            stats['queries_max'] = max(entry['queries'])
+        scenarios[name] = stats
+        all_latencies.extend(entry['latencies'])
+        total_errors += entry['errors']
+
+    overall = summarize(all_latencies)
+    overall['errors'] = total_errors
+    overall['throughput_rps'] = round(len(all_latencies) / wall, 1) if wall else 0
+    return scenarios, overall
+
+
+def print_report(scenarios, overall):
+    print(f"\n{'scenario':<32} {'n':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>8} {'err':>5}")
+    for name, stats in sorted(scenarios.items()):
+        print(
+            f"{name:<32} {stats['count']:>6} {stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} "
+            f"{stats['p99_ms']:>8.1f} {stats.get('queries_mean', '-')!s:>8} {stats['errors']:>5}"
+        )
+    print(
+        f"\nOverall: {overall['count']} requests, p50 {overall['p50_ms']} ms, "
+        f"p95 {overall['p95_ms']} ms, p99 {overall['p99_ms']} ms, "
+        f"{overall['throughput_rps']} req/s, {overall['errors']} errors"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--warmup', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--base-url', help="Benchmark a running server instead of in-process")
+    parser.add_argument('--gunicorn', action='store_true', help="Start a local gunicorn for the run")
+    parser.add_argument('--workers', type=int, default=3)
+    parser.add_argument('--threads', type=int, default=2)
+    parser.add_argument('--concurrency', type=int, default=4, help="Client threads (live mode)")
+    parser.add_argument('--keep-data', action='store_true',
+                        help="Commit orders/payments created in-process instead of rolling back")
+    parser.add_argument('--output', help="Result file (default: benchmarks/results/...)")
+    parser.add_argument('--compare', help="Baseline result file to compare against")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    process = None
+    try:
+        if args.gunicorn:
+            process, base_url = start_gunicorn(args)
+            mode = 'gunicorn'
+            results, wall = run_live(args, rng, base_url)
+        elif args.base_url:
+            mode = 'live'
+            results, wall = run_live(args, rng, args.base_url.rstrip('/'))
+        else:
+            mode = 'in-process'
+            results, wall = run_in_process(args, rng)
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+
+    scenarios, overall = build_report(results, wall)
+    print_report(scenarios, overall)
+
+    payload = {
+        'mode': mode,
+        'database': connection.vendor,
+        'requests': args.requests,
+        'concurrency': 1 if mode == 'in-process' else args.concurrency,
+        'overall': overall,
+        'scenarios': scenarios,
+    }
+    path = write_results('api_latency', payload, args.output)
+    print(f"\n💾 Results written to {path}")
+
+    if args.compare:
+        print_comparison(payload, load_results(args.compare))
+
+
+if __name__ == '__main__':
+    main()
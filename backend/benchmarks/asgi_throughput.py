@@ -0,0 +1,221 @@
+# benchmarks/asgi_throughput.py
+"""
+WSGI vs ASGI throughput under upstream latency.
+
+Starts a fake Google tokeninfo endpoint that answers after --latency
+seconds, then runs the same concurrent request mix against two local
+gunicorn servers in turn:
+
+  wsgi  nextshopsphere.wsgi:application, gthread workers (workers x threads)
+  asgi  nextshopsphere.asgi:application, uvicorn workers
+
+The mix is Google sign-in (one upstream call each) plus the async catalog
+reads (featured, new arrivals, category tree). With blocking I/O the gthread
+server tops out at workers x threads requests in flight; the ASGI server
+parks waiting requests on the event loop. Reports req/s and latency per
+scenario and server.
+
+Run from backend/ (seed data first, e.g. manage.py generate_catalog):
+
+    python -m benchmarks.asgi_throughput --latency 0.3 --concurrency 64 --requests 2000
+    python -m benchmarks.asgi_throughput --only asgi --workers 2
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from benchmarks.common import BACKEND_DIR, summarize, write_results
+
+CLIENT_ID = 'asgi-benchmark-client'
+
+# name: (weight, method, path)
+TRAFFIC_MIX = {
+    'google_auth': (4, 'POST', '/api/accounts/google/auth/'),
+    'products:featured': (3, 'GET', '/api/products/featured/'),
+    'products:new_arrivals': (2, 'GET', '/api/products/new_arrivals/'),
+    'categories:tree': (1, 'GET', '/api/categories/tree/'),
+}
+
+SERVERS = {
+    'wsgi': lambda args: [
+        'nextshopsphere.wsgi:application',
+        '--worker-class', 'gthread', '--workers', str(args.workers), '--threads', str(args.threads),
+    ],
+    'asgi': lambda args: [
+        'nextshopsphere.asgi:application',
+        '--worker-class', 'uvicorn_worker.UvicornWorker', '--workers', str(args.workers),
+    ],
+}
+
+
+# ============ FAKE UPSTREAM ============
+
+def start_upstream(latency, users):
+    """Threaded tokeninfo stand-in; every reply takes `latency` seconds"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            data = json.dumps({
+                'aud': CLIENT_ID,
+                'email': f'asgi-bench-{random.randrange(users)}@example.com',
+                'given_name': 'Bench',
+                'family_name': 'Mark',
+            }).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', free_port()), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}/tokeninfo'
+
+
+# ============ SERVER ============
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(kind, args, upstream_url):
+    port = free_port()
+    command = [
+        sys.executable, '-m', 'gunicorn', *SERVERS[kind](args),
+        '--bind', f'127.0.0.1:{port}', '--log-level', 'warning', '--max-requests', '0',
+    ]
+    env = dict(
+        os.environ,
+        SECURE_SSL_REDIRECT='False',
+        GOOGLE_TOKENINFO_URL=upstream_url,
+        GOOGLE_OAUTH_CLIENT_ID=CLIENT_ID,
+    )
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f'http://127.0.0.1:{port}/api/health/', timeout=1)
+            return process, f'http://127.0.0.1:{port}'
+        except requests.ConnectionError:
+            time.sleep(0.25)
+    process.terminate()
+    sys.exit(f"{kind} server did not start within 30s")
+
+
+# ============ LOAD ============
+
+def run_load(base_url, plan, concurrency):
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=concurrency)
+    session.mount('http://', adapter)
+
+    def fire(name):
+        _, method, path = TRAFFIC_MIX[name]
+        body = {'credential': 'benchmark'} if method == 'POST' else None
+        t0 = time.perf_counter()
+        try:
+            response = session.request(method, base_url + path, json=body, timeout=120)
+            failed = response.status_code >= 400
+        except requests.RequestException:
+            failed = True
+        return name, (time.perf_counter() - t0) * 1000, failed
+
+    results = {}
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for name, elapsed_ms, failed in pool.map(fire, plan):
+            entry = results.setdefault(name, {'latencies': [], 'errors': 0})
+            entry['latencies'].append(elapsed_ms)
+            entry['errors'] += failed
+    wall = time.perf_counter() - started
+
+    scenarios = {}
+    for name, entry in results.items():
+        scenarios[name] = {**summarize(entry['latencies']), 'errors': entry['errors']}
+    overall = summarize([ms for entry in results.values() for ms in entry['latencies']])
+    overall['errors'] = sum(entry['errors'] for entry in results.values())
+    overall['throughput_rps'] = round(len(plan) / wall, 1) if wall else 0
+    return {'overall': overall, 'scenarios': scenarios}
+
+
+def print_report(kind, report):
+    overall = report['overall']
+    print(
+        f"\n{kind}: {overall['throughput_rps']} req/s, p50 {overall['p50_ms']} ms, "
+        f"p95 {overall['p95_ms']} ms, p99 {overall['p99_ms']} ms, {overall['errors']} errors"
+    )
+    for name, stats in sorted(report['scenarios'].items()):
+        print(f"  {name:<24} {stats['count']:>6} p50 {stats['p50_ms']:>8.1f}  p95 {stats['p95_ms']:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--warmup', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=64, help="Client threads")
+    parser.add_argument('--latency', type=float, default=0.3, help="Seconds the upstream takes per call")
+    parser.add_argument('--workers', type=int, default=3)
+    parser.add_argument('--threads', type=int, default=2, help="Threads per gthread worker (wsgi)")
+    parser.add_argument('--users', type=int, default=50, help="Distinct Google accounts signing in")
+    parser.add_argument('--only', choices=list(SERVERS), help="Run one server only")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help="Result file (default: benchmarks/results/...)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    names = list(TRAFFIC_MIX)
+    plan = rng.choices(names, weights=[TRAFFIC_MIX[name][0] for name in names], k=args.warmup + args.requests)
+
+    upstream, upstream_url = start_upstream(args.latency, args.users)
+    print(f"🐢 Upstream at {upstream_url} answering in {args.latency * 1000:.0f} ms")
+
+    reports = {}
+    try:
+        for kind in [args.only] if args.only else list(SERVERS):
+            process, base_url = start_server(kind, args, upstream_url)
+            try:
+                run_load(base_url, plan[:args.warmup], args.concurrency)
+                reports[kind] = run_load(base_url, plan[args.warmup:], args.concurrency)
+            finally:
+                process.terminate()
+                process.wait()
+            print_report(kind, reports[kind])
+    finally:
+        upstream.shutdown()
+
+    if len(reports) == 2:
+        ratio = reports['asgi']['overall']['throughput_rps'] / max(reports['wsgi']['overall']['throughput_rps'], 0.1)
+        print(f"\n📊 ASGI throughput is {ratio:.2f}x WSGI at concurrency {args.concurrency}")
+
+    path = write_results('asgi_throughput', {
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'upstream_latency_s': args.latency,
+        'workers': args.workers,
+        'threads': args.threads,
+        'servers': reports,
+    }, args.output)
+    print(f"\n💾 Results written to {path}")
+
+
+if __name__ == '__main__':
+    main()
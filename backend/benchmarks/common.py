@@ -0,0 +1,108 @@
+# benchmarks/common.py
+"""Shared helpers for the benchmark scripts (Django setup, stats, result files)"""
+
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+
+def setup_django():
+    """Configure Django the same way manage.py does"""
+    sys.path.insert(0, str(BACKEND_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nextshopsphere.settings')
+    import django
+    django.setup()
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, math.ceil(pct / 100 * len(values)) - 1))
+    return values[rank]
+
+
+def summarize(latencies_ms):
+    ordered = sorted(latencies_ms)
+    if not ordered:
+        return {'count': 0}
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered), 2),
+        'p50_ms': round(percentile(ordered, 50), 2),
+        'p95_ms': round(percentile(ordered, 95), 2),
+        'p99_ms': round(percentile(ordered, 99), 2),
+        'max_ms': round(ordered[-1], 2),
+    }
+
+
+def rss_mb(pid=None):
+    """Current resident set size in MB (Linux /proc; falls back to peak RSS)"""
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024), 1)
+    except (OSError, ValueError, AttributeError):
+        if pid:
+            return None
+        try:
+            import resource
+        except ImportError:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=BACKEND_DIR, stderr=subprocess.DEVNULL, text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def write_results(name, payload, output=None):
+    """Write a result document and return its path"""
+    payload = {
+        'benchmark': name,
+        'revision': git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        **payload,
+    }
+    if output:
+        path = Path(output)
+    else:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        path = RESULTS_DIR / f"{name}-{payload['revision']}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    path.write_text(json.dumps(payload, indent=2, default=str), encoding='utf-8')
+    return path
+
+
+def load_results(path):
+    return json.loads(Path(path).read_text(encoding='utf-8'))
+
+
+def print_comparison(current, baseline, metric='p95_ms'):
+    """Print per-scenario deltas of `metric` between two result documents"""
+    print(f"\n📊 {metric} vs baseline {baseline.get('revision')} ({baseline.get('timestamp')})")
+    base = baseline.get('scenarios', {})
+    for name, stats in sorted(current.get('scenarios', {}).items()):
+        old = base.get(name, {}).get(metric)
+        new = stats.get(metric)
+        if old is None or new is None:
+            print(f"  {name:<32} {new!s:>10}   (no baseline)")
+            continue
+        change = ((new - old) / old * 100) if old else 0.0
+        marker = '🔺' if change > 10 else ('🔻' if change < -10 else '  ')
+        print(f"  {name:<32} {old:>10.2f} -> {new:>10.2f}  {change:+6.1f}% {marker}")
@@ -0,0 +1,120 @@
+# benchmarks/db_connections.py
+"""
+Connection setup cost per request.
+
+Replays the database side of a request -- request_started, a couple of
+typical catalog queries, request_finished -- against the configured
+database, once per connection strategy:
+
+  per-request  CONN_MAX_AGE=0: connect and disconnect on every request
+  persistent   CONN_MAX_AGE=600: the connection outlives the request
+  pooled       Postgres / MySQL with OPTIONS['pool']: borrowed from and
+               returned to the pool (only when the configured database has one)
+
+and reports connect time and total time per request. Django's own
+request signals drive connection handling, exactly as under a server.
+--thread-per-request runs each request on a new thread, as the ASGI handler
+does: connections are per thread, so only a pool is reused there.
+
+Run from backend/ against whatever DATABASE_URL / DB_* point at:
+
+    python -m benchmarks.db_connections --requests 500
+    DB_POOL=False python -m benchmarks.db_connections      # without the pool
+    python -m benchmarks.db_connections --thread-per-request
+"""
+
+import argparse
+import threading
+import time
+
+from benchmarks.common import setup_django, summarize, write_results
+
+setup_django()
+
+from django.core import signals  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from products.models import Product  # noqa: E402
+
+
+def strategies():
+    pooled = bool(connection.settings_dict.get('OPTIONS', {}).get('pool'))
+    if pooled:
+        return {'pooled': 0}
+    return {'per-request': 0, 'persistent': 600}
+
+
+def one_request():
+    """Connect (or reuse), run two catalog queries; returns (connect_ms, total_ms)"""
+    started = time.perf_counter()
+    signals.request_started.send(sender=None)
+    connection.ensure_connection()
+    connected = time.perf_counter()
+    list(Product.objects.filter(is_available=True).values_list('id', 'slug')[:12])
+    Product.objects.filter(featured=True).exists()
+    signals.request_finished.send(sender=None)
+    finished = time.perf_counter()
+    return (connected - started) * 1000, (finished - started) * 1000
+
+
+def on_new_thread():
+    """one_request() on a thread of its own, like a request's sync work under ASGI"""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(one_request()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def run(name, max_age, requests, warmup, thread_per_request=False):
+    request = on_new_thread if thread_per_request else one_request
+    connection.close()
+    # Every thread's connection shares this settings dict
+    connection.settings_dict['CONN_MAX_AGE'] = max_age
+    for _ in range(warmup):
+        request()
+    connect_ms, total_ms = [], []
+    for _ in range(requests):
+        connect, total = request()
+        connect_ms.append(connect)
+        total_ms.append(total)
+    connection.close()
+    result = {'connect': summarize(connect_ms), 'request': summarize(total_ms)}
+    print(
+        f"  {name:<12} connect p50 {result['connect']['p50_ms']:>7.2f} ms  p95 {result['connect']['p95_ms']:>7.2f} ms"
+        f"   request p50 {result['request']['p50_ms']:>7.2f} ms  p95 {result['request']['p95_ms']:>7.2f} ms"
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--thread-per-request', action='store_true', help="A new thread per request, as under ASGI")
+    parser.add_argument('--output', help="Result file (default: benchmarks/results/...)")
+    args = parser.parse_args()
+
+    settings_dict = connection.settings_dict
+    print(f"🔌 {connection.vendor} at {settings_dict.get('HOST') or settings_dict.get('NAME')}")
+    results = {
+        name: run(name, max_age, args.requests, args.warmup, args.thread_per_request)
+        for name, max_age in strategies().items()
+    }
+
+    if 'per-request' in results:
+        saved = results['per-request']['request']['mean_ms'] - results['persistent']['request']['mean_ms']
+        print(f"\n📊 Reusing the connection saves {saved:.2f} ms per request")
+
+    path = write_results('db_connections', {
+        'database': connection.vendor,
+        'options': {key: str(value) for key, value in settings_dict.get('OPTIONS', {}).items()},
+        'requests': args.requests,
+        'thread_per_request': args.thread_per_request,
+        'strategies': results,
+    }, args.output)
+    print(f"\n💾 Results written to {path}")
+
+
+if __name__ == '__main__':
+    main()
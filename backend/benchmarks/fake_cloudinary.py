@@ -0,0 +1,100 @@
+# benchmarks/fake_cloudinary.py
+"""
+A stand-in for Cloudinary's upload API, for exercising sync_media locally.
+
+Accepts POST /v1_1/<cloud>/image/upload, reads the multipart body, waits
+--latency seconds (to mimic a real round trip) and answers with the fields
+sync_media uses. --fail-rate makes a share of requests return 500, to try
+out resuming. Nothing is stored.
+
+    python -m benchmarks.fake_cloudinary --port 8765 --latency 0.2
+    python manage.py sync_media --api-url http://127.0.0.1:8765 --workers 16
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+UPLOAD_PATH = re.compile(r'^/v1_1/(?P<cloud>[^/]+)/image/upload$')
+
+
+class Stats:
+    lock = threading.Lock()
+    requests = 0
+    bytes = 0
+
+
+def make_handler(latency, fail_rate):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            match = UPLOAD_PATH.match(self.path)
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length)
+            with Stats.lock:
+                Stats.requests += 1
+                Stats.bytes += len(body)
+
+            if not match:
+                return self.reply(404, {'error': {'message': 'Not found'}})
+            time.sleep(latency)
+            if random.random() < fail_rate:
+                return self.reply(500, {'error': {'message': 'Injected failure'}})
+
+            folder = self.field(body, 'folder') or ''
+            public_id = self.field(body, 'public_id') or f'{time.time_ns():x}'
+            if folder:
+                public_id = f'{folder}/{public_id}'
+            cloud = match['cloud']
+            self.reply(200, {
+                'public_id': public_id,
+                'version': int(time.time()),
+                'resource_type': 'image',
+                'format': 'jpg',
+                'bytes': length,
+                'secure_url': f'https://res.cloudinary.com/{cloud}/image/upload/{public_id}.jpg',
+                'url': f'http://res.cloudinary.com/{cloud}/image/upload/{public_id}.jpg',
+            })
+
+        @staticmethod
+        def field(body, name):
+            match = re.search(rb'name="' + name.encode() + rb'"\r\n\r\n([^\r]*)\r\n', body)
+            return match.group(1).decode() if match else None
+
+        def reply(self, status, payload):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.2, help="Seconds per upload")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="Share of uploads answered with a 500")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.latency, args.fail_rate))
+    print(f"☁️  Fake Cloudinary on http://{args.host}:{args.port} (latency {args.latency}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"\n{Stats.requests} uploads, {Stats.bytes / (1024 * 1024):.1f} MB received")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+# benchmarks/promo_fanout.py
+"""
+Promo fan-out benchmark.
+
+Sends a promo to --recipients users through alerts.fanout (streamed ids,
+chunked bulk_create, per-chunk counter UPDATE) and reports throughput,
+per-chunk latency and peak memory. A probe thread meanwhile runs the
+badge-style primary-key lookup a live request would do, to show how much
+the fan-out slows concurrent traffic at a given --rate.
+
+If there are fewer active users than --recipients the user ids are cycled,
+so 1M notifications can be measured without 1M accounts (seed users with
+`python manage.py generate_catalog --users 100000 ...`).
+
+Run from backend/:
+
+    python -m benchmarks.promo_fanout --recipients 1000000 --rate 0
+    python -m benchmarks.promo_fanout --recipients 200000 --rate 20000
+
+The benchmark's notifications are deleted afterwards (pk-range batches)
+and the unread counters reconciled, unless --keep is given.
+"""
+
+import argparse
+import itertools
+import threading
+import time
+
+from benchmarks.common import rss_mb, setup_django, summarize, write_results
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from alerts.counters import reconcile_counters  # noqa: E402
+from alerts.fanout import fan_out, segment_user_ids  # noqa: E402
+from alerts.models import NotificationCounter, UserNotification  # noqa: E402
+
+MARKER = 'benchmark-promo'
+
+
+def recipients(count, chunk_size):
+    """First `count` ids from the 'all' segment, cycling if there are fewer users"""
+    def cycle():
+        while True:
+            produced = False
+            for user_id in segment_user_ids('all', chunk_size=chunk_size):
+                produced = True
+                yield user_id
+            if not produced:
+                return
+    return itertools.islice(cycle(), count)
+
+
+class Probe(threading.Thread):
+    """Measures a live-request style lookup while the fan-out runs"""
+
+    def __init__(self, interval):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.latencies = []
+        self.stopped = threading.Event()
+
+    def run(self):
+        user_id = NotificationCounter.objects.values_list('user_id', flat=True).first() or 0
+        try:
+            while not self.stopped.is_set():
+                started = time.perf_counter()
+                NotificationCounter.objects.filter(user_id=user_id).values_list('unread', flat=True).first()
+                self.latencies.append((time.perf_counter() - started) * 1000)
+                self.stopped.wait(self.interval)
+        finally:
+            connection.close()
+
+
+def cleanup(first_id, batch_size=10000):
+    deleted = 0
+    last_id = UserNotification.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    for start in range(first_id, last_id + 1, batch_size):
+        deleted += UserNotification.objects.filter(
+            id__gte=start, id__lt=start + batch_size, title=MARKER,
+        ).delete()[0]
+    reconcile_counters()
+    return deleted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--recipients', type=int, default=1_000_000)
+    parser.add_argument('--chunk-size', type=int, default=settings.PROMO_FANOUT_CHUNK_SIZE)
+    parser.add_argument('--rate', type=int, default=0, help="Rows/second ceiling (0 = unthrottled)")
+    parser.add_argument('--probe-interval', type=float, default=0.05)
+    parser.add_argument('--keep', action='store_true', help="Keep the generated notifications")
+    parser.add_argument('--output', help="Result file (default: benchmarks/results/...)")
+    args = parser.parse_args()
+
+    first_id = (UserNotification.objects.order_by('-id').values_list('id', flat=True).first() or 0) + 1
+    chunk_ms = []
+    last = [time.monotonic()]
+
+    def progress(sent, elapsed):
+        now = time.monotonic()
+        chunk_ms.append((now - last[0]) * 1000)
+        last[0] = now
+        if len(chunk_ms) % 50 == 0:
+            print(f"  … {sent:,} sent ({sent / elapsed:,.0f}/s)")
+
+    probe = Probe(args.probe_interval)
+    probe.start()
+    rss_before = rss_mb()
+    started = time.monotonic()
+    sent = fan_out(
+        recipients(args.recipients, args.chunk_size), MARKER, "Benchmark promotion.",
+        chunk_size=args.chunk_size, rate=args.rate, progress=progress,
+    )
+    wall = time.monotonic() - started
+    probe.stopped.set()
+    probe.join()
+    rss_after = rss_mb()
+
+    print(f"  ✓ {sent:,} notifications in {wall:.1f}s ({sent / wall:,.0f}/s), RSS {rss_before} -> {rss_after} MB")
+
+    deleted = None
+    if not args.keep:
+        cleanup_started = time.monotonic()
+        deleted = cleanup(first_id)
+        print(f"  ✓ cleaned up {deleted:,} rows in {time.monotonic() - cleanup_started:.1f}s")
+
+    payload = {
+        'database': connection.vendor,
+        'recipients': sent,
+        'chunk_size': args.chunk_size,
+        'rate_limit': args.rate,
+        'wall_seconds': round(wall, 2),
+        'rows_per_second': round(sent / wall) if wall else None,
+        'chunk_latency': summarize(chunk_ms),
+        'probe_latency': summarize(probe.latencies),
+        'rss_before_mb': rss_before,
+        'rss_after_mb': rss_after,
+        'cleaned_up': deleted,
+    }
+    path = write_results('promo_fanout', payload, args.output)
+    print(f"\n💾 Results written to {path}")
+
+
+if __name__ == '__main__':
+    main()
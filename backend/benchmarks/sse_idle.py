@@ -0,0 +1,194 @@
+# benchmarks/sse_idle.py
+"""
+Idle SSE subscriber benchmark for /api/notifications/stream/.
+
+In-process mode drives the real alerts.stream.event_stream generators for
+thousands of simulated users on one event loop and reports memory per idle
+subscriber, publish->receive latency for events fanned out from another
+thread (the way request threads publish), and the cost of one database
+fallback poll over all connected users.
+
+Live mode opens raw HTTP connections against a running ASGI server and
+checks how many stay established and keep receiving heartbeats.
+
+Run from backend/:
+
+    python -m benchmarks.sse_idle --subscribers 5000 --events 2000
+    python -m benchmarks.sse_idle --base-url http://127.0.0.1:8000 --token <access> \\
+        --subscribers 2000 --duration 60
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from benchmarks.common import rss_mb, setup_django, summarize, write_results
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+
+from alerts.broker import broker  # noqa: E402
+from alerts.stream import DatabasePoller, event_stream  # noqa: E402
+
+
+# ============ IN-PROCESS ============
+
+async def consume(user_id, received, ready):
+    stream = event_stream(user_id, last_notification_id=0)
+    await stream.__anext__()  # retry: line, subscription is registered
+    ready.release()
+    async for chunk in stream:
+        if chunk.startswith('event: bench'):
+            data = json.loads(chunk.split('data: ', 1)[1])
+            received.append((time.perf_counter() - data['sent']) * 1000)
+
+
+def publisher(user_ids, events, rng, done):
+    for _ in range(events):
+        broker.publish(rng.choice(user_ids), 'bench', {'sent': time.perf_counter()})
+        time.sleep(0.0005)
+    done.set()
+
+
+async def run_in_process(args):
+    rng = random.Random(args.seed)
+    user_ids = list(range(1, args.subscribers + 1))
+    # Keep connections open for the whole run
+    settings.ALERTS_STREAM_MAX_SECONDS = 24 * 3600
+
+    rss_before = rss_mb()
+    received = []
+    ready = asyncio.Semaphore(0)
+    started = time.perf_counter()
+    tasks = [asyncio.create_task(consume(user_id, received, ready)) for user_id in user_ids]
+    for _ in user_ids:
+        await ready.acquire()
+    connect_s = time.perf_counter() - started
+    rss_idle = rss_mb()
+    print(f"  ✓ {args.subscribers:,} subscribers connected in {connect_s:.2f}s, RSS {rss_before} -> {rss_idle} MB")
+
+    # Publish from a separate thread, as request handlers do
+    done = threading.Event()
+    thread = threading.Thread(target=publisher, args=(user_ids, args.events, rng, done), daemon=True)
+    thread.start()
+    while not done.is_set():
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(0.5)
+    print(f"  ✓ {len(received):,}/{args.events:,} events delivered")
+
+    # One fallback poll covering every connected user
+    poller = DatabasePoller(settings.ALERTS_STREAM_POLL_INTERVAL)
+    poll_ms = []
+    for _ in range(args.polls):
+        poll_started = time.perf_counter()
+        await asyncio.to_thread(poller.poll)
+        poll_ms.append((time.perf_counter() - poll_started) * 1000)
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    per_subscriber_kb = None
+    if rss_before is not None and rss_idle is not None:
+        per_subscriber_kb = round((rss_idle - rss_before) * 1024 / args.subscribers, 2)
+
+    return {
+        'subscribers': args.subscribers,
+        'connect_seconds': round(connect_s, 3),
+        'rss_before_mb': rss_before,
+        'rss_idle_mb': rss_idle,
+        'kb_per_subscriber': per_subscriber_kb,
+        'events_published': args.events,
+        'events_delivered': len(received),
+        'delivery_latency': summarize(received),
+        'fallback_poll': summarize(poll_ms[1:] or poll_ms),
+    }
+
+
+# ============ LIVE ============
+
+async def open_stream(host, port, path, token, stats, duration):
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        stats['failed'] += 1
+        return
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAuthorization: Bearer {token}\r\n"
+        f"Accept: text/event-stream\r\nConnection: keep-alive\r\n\r\n".encode()
+    )
+    await writer.drain()
+    try:
+        status_line = await asyncio.wait_for(reader.readline(), timeout=30)
+        if b' 200 ' not in status_line:
+            stats['failed'] += 1
+            return
+        stats['established'] += 1
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            line = await asyncio.wait_for(reader.readline(), timeout=deadline - time.monotonic())
+            if not line:
+                stats['dropped'] += 1
+                return
+            if line.startswith(b': ping'):
+                stats['heartbeats'] += 1
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        writer.close()
+
+
+async def run_live(args):
+    url = urlsplit(args.base_url)
+    host, port = url.hostname, url.port or 80
+    stats = {'established': 0, 'failed': 0, 'dropped': 0, 'heartbeats': 0}
+    started = time.perf_counter()
+    tasks = []
+    for _ in range(args.subscribers):
+        tasks.append(asyncio.create_task(
+            open_stream(host, port, '/api/notifications/stream/', args.token, stats, args.duration)
+        ))
+        if len(tasks) % 200 == 0:
+            await asyncio.sleep(0.05)  # don't SYN-flood the listener
+    await asyncio.gather(*tasks)
+    print(f"  ✓ {stats['established']:,} established, {stats['failed']:,} failed, {stats['dropped']:,} dropped")
+    return {
+        'subscribers': args.subscribers,
+        'duration_seconds': args.duration,
+        'wall_seconds': round(time.perf_counter() - started, 2),
+        **stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--subscribers', type=int, default=2000)
+    parser.add_argument('--events', type=int, default=1000, help="Events to publish (in-process)")
+    parser.add_argument('--polls', type=int, default=5, help="Fallback polls to time (in-process)")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--base-url', help="Open real connections to a running ASGI server")
+    parser.add_argument('--token', help="JWT access token for live mode")
+    parser.add_argument('--duration', type=int, default=30, help="Seconds to hold live connections")
+    parser.add_argument('--output', help="Result file (default: benchmarks/results/...)")
+    args = parser.parse_args()
+
+    if args.base_url:
+        if not args.token:
+            parser.error("--token is required with --base-url")
+        mode = 'live'
+        result = asyncio.run(run_live(args))
+    else:
+        mode = 'in-process'
+        result = asyncio.run(run_in_process(args))
+
+    path = write_results('sse_idle', {'mode': mode, **result}, args.output)
+    print(f"\n💾 Results written to {path}")
+
+
+if __name__ == '__main__':
+    main()
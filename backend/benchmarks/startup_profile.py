@@ -0,0 +1,206 @@
+# benchmarks/startup_profile.py
+"""
+Process startup: import-time profile and boot budgets.
+
+Three measurements, each in fresh subprocesses:
+
+  imports  python -X importtime of django.setup() plus loading the URLconf
+           (what every worker does before its first response). The raw log
+           is kept next to the JSON result; the report lists the slowest
+           packages and modules and any LAZY_MODULES that were imported.
+  check    wall time of `manage.py check`
+  boot     gunicorn (gunicorn.conf.py, one worker) from exec until
+           /api/health/ answers
+
+Exits 1 when check or boot exceeds its budget (median of --runs) or a lazy
+module was loaded at startup, so it can gate a CI job. The test suite checks
+the lazy modules on every run; it times check and boot (once each) only
+with STARTUP_BUDGET_TESTS=1.
+
+Run from backend/:
+
+    python -m benchmarks.startup_profile
+    python -m benchmarks.startup_profile --check-budget 3 --boot-budget 6 --runs 5
+"""
+
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+import requests
+
+from benchmarks.common import BACKEND_DIR, RESULTS_DIR, git_revision, write_results
+
+# Only needed by particular requests, so they must stay out of startup
+LAZY_MODULES = [
+    'cloudinary.api',          # admin API calls, none at runtime
+    'drf_spectacular.views',   # /api/schema/, /api/docs/, /api/redoc/
+]
+
+# Seconds; the median of --runs must stay under them (nextshopsphere/tests.py checks one run)
+CHECK_BUDGET_SECONDS = 5.0
+BOOT_BUDGET_SECONDS = 10.0
+
+STARTUP_CODE = (
+    "import django; django.setup(); "
+    "from django.urls import get_resolver; get_resolver().url_patterns"
+)
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+# ============ IMPORTS ============
+
+def profile_imports():
+    """Run the startup under -X importtime; returns (modules, raw log)"""
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE='nextshopsphere.settings')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_CODE],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode:
+        sys.exit(f"Startup failed:\n{result.stderr[-2000:]}")
+
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                'module': name,
+                'self_ms': int(self_us) / 1000,
+                'cumulative_ms': int(cumulative_us) / 1000,
+                'depth': len(indent),
+            })
+    # Nesting is shown by indentation; the shallowest lines are the direct imports
+    shallowest = min((entry['depth'] for entry in modules), default=0)
+    for entry in modules:
+        entry['top_level'] = entry.pop('depth') == shallowest
+    return modules, result.stderr
+
+
+def summarize_imports(modules, top):
+    by_package = defaultdict(float)
+    for entry in modules:
+        by_package[entry['module'].split('.')[0]] += entry['self_ms']
+    total = sum(entry['cumulative_ms'] for entry in modules if entry['top_level'])
+    loaded = {entry['module'] for entry in modules}
+    return {
+        'total_ms': round(total, 1),
+        'modules': len(modules),
+        'packages': [
+            {'package': name, 'self_ms': round(ms, 1)}
+            for name, ms in sorted(by_package.items(), key=lambda item: -item[1])[:top]
+        ],
+        'slowest_modules': [
+            {'module': entry['module'], 'cumulative_ms': round(entry['cumulative_ms'], 1)}
+            for entry in sorted(modules, key=lambda entry: -entry['cumulative_ms'])[:top]
+        ],
+        'lazy_modules_loaded': [name for name in LAZY_MODULES if name in loaded],
+    }
+
+
+# ============ CHECK / BOOT ============
+
+def time_check():
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, 'manage.py', 'check'],
+        cwd=BACKEND_DIR, check=True, stdout=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - started
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def time_boot(timeout=60):
+    port = free_port()
+    env = dict(
+        os.environ,
+        PORT=str(port),
+        WEB_CONCURRENCY='1',
+        GUNICORN_LOG_LEVEL='warning',
+        SECURE_SSL_REDIRECT='False',
+    )
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py', '--access-logfile', '/dev/null'],
+        cwd=BACKEND_DIR, env=env,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                requests.get(f'http://127.0.0.1:{port}/api/health/', timeout=1)
+                return time.perf_counter() - started
+            except requests.ConnectionError:
+                time.sleep(0.05)
+        sys.exit(f"gunicorn did not answer within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def measure(name, fn, runs, budget):
+    times = [fn() for _ in range(runs)]
+    median = statistics.median(times)
+    within = median <= budget
+    print(
+        f"{'✅' if within else '❌'} {name:<6} median {median:.2f}s over {runs} runs "
+        f"(min {min(times):.2f}s, budget {budget:.2f}s)"
+    )
+    return {'runs_s': [round(t, 3) for t in times], 'median_s': round(median, 3), 'budget_s': budget, 'within': within}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--check-budget', type=float, default=CHECK_BUDGET_SECONDS, help="Seconds for manage.py check")
+    parser.add_argument('--boot-budget', type=float, default=BOOT_BUDGET_SECONDS, help="Seconds until a worker answers")
+    parser.add_argument('--top', type=int, default=15, help="Packages/modules listed in the report")
+    parser.add_argument('--skip-boot', action='store_true', help="No gunicorn run (e.g. no free port in CI)")
+    parser.add_argument('--output', help="Result file (default: benchmarks/results/...)")
+    args = parser.parse_args()
+
+    modules, raw = profile_imports()
+    imports = summarize_imports(modules, args.top)
+    RESULTS_DIR.mkdir(exist_ok=True)
+    log_path = RESULTS_DIR / f"startup_importtime-{git_revision()}-{time.strftime('%Y%m%d-%H%M%S')}.log"
+    log_path.write_text(raw, encoding='utf-8')
+
+    print(f"📦 {imports['modules']} modules imported in {imports['total_ms']:.0f} ms (raw log: {log_path})")
+    for entry in imports['packages']:
+        print(f"  {entry['package']:<32} {entry['self_ms']:>8.1f} ms")
+    print("\n🐢 Slowest imports (cumulative)")
+    for entry in imports['slowest_modules']:
+        print(f"  {entry['module']:<48} {entry['cumulative_ms']:>8.1f} ms")
+    for name in imports['lazy_modules_loaded']:
+        print(f"❌ {name} is imported at startup")
+    print()
+
+    budgets = {'check': measure('check', time_check, args.runs, args.check_budget)}
+    if not args.skip_boot:
+        budgets['boot'] = measure('boot', time_boot, args.runs, args.boot_budget)
+
+    path = write_results('startup_profile', {
+        'imports': imports,
+        'importtime_log': str(log_path),
+        'budgets': budgets,
+    }, args.output)
+    print(f"\n💾 Results written to {path}")
+
+    if imports['lazy_modules_loaded'] or not all(entry['within'] for entry in budgets.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+# benchmarks/worker_memory.py
+"""
+Memory per gunicorn worker, with and without preload.
+
+Starts gunicorn with gunicorn.conf.py (only the listed settings are
+overridden through the environment), warms every worker with catalog
+requests, then reads /proc/<pid>/smaps_rollup for the master and each
+worker:
+
+  RSS  resident pages, shared ones counted in every process
+  PSS  shared pages split between the processes sharing them; the sum is
+       what the server really costs
+  USS  pages private to the process; what one more worker would add
+
+Preloading imports Django in the master so workers share those pages
+copy-on-write; the difference shows up as lower USS per worker and lower
+total PSS. Linux only.
+
+Run from backend/ (seed data first for realistic warm-up):
+
+    python -m benchmarks.worker_memory --workers 4
+    python -m benchmarks.worker_memory --workers 4 --worker-class gthread --only preload
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.common import BACKEND_DIR, write_results
+
+WARM_PATHS = [
+    '/api/products/',
+    '/api/products/featured/',
+    '/api/categories/tree/',
+    '/api/brands/',
+    '/api/reviews/',
+]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def smaps(pid):
+    """{'rss_mb', 'pss_mb', 'uss_mb'} from smaps_rollup"""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[-1] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    private = fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    return {
+        'rss_mb': round(fields.get('Rss', 0) / 1024, 1),
+        'pss_mb': round(fields.get('Pss', 0) / 1024, 1),
+        'uss_mb': round(private / 1024, 1),
+    }
+
+
+def start(args, preload, metrics_file):
+    port = free_port()
+    env = dict(
+        os.environ,
+        PORT=str(port),
+        WEB_CONCURRENCY=str(args.workers),
+        GUNICORN_PRELOAD=str(preload),
+        GUNICORN_WORKER_CLASS=args.worker_class,
+        GUNICORN_MAX_REQUESTS='0',  # no recycling mid-measurement
+        GUNICORN_METRICS_FILE=metrics_file,
+        GUNICORN_LOG_LEVEL='warning',
+        SECURE_SSL_REDIRECT='False',
+    )
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py', '--access-logfile', '/dev/null'],
+        cwd=BACKEND_DIR, env=env,
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f'{base_url}/api/health/', timeout=1)
+            return process, base_url
+        except requests.ConnectionError:
+            time.sleep(0.25)
+    process.terminate()
+    sys.exit("gunicorn did not start within 60s")
+
+
+def worker_pids(metrics_file, expected):
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with open(metrics_file) as f:
+                pids = json.load(f).get('worker_pids', [])
+        except (OSError, ValueError):
+            pids = []
+        if len(pids) >= expected:
+            return pids
+        time.sleep(0.25)
+    return pids
+
+
+def measure(args, preload):
+    with tempfile.TemporaryDirectory() as tmp:
+        metrics_file = os.path.join(tmp, 'gunicorn-metrics.json')
+        process, base_url = start(args, preload, metrics_file)
+        try:
+            session = requests.Session()
+            paths = WARM_PATHS * args.warm
+            # Enough parallel requests that every worker serves some
+            with ThreadPoolExecutor(max_workers=args.workers * 4) as pool:
+                list(pool.map(lambda path: session.get(base_url + path, timeout=60), paths))
+            time.sleep(1)
+
+            pids = worker_pids(metrics_file, args.workers)
+            master = smaps(process.pid)
+            workers = [smaps(pid) for pid in pids]
+        finally:
+            process.terminate()
+            process.wait()
+
+    per_worker_uss = round(sum(w['uss_mb'] for w in workers) / len(workers), 1) if workers else None
+    total_pss = round(master['pss_mb'] + sum(w['pss_mb'] for w in workers), 1)
+    label = 'preload' if preload else 'no-preload'
+    print(f"\n{label}: master RSS {master['rss_mb']} MB, {len(workers)} workers")
+    for pid, stats in zip(pids, workers):
+        print(f"  worker {pid:<8} RSS {stats['rss_mb']:>7} MB  PSS {stats['pss_mb']:>7} MB  USS {stats['uss_mb']:>7} MB")
+    print(f"  total PSS {total_pss} MB, mean USS per worker {per_worker_uss} MB")
+    return {
+        'master': master,
+        'workers': workers,
+        'total_pss_mb': total_pss,
+        'mean_worker_uss_mb': per_worker_uss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--worker-class', default='uvicorn_worker.UvicornWorker')
+    parser.add_argument('--warm', type=int, default=20, help="Rounds of warm-up requests")
+    parser.add_argument('--only', choices=['preload', 'no-preload'])
+    parser.add_argument('--output', help="Result file (default: benchmarks/results/...)")
+    args = parser.parse_args()
+
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        sys.exit("Needs Linux /proc/<pid>/smaps_rollup")
+
+    modes = {'preload': True, 'no-preload': False}
+    if args.only:
+        modes = {args.only: modes[args.only]}
+    results = {label: measure(args, preload) for label, preload in modes.items()}
+
+    if len(results) == 2:
+        saved = results['no-preload']['total_pss_mb'] - results['preload']['total_pss_mb']
+        print(f"\n📊 Preload saves {saved:.1f} MB across {args.workers} workers")
+
+    path = write_results('worker_memory', {
+        'workers': args.workers,
+        'worker_class': args.worker_class,
+        'modes': results,
+    }, args.output)
+    print(f"\n💾 Results written to {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+# gunicorn.conf.py
+"""
+Gunicorn settings for every deployment (Dockerfile, Dockerfile.prod,
+docker-compose.prod.yml); gunicorn picks this file up from backend/.
+
+Environment overrides:
+
+  PORT / GUNICORN_BIND        listen address (default 0.0.0.0:8000)
+  WEB_CONCURRENCY             workers (default: 2 x CPUs + 1, capped by GUNICORN_MAX_WORKERS)
+  GUNICORN_WORKER_CLASS       uvicorn_worker.UvicornWorker (ASGI, default) or gthread (WSGI)
+  GUNICORN_THREADS            threads per gthread worker
+  GUNICORN_PRELOAD            import Django once in the master (default True)
+  GUNICORN_MAX_REQUESTS       recycle a worker after this many requests (0 = never)
+  GUNICORN_MAX_REQUESTS_JITTER
+  GUNICORN_TIMEOUT / GUNICORN_GRACEFUL_TIMEOUT / GUNICORN_KEEPALIVE
+  GUNICORN_STATSD_HOST        host:port for gunicorn's built-in statsd metrics
+  GUNICORN_METRICS_FILE       JSON snapshot of worker lifecycle counters
+
+With preload the app (Django, DRF, every module it imports) is loaded
+before forking and shared copy-on-write; the master closes its database
+connections, pools and cache clients first, so no worker inherits a socket
+another process is using.
+"""
+
+import json
+import os
+import time
+
+# ============ HELPERS ============
+
+
+def env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def env_bool(name, default):
+    return str(os.environ.get(name, default)).lower() in ('true', '1', 'yes')
+
+
+def cpu_limit():
+    """CPUs this container may use: cgroup v2 quota, else CPU affinity, else cpu_count"""
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            return max(1, int(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def rss_mb(pid='self'):
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return round(int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024), 1)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+# ============ SERVER ============
+
+bind = os.environ.get('GUNICORN_BIND') or f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'uvicorn_worker.UvicornWorker')
+wsgi_app = 'nextshopsphere.wsgi:application' if worker_class in ('sync', 'gthread') else 'nextshopsphere.asgi:application'
+
+workers = env_int('WEB_CONCURRENCY', min(cpu_limit() * 2 + 1, env_int('GUNICORN_MAX_WORKERS', 8)))
+threads = env_int('GUNICORN_THREADS', 2)
+
+preload_app = env_bool('GUNICORN_PRELOAD', True)
+
+# Recycle workers to bound slow leaks; jitter keeps them from restarting together
+max_requests = env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = env_int('GUNICORN_MAX_REQUESTS_JITTER', max(1, max_requests // 10))
+
+timeout = env_int('GUNICORN_TIMEOUT', 60)
+graceful_timeout = env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = env_int('GUNICORN_KEEPALIVE', 5)
+
+# Heartbeat files in RAM rather than on the container's overlay filesystem
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+if os.environ.get('GUNICORN_STATSD_HOST'):
+    statsd_host = os.environ['GUNICORN_STATSD_HOST']
+    statsd_prefix = 'nextshopsphere'
+
+
+# ============ LIFECYCLE METRICS ============
+# The master counts spawns and exits (and logs them, and keeps a JSON
+# snapshot in GUNICORN_METRICS_FILE); each worker logs its own age,
+# requests served and RSS when it exits.
+
+METRICS_FILE = os.environ.get('GUNICORN_METRICS_FILE')
+
+metrics = {
+    'started_at': None,
+    'workers_spawned': 0,
+    'workers_exited': 0,
+    'workers_running': 0,
+    'master_rss_mb': None,
+}
+
+# Set in each worker after the fork
+_worker_started = None
+
+
+def write_metrics(server):
+    metrics['workers_running'] = len(server.WORKERS)
+    metrics['master_rss_mb'] = rss_mb()
+    if METRICS_FILE:
+        tmp = f"{METRICS_FILE}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump({**metrics, 'worker_pids': sorted(server.WORKERS)}, f)
+        os.replace(tmp, METRICS_FILE)
+
+
+def close_connections():
+    """Drop database connections, Postgres pools and cache clients held by this process"""
+    from django.apps import apps
+    if not apps.ready:
+        return
+    from django.core.cache import caches
+    from django.db import connections
+
+    for connection in connections.all(initialized_only=True):
+        connection.close()
+        if hasattr(connection, 'close_pool'):
+            connection.close_pool()
+    caches.close_all()
+
+
+# ============ HOOKS ============
+
+def when_ready(server):
+    metrics['started_at'] = time.time()
+    server.log.info(
+        f"Serving {wsgi_app} with {workers} x {worker_class}"
+        f"{f' ({threads} threads)' if worker_class == 'gthread' else ''}, "
+        f"preload={preload_app}, max_requests={max_requests}±{max_requests_jitter}, "
+        f"master RSS {rss_mb()} MB"
+    )
+    write_metrics(server)
+
+
+def pre_fork(server, worker):
+    metrics['workers_spawned'] += 1
+    if preload_app:
+        # Anything the preloaded app opened would otherwise be shared with the child
+        close_connections()
+
+
+def post_fork(server, worker):
+    global _worker_started
+    _worker_started = time.monotonic()
+    server.log.info(f"Worker {worker.pid} spawned (RSS {rss_mb()} MB)")
+
+
+def worker_abort(worker):
+    worker.log.warning(f"Worker {worker.pid} aborted by the master (timeout)")
+
+
+def worker_exit(server, worker):
+    age = time.monotonic() - _worker_started if _worker_started else 0
+    # sync/gthread workers count requests themselves; uvicorn workers don't expose it
+    served = f", {worker.nr} requests" if worker_class in ('sync', 'gthread') else ''
+    recycled = ' (max_requests reached)' if max_requests and worker.nr >= worker.max_requests else ''
+    server.log.info(f"Worker {worker.pid} exiting after {age:.0f}s{served}, RSS {rss_mb()} MB{recycled}")
+    close_connections()
+
+
+def child_exit(server, worker):
+    metrics['workers_exited'] += 1
+    write_metrics(server)
+
+
+def nworkers_changed(server, new_value, old_value):
+    if old_value is not None:
+        server.log.info(f"Workers {old_value} -> {new_value}")
+        write_metrics(server)
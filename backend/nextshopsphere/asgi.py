@@ -3,6 +3,14 @@ ASGI config for nextshopsphere project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Production serves this under gunicorn with uvicorn workers (Dockerfile.prod):
+
+    gunicorn nextshopsphere.asgi:application -k uvicorn_worker.UvicornWorker
+
+Async views (catalog shelves in products/async_views.py, Google sign-in,
+the notification stream) then wait on the database and upstream HTTP calls
+without holding a thread; sync DRF views run on asgiref's thread pool.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
@@ -12,5 +20,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nextshopsphere.settings')
+# Each request's sync work runs on a new thread, so a persistent connection
+# would be left behind with it; reuse comes from the Postgres / MySQL pools
+# (DB_POOL, nextshopsphere/databases.py) instead
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
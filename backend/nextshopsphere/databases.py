@@ -0,0 +1,151 @@
+# nextshopsphere/databases.py
+"""
+DATABASES from the environment.
+
+The connection comes from the first of:
+
+  DATABASE_URL       any dj-database-url URL (postgres://, mysql://, sqlite:///)
+  DB_HOST, ...       the variables docker-compose passes: DB_ENGINE (default
+                     mysql), DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT
+  (neither)          SQLite at BASE_DIR/db.sqlite3, for builds and local runs
+
+and is then tuned per engine:
+
+  postgresql  Django's native psycopg 3 pool (DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE,
+              DB_POOL_TIMEOUT; DB_POOL=False turns it off). A pooled
+              connection goes back to the pool at the end of each request,
+              so CONN_MAX_AGE stays 0 (Django rejects both together).
+  mysql       a process-wide pool (nextshopsphere/mysql_pool: DB_POOL_MAX_SIZE
+              idle connections, dropped after DB_POOL_MAX_IDLE seconds), or
+              with DB_POOL=False persistent connections (DB_CONN_MAX_AGE
+              seconds, default 600); utf8mb4, strict mode, READ COMMITTED.
+  sqlite      WAL journal, a busy timeout (SQLITE_BUSY_TIMEOUT seconds) and
+              IMMEDIATE transactions, so concurrent local workers queue for
+              the write lock instead of failing with "database is locked".
+
+Under ASGI each request's sync work runs on a fresh thread, so persistent
+(per-thread) connections would be orphaned; nextshopsphere/asgi.py defaults
+DB_CONN_MAX_AGE to 0 and reuse comes from the pools, which every thread of
+the process shares. With DB_POOL=False that means a new connection per
+request (benchmarks/db_connections.py --thread-per-request measures it).
+
+DATABASE_REPLICA_URLS (comma separated) adds read replicas as replica_1,
+replica_2, ... with the same tuning; their aliases are DATABASE_REPLICAS.
+"""
+
+import os
+
+import dj_database_url
+
+ENGINES = {
+    'postgresql': 'django.db.backends.postgresql',
+    'postgres': 'django.db.backends.postgresql',
+    'mysql': 'django.db.backends.mysql',
+    'sqlite': 'django.db.backends.sqlite3',
+    'sqlite3': 'django.db.backends.sqlite3',
+}
+
+DEFAULT_PORTS = {'django.db.backends.postgresql': '5432', 'django.db.backends.mysql': '3306'}
+
+
+def env_int(env, name, default):
+    try:
+        return int(env.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def env_bool(env, name, default):
+    return str(env.get(name, default)).lower() in ('true', '1', 'yes')
+
+
+def from_variables(env):
+    """Connection settings from DB_ENGINE / DB_NAME / DB_USER / DB_PASSWORD / DB_HOST / DB_PORT"""
+    engine = env.get('DB_ENGINE', 'mysql').lower()
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown DB_ENGINE {engine!r} (expected one of {', '.join(sorted(ENGINES))})")
+    engine = ENGINES[engine]
+    return {
+        'ENGINE': engine,
+        'NAME': env.get('DB_NAME', 'nextshopsphere'),
+        'USER': env.get('DB_USER', ''),
+        'PASSWORD': env.get('DB_PASSWORD', ''),
+        'HOST': env.get('DB_HOST', ''),
+        'PORT': env.get('DB_PORT', DEFAULT_PORTS.get(engine, '')),
+    }
+
+
+def tune(config, env):
+    """Engine-specific connection reuse and session settings (in place)"""
+    engine = config['ENGINE']
+    options = config.setdefault('OPTIONS', {})
+    max_age = env_int(env, 'DB_CONN_MAX_AGE', 600)
+    config['CONN_HEALTH_CHECKS'] = True
+
+    if engine == 'django.db.backends.postgresql':
+        if env_bool(env, 'DB_POOL', True):
+            options.setdefault('pool', {
+                'min_size': env_int(env, 'DB_POOL_MIN_SIZE', 2),
+                'max_size': env_int(env, 'DB_POOL_MAX_SIZE', 10),
+                'timeout': env_int(env, 'DB_POOL_TIMEOUT', 10),
+            })
+            config['CONN_MAX_AGE'] = 0
+        else:
+            config['CONN_MAX_AGE'] = max_age
+        options.setdefault('connect_timeout', 10)
+
+    elif engine == 'django.db.backends.mysql':
+        if env_bool(env, 'DB_POOL', True):
+            config['ENGINE'] = 'nextshopsphere.mysql_pool'
+            options.setdefault('pool', {
+                'max_size': env_int(env, 'DB_POOL_MAX_SIZE', 10),
+                'max_idle': env_int(env, 'DB_POOL_MAX_IDLE', 300),
+            })
+            config['CONN_MAX_AGE'] = 0
+        else:
+            config['CONN_MAX_AGE'] = max_age
+        options.setdefault('charset', 'utf8mb4')
+        options.setdefault('init_command', "SET sql_mode='STRICT_TRANS_TABLES'")
+        options.setdefault('isolation_level', 'read committed')
+        options.setdefault('connect_timeout', 10)
+
+    elif engine == 'django.db.backends.sqlite3':
+        config['CONN_MAX_AGE'] = max_age
+        options.setdefault('timeout', env_int(env, 'SQLITE_BUSY_TIMEOUT', 20))
+        options.setdefault('transaction_mode', 'IMMEDIATE')
+        options.setdefault('init_command', 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL')
+
+    return config
+
+
+def parse_url(url):
+    url = url.decode('utf-8') if isinstance(url, bytes) else url
+    return dj_database_url.parse(url.strip())
+
+
+def default_database(base_dir, env=os.environ):
+    if env.get('DATABASE_URL', '').strip():
+        config = parse_url(env['DATABASE_URL'])
+    elif env.get('DB_HOST'):
+        config = from_variables(env)
+    else:
+        config = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': base_dir / 'db.sqlite3'}
+    return tune(config, env)
+
+
+def replica_databases(env=os.environ):
+    """{alias: settings} for DATABASE_REPLICA_URLS, in the order given"""
+    replicas = {}
+    urls = [url.strip() for url in env.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    for number, url in enumerate(urls, start=1):
+        config = tune(parse_url(url), env)
+        # Tests create no separate replica databases; they read the default one
+        config['TEST'] = {'MIRROR': 'default'}
+        replicas[f'replica_{number}'] = config
+    return replicas
+
+
+def build_databases(base_dir, env=os.environ):
+    databases = {'default': default_database(base_dir, env)}
+    databases.update(replica_databases(env))
+    return databases
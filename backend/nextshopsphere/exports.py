@@ -0,0 +1,228 @@
+# nextshopsphere/exports.py
+"""
+Streaming CSV / NDJSON exports.
+
+Rows are read with ``values_list().iterator(chunk_size=...)`` and encoded one
+at a time, so memory stays flat no matter how large the table is. Used by the
+admin export endpoint (/api/exports/<dataset>/) and the ``export_data``
+management command.
+"""
+
+import csv
+import zlib
+from datetime import datetime, time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime, parse_date
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = ('csv', 'ndjson')
+
+# Target size of each chunk handed to the WSGI server / written to disk
+_WRITE_BUFFER_SIZE = 64 * 1024
+
+
+# ============ DATASETS ============
+
+def get_datasets():
+    """Map of dataset name -> (queryset factory, exported fields)"""
+    from orders.models import Order, OrderItem
+    from products.models import Product, ProductImage
+    from reviews.models import Review
+
+    return {
+        'orders': (
+            lambda: Order.objects.all(),
+            [
+                'id', 'user_id', 'user__email', 'status', 'payment_status',
+                'shipping_address', 'shipping_city', 'shipping_country', 'shipping_phone',
+                'subtotal', 'shipping_cost', 'tax', 'total', 'notes',
+                'created_at', 'updated_at',
+            ],
+        ),
+        'order_items': (
+            lambda: OrderItem.objects.all(),
+            [
+                'id', 'order_id', 'product_id', 'product_name', 'product_slug',
+                'product_price', 'quantity', 'product_image', 'created_at',
+            ],
+        ),
+        'products': (
+            lambda: Product.objects.all(),
+            [
+                'id', 'name', 'slug', 'sku', 'product_type', 'short_description',
+                'price', 'compare_price', 'stock', 'low_stock_threshold', 'is_available',
+                'category_id', 'category__slug', 'brand_id', 'brand__slug',
+                'weight', 'dimensions', 'featured', 'is_new', 'is_bestseller',
+                'created_at', 'updated_at',
+            ],
+        ),
+        'images': (
+            lambda: ProductImage.objects.all(),
+            [
+                'id', 'product_id', 'product__slug', 'image', 'alt_text',
+                'is_primary', 'order', 'created_at',
+            ],
+        ),
+        'reviews': (
+            lambda: Review.objects.all(),
+            [
+                'id', 'product_id', 'product__slug', 'user_id', 'rating', 'title',
+                'comment', 'is_verified_purchase', 'is_approved', 'created_at', 'updated_at',
+            ],
+        ),
+    }
+
+
+def iter_rows(dataset, since=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Return (fields, row iterator) for a dataset, ordered by primary key"""
+    factory, fields = get_datasets()[dataset]
+    queryset = factory()
+    if since is not None:
+        queryset = queryset.filter(created_at__gte=since)
+    rows = queryset.order_by('pk').values_list(*fields).iterator(chunk_size=chunk_size)
+    return fields, rows
+
+
+# ============ ENCODERS ============
+
+class _Echo:
+    """File-like object whose write() hands back the value (for csv.writer)"""
+
+    def write(self, value):
+        return value
+
+
+def _plain(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def iter_csv(fields, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([_plain(value) for value in row])
+
+
+def iter_ndjson(fields, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(fields, row))) + '\n'
+
+
+def iter_buffered(chunks, size=_WRITE_BUFFER_SIZE):
+    """Join many small string chunks into ~size byte blocks"""
+    buffer = []
+    buffered = 0
+    for chunk in chunks:
+        data = chunk.encode('utf-8')
+        buffer.append(data)
+        buffered += len(data)
+        if buffered >= size:
+            yield b''.join(buffer)
+            buffer = []
+            buffered = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def iter_gzip(blocks):
+    """Gzip a stream of byte blocks without holding the whole payload"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for block in blocks:
+        compressed = compressor.compress(block)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def iter_export(dataset, export_format='csv', compress=False, since=None,
+                chunk_size=EXPORT_CHUNK_SIZE):
+    """Full export pipeline: rows -> encoded text -> buffered bytes (-> gzip)"""
+    fields, rows = iter_rows(dataset, since=since, chunk_size=chunk_size)
+    encoder = iter_csv if export_format == 'csv' else iter_ndjson
+    blocks = iter_buffered(encoder(fields, rows))
+    if compress:
+        blocks = iter_gzip(blocks)
+    return blocks
+
+
+def parse_since(value):
+    """
+    Parse ?since= as an ISO datetime or date (midnight) in the current time
+    zone; None if it isn't one. Naive values are made aware.
+    """
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            if day is None:
+                return None
+            parsed = datetime.combine(day, time.min)
+    except (TypeError, ValueError):
+        # Well formed but out of range, e.g. 2025-02-30
+        return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+# ============ ADMIN EXPORT ENDPOINT ============
+
+class ExportView(APIView):
+    """
+    Stream a dataset as CSV or NDJSON (admin only).
+
+    GET /api/exports/<dataset>/?fmt=csv|ndjson&gzip=1&since=2025-01-01
+    Datasets: orders, order_items, products, images, reviews
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, dataset):
+        if dataset not in get_datasets():
+            return Response(
+                {'detail': f'Unknown dataset "{dataset}".'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        export_format = request.query_params.get('fmt', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'detail': f'fmt must be one of: {", ".join(EXPORT_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        compress = request.query_params.get('gzip', '').lower() in ('1', 'true', 'yes')
+
+        since = None
+        if request.query_params.get('since'):
+            since = parse_since(request.query_params['since'])
+            if since is None:
+                return Response(
+                    {'detail': 'since must be an ISO date or datetime, e.g. 2025-01-01 or 2025-01-01T12:00:00Z'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        content_type = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+        filename = f'{dataset}.{export_format}'
+        if compress:
+            filename += '.gz'
+
+        response = StreamingHttpResponse(
+            iter_export(dataset, export_format, compress=compress, since=since),
+            content_type='application/gzip' if compress else f'{content_type}; charset=utf-8',
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        # Keep proxies (nginx) from buffering the whole stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
@@ -0,0 +1,126 @@
+# nextshopsphere/mysql_pool/base.py
+"""
+MySQL backend with a process-wide connection pool.
+
+Django pools Postgres connections itself (OPTIONS['pool']) but not MySQL's,
+and CONN_MAX_AGE doesn't help under ASGI: a connection belongs to the thread
+that opened it, and each request's sync work runs on a new thread. Here a
+closed connection goes back to a pool shared by the process's threads and
+the next connect() on any thread takes it from there, skipping the TCP/auth
+handshake and the session setup (init_command, isolation level).
+
+OPTIONS['pool'] (set by nextshopsphere/databases.py):
+
+  max_size   idle connections kept; busier moments open extra ones, closed
+             when returned to a full pool (there is no cap on open ones)
+  max_idle   seconds an idle connection is kept; keep it below the server's
+             wait_timeout
+
+A connection returns to the pool only when it's back in autocommit mode with
+no transaction open and no unexpected errors; otherwise it's closed.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+from django.db.backends.mysql import base
+
+# Idle this long (seconds) and a connection is pinged before it's handed out
+PING_AFTER = 30
+
+
+class ConnectionPool:
+    def __init__(self, max_size, max_idle):
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.idle = deque()  # (connection, returned at); newest on the right
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+
+    def get(self):
+        """An idle connection that still answers, or None"""
+        while True:
+            with self.lock:
+                if not self.idle:
+                    return None
+                connection, returned_at = self.idle.pop()
+            idle_for = time.monotonic() - returned_at
+            if idle_for > self.max_idle:
+                self.discard(connection)
+                continue
+            if idle_for > PING_AFTER:
+                try:
+                    connection.ping(reconnect=False)
+                except base.Database.Error:
+                    self.discard(connection)
+                    continue
+            return connection
+
+    def put(self, connection):
+        """Keep a connection for reuse; False when the pool is full"""
+        with self.lock:
+            if len(self.idle) >= self.max_size:
+                return False
+            self.idle.append((connection, time.monotonic()))
+            return True
+
+    def discard(self, connection):
+        try:
+            connection.close()
+        except base.Database.Error:
+            pass
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = list(self.idle), deque()
+        for connection, _ in idle:
+            self.discard(connection)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    reused_connection = False
+
+    @property
+    def pool(self):
+        with _pools_lock:
+            pool = _pools.get(self.alias)
+            if pool is None or pool.pid != os.getpid():
+                # A forked child must not share the parent's sockets: start empty
+                options = self.settings_dict['OPTIONS'].get('pool', {})
+                pool = _pools[self.alias] = ConnectionPool(options.get('max_size', 10), options.get('max_idle', 300))
+            return pool
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        connection = self.pool.get()
+        self.reused_connection = connection is not None
+        return connection or super().get_new_connection(conn_params)
+
+    def init_connection_state(self):
+        # The session settings outlive the request; a pooled connection already has them
+        if not self.reused_connection:
+            super().init_connection_state()
+
+    def _close(self):
+        if self.connection is None:
+            return
+        clean = not (self.in_atomic_block or self.errors_occurred) and self.connection.get_autocommit()
+        if not (clean and self.pool.put(self.connection)):
+            super()._close()
+
+    def close_pool(self):
+        """Close the idle connections (gunicorn's pre_fork, via close_connections())"""
+        with _pools_lock:
+            pool = _pools.pop(self.alias, None)
+        if pool is not None:
+            pool.close()
@@ -0,0 +1,195 @@
+# nextshopsphere/querybudget.py
+"""
+Per-request SQL instrumentation and query budgets.
+
+QueryBudgetMiddleware records every query a request runs (count, total SQL
+time, duplicate fingerprints and the stack that issued each duplicate),
+reports them in a Server-Timing header and a structured log line, and
+compares the count with the view's budget from settings.QUERY_BUDGETS.
+
+In tests, wrap code in ``query_budget(n)`` (or set QUERY_BUDGET_ACTION to
+'raise') to fail on N+1 regressions.
+"""
+
+import logging
+import re
+import time
+import traceback
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('nextshopsphere.queries')
+
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+_WHITESPACE = re.compile(r'\s+')
+_PROJECT_DIR = str(settings.BASE_DIR)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a request or block runs more queries than its budget"""
+
+
+def fingerprint(sql):
+    """Normalise parameterised SQL so repeats of the same statement match"""
+    sql = _WHITESPACE.sub(' ', sql).strip()
+    return _IN_LIST.sub('IN (...)', sql)
+
+
+def _caller_stack(limit=8):
+    """Project frames (no Django/DRF internals) leading to the current query"""
+    frames = [
+        frame for frame in traceback.extract_stack()[:-3]
+        if frame.filename.startswith(_PROJECT_DIR)
+        and 'site-packages' not in frame.filename
+        and not frame.filename.endswith('querybudget.py')
+    ]
+    return [f"{frame.filename[len(_PROJECT_DIR) + 1:]}:{frame.lineno} in {frame.name}"
+            for frame in frames[-limit:]]
+
+
+class QueryRecorder:
+    """connection.execute_wrapper() hook that collects query statistics"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.seen = {}
+        self.duplicates = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            key = fingerprint(sql)
+            seen = self.seen.get(key, 0)
+            self.seen[key] = seen + 1
+            if seen:
+                # Only duplicates pay for a stack walk
+                entry = self.duplicates.setdefault(key, {'count': 1, 'stacks': []})
+                entry['count'] += 1
+                if len(entry['stacks']) < 3:
+                    entry['stacks'].append(_caller_stack())
+
+    @property
+    def duplicate_count(self):
+        return sum(entry['count'] - 1 for entry in self.duplicates.values())
+
+    def report(self, limit=5):
+        """Human readable summary of the worst duplicated statements"""
+        lines = [f"{self.count} queries in {self.duration * 1000:.1f} ms, "
+                 f"{self.duplicate_count} duplicates"]
+        worst = sorted(self.duplicates.items(), key=lambda item: -item[1]['count'])[:limit]
+        for sql, entry in worst:
+            lines.append(f"  {entry['count']}x {sql[:200]}")
+            for frame in (entry['stacks'][0] if entry['stacks'] else []):
+                lines.append(f"      {frame}")
+        return '\n'.join(lines)
+
+
+@contextmanager
+def record_queries(using=None):
+    """Record queries on one database alias (default: all of them)"""
+    recorder = QueryRecorder()
+    aliases = [using] if using else list(connections)
+    with ExitStack() as stack:
+        for alias in aliases:
+            stack.enter_context(connections[alias].execute_wrapper(recorder))
+        yield recorder
+
+
+@contextmanager
+def query_budget(limit, using=None):
+    """
+    Test helper: fail if the block runs more than `limit` queries.
+
+        with query_budget(3):
+            client.get('/api/categories/tree/')
+    """
+    with record_queries(using) as recorder:
+        yield recorder
+    if recorder.count > limit:
+        raise QueryBudgetExceeded(f"Query budget {limit} exceeded:\n{recorder.report()}")
+
+
+def budget_for(view_name):
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    return budgets.get(view_name, getattr(settings, 'QUERY_BUDGET_DEFAULT', None))
+
+
+class QueryBudgetMiddleware:
+    """Instrument each request's SQL and enforce per-view query budgets"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_BUDGET_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.action = getattr(settings, 'QUERY_BUDGET_ACTION', 'warn')
+        self.server_timing = getattr(settings, 'QUERY_BUDGET_SERVER_TIMING', settings.DEBUG)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with record_queries() as recorder:
+            response = self.get_response(request)
+        return self.finish(request, response, recorder)
+
+    async def __acall__(self, request):
+        # Under ASGI the async ORM (and sync views) run on the request's
+        # thread-sensitive sync thread, with that thread's connections, so
+        # the recorder is installed and removed there.
+        stack = ExitStack()
+        recorder = await sync_to_async(stack.enter_context)(record_queries())
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.finish(request, response, recorder)
+
+    def finish(self, request, response, recorder):
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else None
+        budget = budget_for(view_name) if view_name else None
+        over_budget = budget is not None and recorder.count > budget
+
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'view': view_name,
+            'status': response.status_code,
+            'queries': recorder.count,
+            'sql_ms': round(recorder.duration * 1000, 2),
+            'duplicates': recorder.duplicate_count,
+            'budget': budget,
+        }
+        message = ' '.join(f"{key}={value}" for key, value in fields.items())
+
+        if over_budget:
+            if self.action == 'raise':
+                raise QueryBudgetExceeded(
+                    f"{view_name} ran {recorder.count} queries (budget {budget}):\n{recorder.report()}"
+                )
+            logger.warning(f"Query budget exceeded {message}\n{recorder.report()}", extra={'queries': fields})
+        else:
+            logger.debug(message, extra={'queries': fields})
+
+        if self.server_timing:
+            timing = f'db;dur={recorder.duration * 1000:.2f};desc="{recorder.count} queries"'
+            if recorder.duplicates:
+                timing += f', dbdup;desc="{recorder.duplicate_count} duplicates"'
+            existing = response.get('Server-Timing')
+            response['Server-Timing'] = f'{existing}, {timing}' if existing else timing
+
+        return response
@@ -0,0 +1,193 @@
+# nextshopsphere/routers.py
+"""
+Read-replica routing for catalog reads.
+
+Reads go to the primary unless a view opts in: ReplicaReadMixin (DRF
+viewsets) and replica_reads (async views) send safe requests for their
+catalog actions to one of settings.DATABASE_REPLICAS. Within such a request
+ReplicaRouter routes reads to the chosen replica; writes always go to the
+primary, and once a request has written, its later reads do too.
+
+Read-your-writes: a request that wrote pins its user to the primary for
+DATABASE_REPLICA_PIN_SECONDS, long enough for replication to catch up with
+what they just saved. The pin is a cache key, so every worker must share the
+cache: settings refuses replicas without REDIS_URL (except with DEBUG).
+
+Fallback: a replica whose connection can't be opened is skipped for
+DATABASE_REPLICA_RETRY_SECONDS; with none left, reads stay on the primary.
+
+Everything outside a request (management commands, background threads)
+uses the primary. To try it locally with SQLite:
+
+    cp db.sqlite3 replica.sqlite3
+    DEBUG=True DATABASE_REPLICA_URLS=sqlite:///replica.sqlite3 python manage.py runserver
+"""
+
+import logging
+import random
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = 'default'
+
+
+class RoutingState:
+    """Per-request routing decisions, shared by the middleware, views and router"""
+
+    def __init__(self):
+        self.read_alias = None
+        self.wrote = False
+
+
+_state = ContextVar('db_routing_state', default=None)
+
+# alias -> monotonic time until which it is skipped (per process)
+_down_until = {}
+
+
+# ============ REPLICA SELECTION ============
+
+def _pin_key(user_id):
+    return f"db-pin:{user_id}"
+
+
+def pin_to_primary(user_id):
+    cache.set(_pin_key(user_id), 1, settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user_id):
+    return bool(user_id) and cache.get(_pin_key(user_id)) is not None
+
+
+def healthy_replica():
+    """A replica alias whose connection opens, or None; failures are skipped for a while"""
+    now = time.monotonic()
+    candidates = [alias for alias in settings.DATABASE_REPLICAS if _down_until.get(alias, 0) <= now]
+    random.shuffle(candidates)
+    for alias in candidates:
+        try:
+            connections[alias].ensure_connection()
+        except DatabaseError as e:
+            _down_until[alias] = now + settings.DATABASE_REPLICA_RETRY_SECONDS
+            logger.warning(f"⚠️ Replica {alias} unavailable, reading from the primary: {e}")
+            continue
+        _down_until.pop(alias, None)
+        return alias
+    return None
+
+
+def route_reads_to_replica(user_id=None):
+    """Send the current request's reads to a replica, unless the user is pinned or none is up"""
+    state = _state.get()
+    if state is None or state.wrote or not settings.DATABASE_REPLICAS or is_pinned(user_id):
+        return None
+    state.read_alias = healthy_replica()
+    return state.read_alias
+
+
+# ============ ROUTER ============
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.wrote:
+            return None
+        return state.read_alias
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+# ============ VIEWS ============
+
+class ReplicaReadMixin:
+    """Viewset mixin: safe requests for `replica_actions` read from a replica"""
+
+    replica_actions = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and self.action in self.replica_actions:
+            route_reads_to_replica(getattr(request.user, 'id', None))
+
+
+def replica_reads(view):
+    """
+    Async view decorator: read from a replica. Goes under the decorator that
+    authenticates the request (products.async_views.jwt_authenticated): the
+    user it sets as request.jwt_user_id is the one checked for a pin.
+    """
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            # Opens the replica connection, so off the event loop
+            await sync_to_async(route_reads_to_replica)(getattr(request, 'jwt_user_id', None))
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+# ============ MIDDLEWARE ============
+
+class ReadYourWritesMiddleware:
+    """Gives each request a RoutingState and pins users who wrote to the primary"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        state = RoutingState()
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote:
+            self.pin(request)
+        return response
+
+    async def __acall__(self, request):
+        state = RoutingState()
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote:
+            # request.user may still be a lazy session lookup
+            await sync_to_async(self.pin)(request)
+        return response
+
+    @staticmethod
+    def pin(request):
+        # DRF copies the user it authenticated (JWT) onto the Django request
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            pin_to_primary(user.id)
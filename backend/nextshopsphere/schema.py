@@ -0,0 +1,46 @@
+# nextshopsphere/schema.py
+"""
+OpenAPI entries for plain Django views.
+
+drf-spectacular only walks DRF views, so the async views (products/async_views.py)
+would be missing from /api/schema/. Decorate them with @documented(...), taking
+extend_schema() arguments, and add_documented_views (a PREPROCESSING_HOOKS
+entry) lists them with a stand-in APIView carrying that schema.
+"""
+
+from django.http import HttpResponseNotAllowed
+from drf_spectacular.utils import extend_schema
+from rest_framework.views import APIView
+
+
+def documented(methods=('GET',), **schema):
+    def decorator(view):
+        def handler(self, request, *args, **kwargs):
+            # Never routed (the real view serves the URL); only read by the schema generator
+            return HttpResponseNotAllowed([])
+
+        handlers = {method.lower(): extend_schema(**schema)(handler) for method in methods}
+        stand_in = type(f'{view.__name__}_schema', (APIView,), handlers)
+        view.schema_view = stand_in.as_view()
+        return view
+
+    return decorator
+
+
+def add_documented_views(endpoints):
+    # Only imported to build the schema, not by every worker at startup
+    from drf_spectacular.generators import EndpointEnumerator
+
+    class DocumentedViewEnumerator(EndpointEnumerator):
+        def should_include_endpoint(self, path, callback):
+            return hasattr(callback, 'schema_view')
+
+        def get_allowed_methods(self, callback):
+            return super().get_allowed_methods(callback.schema_view)
+
+    documented_endpoints = [
+        (path, path_regex, method, callback.schema_view)
+        # _get_api_endpoints: get_api_endpoints() would run this hook again
+        for path, path_regex, method, callback in DocumentedViewEnumerator()._get_api_endpoints(None, '')
+    ]
+    return endpoints + documented_endpoints
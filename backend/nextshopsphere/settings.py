@@ -1,14 +1,10 @@
 import os
+import tempfile
 from pathlib import Path
 from datetime import timedelta
 from dotenv import load_dotenv
 # settings.py
 
-import cloudinary
-import cloudinary.uploader
-import cloudinary.api
-import dj_database_url
-
 # Load environment variables from .env file
 load_dotenv()
 
@@ -79,7 +75,6 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'django_filters',
-    'drf_spectacular',
 
     # Local apps
     'accounts',
@@ -91,17 +86,17 @@ INSTALLED_APPS = [
     'alerts',
 ]
 
+# OpenAPI schema and docs (/api/schema/, /api/docs/, /api/redoc/). drf-spectacular
+# only loads as an app (extensions, checks, templates) when they are served.
+API_DOCS = os.getenv('API_DOCS', 'True').lower() == 'true'
+if API_DOCS:
+    INSTALLED_APPS.append('drf_spectacular')
 
 
-# Cloudinary Configuration
-cloudinary.config(
-    cloud_name=os.environ.get('CLOUDINARY_CLOUD_NAME'),
-    api_key=os.environ.get('CLOUDINARY_API_KEY'),
-    api_secret=os.environ.get('CLOUDINARY_API_SECRET'),
-    secure=True  # ✅ Important: ensures https:// URLs
-)
 
-# For django-cloudinary-storage
+# Cloudinary credentials: the SDK is configured from these in
+# ProductsConfig.ready(), so settings import nothing from cloudinary.
+# Also read by django-cloudinary-storage.
 CLOUDINARY_STORAGE = {
     'CLOUD_NAME': os.environ.get('CLOUDINARY_CLOUD_NAME'),
     'API_KEY': os.environ.get('CLOUDINARY_API_KEY'),
@@ -113,12 +108,14 @@ DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'nextshopsphere.querybudget.QueryBudgetMiddleware',  # SQL count/time per request
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Serve static files in production
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'nextshopsphere.routers.ReadYourWritesMiddleware',  # Replica reads, primary after writes
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -144,57 +141,59 @@ TEMPLATES = [
 WSGI_APPLICATION = 'nextshopsphere.wsgi.application'
 
 # =============================================================================
-# DATABASE CONFIGURATION - FIXED FOR RENDER BUILD
-# =============================================================================
-import sys
-
-# Get DATABASE_URL from environment
-DATABASE_URL = os.environ.get("DATABASE_URL", "")
-
-# Handle potential issues
-if DATABASE_URL:
-    # Handle bytes encoding (edge case)
-    if isinstance(DATABASE_URL, bytes):
-        DATABASE_URL = DATABASE_URL.decode('utf-8')
-
-    # Strip whitespace
-    DATABASE_URL = DATABASE_URL.strip()
-
-    # Make sure it starts with a valid scheme
-    if DATABASE_URL.startswith('postgres://') or DATABASE_URL.startswith('postgresql://'):
-        try:
-            DATABASES = {
-                "default": dj_database_url.parse(
-                    DATABASE_URL,
-                    conn_max_age=600,
-                    conn_health_checks=True,
-                )
-            }
-        except Exception as e:
-            print(f"Error parsing DATABASE_URL: {e}")
-            DATABASES = {
-                'default': {
-                    'ENGINE': 'django.db.backends.sqlite3',
-                    'NAME': BASE_DIR / 'db.sqlite3',
-                }
-            }
-    else:
-        print(f"Invalid DATABASE_URL scheme, using SQLite")
-        DATABASES = {
-            'default': {
-                'ENGINE': 'django.db.backends.sqlite3',
-                'NAME': BASE_DIR / 'db.sqlite3',
-            }
+# DATABASE CONFIGURATION
+# =============================================================================
+# DATABASE_URL, else DB_ENGINE/DB_HOST/DB_NAME/... (docker-compose), else
+# SQLite; pooling / persistent connections / WAL per engine. Read replicas
+# from DATABASE_REPLICA_URLS. See nextshopsphere/databases.py.
+from .databases import build_databases  # noqa: E402
+
+DATABASES = build_databases(BASE_DIR)
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+
+# Catalog viewsets read from a replica (nextshopsphere/routers.py); a user who
+# writes reads from the primary for PIN_SECONDS, and a replica that can't be
+# reached is skipped for RETRY_SECONDS.
+DATABASE_ROUTERS = ['nextshopsphere.routers.ReplicaRouter']
+DATABASE_REPLICA_PIN_SECONDS = int(os.getenv('DATABASE_REPLICA_PIN_SECONDS', '10'))
+DATABASE_REPLICA_RETRY_SECONDS = int(os.getenv('DATABASE_REPLICA_RETRY_SECONDS', '30'))
+
+
+# =============================================================================
+# CACHE
+# =============================================================================
+# Per-user lookups (wishlist ids, purchased products, ...) are cached and
+# invalidated on write. Set REDIS_URL in production so every worker shares
+# the cache (and sees invalidations); locmem is per-process, so code caching
+# mutable per-user state checks SHARED_CACHE and keeps locmem entries short.
+# Both docker-compose files run a redis service.
+REDIS_URL = os.getenv('REDIS_URL', '')
+SHARED_CACHE = bool(REDIS_URL)
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'nss',
         }
+    }
 else:
-    # No DATABASE_URL - use SQLite (for build time or local dev)
-    DATABASES = {
+    CACHES = {
         'default': {
-            'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': BASE_DIR / 'db.sqlite3',
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'nextshopsphere',
         }
     }
 
+# The read-your-writes pin (nextshopsphere/routers.py) is a cache key: in a
+# per-process cache, a user's next request on another worker would miss it
+# and read their own write from a lagging replica.
+if DATABASE_REPLICAS and not SHARED_CACHE and not DEBUG:
+    from django.core.exceptions import ImproperlyConfigured  # noqa: E402
+
+    raise ImproperlyConfigured("DATABASE_REPLICA_URLS requires REDIS_URL (a cache shared by all workers)")
+
 
 # =============================================================================
 # PASSWORD VALIDATION
@@ -234,6 +233,28 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024  # 5MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024  # 5MB
 
+# Image uploads (nextshopsphere/uploads.py): streamed to disk, type sniffed,
+# decoded size capped, pushed to Cloudinary by the worker (process_order_events).
+# The spool dir must be shared by the web and worker processes.
+IMAGE_UPLOAD_MAX_BYTES = int(os.getenv('IMAGE_UPLOAD_MAX_BYTES', str(5 * 1024 * 1024)))
+IMAGE_UPLOAD_MAX_PIXELS = int(os.getenv('IMAGE_UPLOAD_MAX_PIXELS', str(40_000_000)))
+IMAGE_UPLOAD_MAX_DIMENSION = int(os.getenv('IMAGE_UPLOAD_MAX_DIMENSION', '10000'))
+IMAGE_UPLOAD_SPOOL_DIR = os.getenv(
+    'IMAGE_UPLOAD_SPOOL_DIR', os.path.join(tempfile.gettempdir(), 'nextshopsphere-uploads')
+)
+
+# Responsive product image derivatives (products/images.py), written to
+# default storage under IMAGE_VARIANT_PREFIX. Formats Pillow can't encode
+# in this build (e.g. AVIF without libavif) are skipped.
+IMAGE_VARIANT_WIDTHS = [
+    int(width) for width in os.getenv('IMAGE_VARIANT_WIDTHS', '160,320,640,1024').split(',') if width.strip()
+]
+IMAGE_VARIANT_FORMATS = [
+    fmt.strip() for fmt in os.getenv('IMAGE_VARIANT_FORMATS', 'avif,webp').split(',') if fmt.strip()
+]
+IMAGE_VARIANT_QUALITY = int(os.getenv('IMAGE_VARIANT_QUALITY', '75'))
+IMAGE_VARIANT_PREFIX = 'derivatives/products'
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # =============================================================================
@@ -304,6 +325,8 @@ SPECTACULAR_SETTINGS = {
     'DESCRIPTION': 'E-commerce REST API with JWT authentication',
     'VERSION': '1.0.0',
     'SERVE_INCLUDE_SCHEMA': False,
+    # Async views live outside DRF; see nextshopsphere/schema.py
+    'PREPROCESSING_HOOKS': ['nextshopsphere.schema.add_documented_views'],
     'TAGS': [
         {'name': 'Accounts', 'description': 'User authentication & profile'},
         {'name': 'Categories', 'description': 'Product categories'},
@@ -342,20 +365,106 @@ DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', EMAIL_HOST_USER or 'noreply
 # Fallback to console backend if email not configured
 if not EMAIL_HOST_USER and DEBUG:
     EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
-    print("WARNING: EMAIL_HOST_USER not set - emails will print to console")
-elif DEBUG:
-    print(f"Email configured for: {EMAIL_HOST_USER}")
+
+# Outbox emails sent at once per batch by process_order_events (Brevo API)
+OUTBOX_SEND_CONCURRENCY = int(os.getenv('OUTBOX_SEND_CONCURRENCY', '8'))
+# A failed email is retried after base * 2^(attempt-1) seconds, capped at max;
+# a claimed batch not written back within OUTBOX_CLAIM_SECONDS is sent again
+OUTBOX_RETRY_BASE_SECONDS = int(os.getenv('OUTBOX_RETRY_BASE_SECONDS', '60'))
+OUTBOX_RETRY_MAX_SECONDS = int(os.getenv('OUTBOX_RETRY_MAX_SECONDS', '3600'))
+OUTBOX_CLAIM_SECONDS = int(os.getenv('OUTBOX_CLAIM_SECONDS', '300'))
+
+# =============================================================================
+# SQL QUERY BUDGETS
+# =============================================================================
+# QueryBudgetMiddleware counts queries per request and compares them with the
+# budget for the view name (router basename-action). 'warn' logs a warning with
+# the duplicated statements, 'raise' fails the request (use in tests).
+# Off outside DEBUG: every query is wrapped and fingerprinted while it runs.
+QUERY_BUDGET_ENABLED = os.getenv('QUERY_BUDGET_ENABLED', str(DEBUG)).lower() in ('true', '1', 'yes')
+QUERY_BUDGET_ACTION = os.getenv('QUERY_BUDGET_ACTION', 'warn')
+QUERY_BUDGET_SERVER_TIMING = os.getenv('QUERY_BUDGET_SERVER_TIMING', str(DEBUG)).lower() in ('true', '1', 'yes')
+QUERY_BUDGET_DEFAULT = int(os.getenv('QUERY_BUDGET_DEFAULT', '50'))
+QUERY_BUDGETS = {
+    'product-list': 10,
+    'product-detail': 15,
+    'product-featured': 10,
+    'product-search': 10,
+    'category-list': 5,
+    'category-tree': 5,
+    'brand-list': 5,
+    'review-list': 6,
+    'review-product-stats': 1,
+    'review-batch-stats': 1,
+    'wishlist-list': 8,
+    'wishlist-check': 3,
+    'wishlist-check-many': 3,
+    'notification-list': 5,
+    'notification-unread-count': 3,
+    'order-list': 6,
+}
+
+# =============================================================================
+# REVIEW STATS
+# =============================================================================
+# Stats responses carry an ETag built from ProductReviewStats.updated_at;
+# clients and proxies may reuse them for this many seconds before revalidating
+REVIEW_STATS_MAX_AGE = int(os.getenv('REVIEW_STATS_MAX_AGE', '60'))
+REVIEW_STATS_BATCH_LIMIT = 100
+
+# =============================================================================
+# WISHLIST
+# =============================================================================
+# Max product ids accepted by /api/wishlist/check/?products=...
+WISHLIST_CHECK_LIMIT = 200
+
+# =============================================================================
+# LIVE NOTIFICATION STREAM (SSE)
+# =============================================================================
+# /api/notifications/stream/ - serve through the ASGI app (nextshopsphere.asgi)
+# so idle connections don't pin sync worker threads
+ALERTS_STREAM_POLL_INTERVAL = float(os.getenv('ALERTS_STREAM_POLL_INTERVAL', '5'))
+ALERTS_STREAM_HEARTBEAT = 15
+ALERTS_STREAM_MAX_SECONDS = int(os.getenv('ALERTS_STREAM_MAX_SECONDS', '300'))
+ALERTS_STREAM_RETRY_MS = 3000
+ALERTS_STREAM_BACKLOG = 50
+# Lifetime of the ?ticket= EventSource connects with (the JWT stays out of URLs/logs)
+ALERTS_STREAM_TICKET_SECONDS = int(os.getenv('ALERTS_STREAM_TICKET_SECONDS', '60'))
+
+# =============================================================================
+# PROMO FAN-OUT
+# =============================================================================
+# Rows per bulk_create/transaction, and a rows/second ceiling (0 = unthrottled)
+PROMO_FANOUT_CHUNK_SIZE = int(os.getenv('PROMO_FANOUT_CHUNK_SIZE', '2000'))
+PROMO_FANOUT_RATE = int(os.getenv('PROMO_FANOUT_RATE', '20000'))
+
+# =============================================================================
+# NOTIFICATION RETENTION
+# =============================================================================
+# Days to keep read notifications per type (manage.py prune_notifications);
+# unread ones are kept until NOTIFICATION_UNREAD_RETENTION_DAYS
+NOTIFICATION_RETENTION_DAYS = {
+    'promo': 30,
+    'system': 90,
+    'shipping': 180,
+    'order': 365,
+    'payment': 365,
+}
+NOTIFICATION_UNREAD_RETENTION_DAYS = 365
+
+# =============================================================================
+# PAYMENTS (MOCK)
+# =============================================================================
+# Seconds the mock payment processor sleeps to imitate a real gateway
+PAYMENT_SIMULATED_DELAY = float(os.getenv('PAYMENT_SIMULATED_DELAY', '1.5'))
 
 # =============================================================================
 # GOOGLE OAUTH CONFIGURATION
 # =============================================================================
 GOOGLE_OAUTH_CLIENT_ID = os.getenv('GOOGLE_OAUTH_CLIENT_ID', '')
 GOOGLE_OAUTH_CLIENT_SECRET = os.getenv('GOOGLE_OAUTH_CLIENT_SECRET', '')
-
-if GOOGLE_OAUTH_CLIENT_ID and DEBUG:
-    print("Google OAuth configured")
-elif DEBUG:
-    print("WARNING: Google OAuth not configured - add GOOGLE_OAUTH_CLIENT_ID to .env")
+GOOGLE_TOKENINFO_URL = os.getenv('GOOGLE_TOKENINFO_URL', 'https://oauth2.googleapis.com/tokeninfo')
+GOOGLE_TOKENINFO_TIMEOUT = float(os.getenv('GOOGLE_TOKENINFO_TIMEOUT', '5'))
 
 # =============================================================================
 # LOGGING CONFIGURATION
@@ -402,6 +511,11 @@ LOGGING = {
             'level': 'ERROR',
             'propagate': False,
         },
+        'nextshopsphere.queries': {
+            'handlers': ['console'],
+            'level': os.getenv('QUERY_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
     },
 }
 
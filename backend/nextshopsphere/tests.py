@@ -0,0 +1,113 @@
+import os
+import subprocess
+import sys
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.db.backends.mysql.base import Database
+from django.test import SimpleTestCase
+
+from benchmarks.startup_profile import (
+    BOOT_BUDGET_SECONDS, CHECK_BUDGET_SECONDS, profile_imports, summarize_imports, time_boot, time_check,
+)
+
+from .databases import tune
+from .mysql_pool.base import ConnectionPool
+
+MYSQL = {'ENGINE': 'django.db.backends.mysql', 'NAME': 'shop', 'HOST': 'db'}
+
+
+# ============ MYSQL POOL ============
+
+class MySQLPoolSettingsTests(SimpleTestCase):
+    def test_pool_by_default(self):
+        config = tune(dict(MYSQL), {'DB_POOL_MAX_SIZE': '4'})
+        self.assertEqual(config['ENGINE'], 'nextshopsphere.mysql_pool')
+        self.assertEqual(config['OPTIONS']['pool'], {'max_size': 4, 'max_idle': 300})
+        self.assertEqual(config['CONN_MAX_AGE'], 0)
+
+    def test_persistent_connections_without_the_pool(self):
+        config = tune(dict(MYSQL), {'DB_POOL': 'False', 'DB_CONN_MAX_AGE': '60'})
+        self.assertEqual(config['ENGINE'], 'django.db.backends.mysql')
+        self.assertNotIn('pool', config['OPTIONS'])
+        self.assertEqual(config['CONN_MAX_AGE'], 60)
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def test_returned_connections_are_reused(self):
+        pool = ConnectionPool(max_size=1, max_idle=300)
+        first, second = mock.Mock(), mock.Mock()
+        self.assertTrue(pool.put(first))
+        self.assertFalse(pool.put(second))  # full: the caller closes it
+        self.assertIs(pool.get(), first)
+        self.assertIsNone(pool.get())
+
+    def test_stale_connections_are_dropped(self):
+        pool = ConnectionPool(max_size=2, max_idle=300)
+        stale, fresh = mock.Mock(), mock.Mock()
+        with mock.patch('nextshopsphere.mysql_pool.base.time.monotonic', return_value=0):
+            pool.put(fresh)
+            pool.put(stale)
+        with mock.patch('nextshopsphere.mysql_pool.base.time.monotonic', return_value=60):
+            stale.ping.side_effect = Database.OperationalError(2006, 'MySQL server has gone away')
+            self.assertIs(pool.get(), fresh)
+        stale.close.assert_called_once()
+        fresh.ping.assert_called_once_with(reconnect=False)
+
+    def test_expired_connections_are_closed(self):
+        pool = ConnectionPool(max_size=1, max_idle=300)
+        connection = mock.Mock()
+        with mock.patch('nextshopsphere.mysql_pool.base.time.monotonic', return_value=0):
+            pool.put(connection)
+        with mock.patch('nextshopsphere.mysql_pool.base.time.monotonic', return_value=301):
+            self.assertIsNone(pool.get())
+        connection.close.assert_called_once()
+        connection.ping.assert_not_called()
+
+
+
+# ============ REPLICA PIN ============
+
+class ReplicaPinCacheTests(SimpleTestCase):
+    def load_settings(self, **env):
+        """Import the settings in a fresh interpreter; returns the completed process"""
+        # Set even when empty, so a local .env can't fill them in
+        env = {
+            **os.environ, 'REDIS_URL': '', 'DEBUG': 'False',
+            'DATABASE_REPLICA_URLS': 'sqlite:///replica.sqlite3', **env,
+        }
+        return subprocess.run(
+            [sys.executable, '-c', 'import nextshopsphere.settings'],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+
+    def test_replicas_require_a_shared_cache(self):
+        result = self.load_settings()
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn('requires REDIS_URL', result.stderr)
+
+    def test_shared_cache_or_debug(self):
+        self.assertEqual(self.load_settings(REDIS_URL='redis://localhost:6379/0').returncode, 0)
+        self.assertEqual(self.load_settings(DEBUG='True').returncode, 0)
+
+
+# ============ STARTUP BUDGETS ============
+
+# Wall-clock timings depend on the machine and its load: opt in with STARTUP_BUDGET_TESTS=1
+timed = skipUnless(os.environ.get('STARTUP_BUDGET_TESTS'), "set STARTUP_BUDGET_TESTS=1 to time the startup")
+
+
+class StartupBudgetTests(SimpleTestCase):
+    """The budgets of benchmarks/startup_profile.py, on a single run each"""
+
+    @timed
+    def test_manage_py_check(self):
+        self.assertLess(time_check(), CHECK_BUDGET_SECONDS)
+
+    @timed
+    def test_worker_boot(self):
+        self.assertLess(time_boot(), BOOT_BUDGET_SECONDS)
+
+    def test_lazy_modules_stay_unloaded(self):
+        modules, _ = profile_imports()
+        self.assertEqual(summarize_imports(modules, top=0)['lazy_modules_loaded'], [])
@@ -0,0 +1,304 @@
+# nextshopsphere/uploads.py
+"""
+Image upload handling shared by the avatar and product image endpoints.
+
+- Uploads are streamed to a temporary file (never held in memory) and the
+  request stops storing a file as soon as it passes IMAGE_UPLOAD_MAX_BYTES.
+- The type is sniffed from the file's magic bytes, not the client's
+  content_type, and the header-declared dimensions are checked against
+  IMAGE_UPLOAD_MAX_PIXELS before anything decodes the pixels, which blocks
+  decompression bombs.
+- The Cloudinary upload is queued on the row itself (status, error and the
+  spooled file's path) and sent by the worker (process_order_events), so it
+  survives a restart and a failure is reported back to the client.
+"""
+
+import logging
+import os
+import tempfile
+
+import cloudinary.uploader
+from cloudinary import CloudinaryResource
+from django.conf import settings
+from django.core.files.move import file_move_safe
+from django.core.files.uploadhandler import SkipFile, TemporaryFileUploadHandler
+from django.db import transaction
+from PIL import Image, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_IMAGE_TYPES = ('jpeg', 'png', 'gif', 'webp')
+
+SIGNATURES = (
+    (b'\xff\xd8\xff', 'jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+)
+
+
+class UploadRejected(ValueError):
+    """The uploaded file isn't an acceptable image; the message is user-facing"""
+
+
+# ============ STREAMING ============
+
+class LimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """Writes uploads straight to disk and drops any file over IMAGE_UPLOAD_MAX_BYTES"""
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > settings.IMAGE_UPLOAD_MAX_BYTES:
+            self.request.oversized_uploads = [*getattr(self.request, 'oversized_uploads', []), self.field_name]
+            # Discards what was written and skips the rest of this file's data
+            raise SkipFile()
+        return super().receive_data_chunk(raw_data, start)
+
+
+class StreamedImageUploadMixin:
+    """For views taking image uploads: stream to disk with the size cap"""
+
+    def initialize_request(self, request, *args, **kwargs):
+        # Must be set before anything reads the body
+        request.upload_handlers = [LimitedTemporaryFileUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
+
+
+def oversized(request, field_name):
+    """True if `field_name` was dropped for being over the size limit"""
+    django_request = getattr(request, '_request', request)
+    return field_name in getattr(django_request, 'oversized_uploads', ())
+
+
+def size_error():
+    return f"Image size must be less than {settings.IMAGE_UPLOAD_MAX_BYTES // (1024 * 1024)}MB"
+
+
+# ============ VALIDATION ============
+
+def sniff(head):
+    """Image type from the first bytes of a file, or None"""
+    for signature, kind in SIGNATURES:
+        if head.startswith(signature):
+            return kind
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+def validate_image(upload, allowed=ALLOWED_IMAGE_TYPES):
+    """
+    Check an uploaded file is a real image of an allowed type and a sane
+    decoded size. Only the header is parsed. Returns (type, width, height);
+    raises UploadRejected.
+    """
+    if upload.size > settings.IMAGE_UPLOAD_MAX_BYTES:
+        raise UploadRejected(size_error())
+
+    upload.seek(0)
+    kind = sniff(upload.read(16))
+    upload.seek(0)
+    if kind not in allowed:
+        raise UploadRejected("Only JPEG, PNG, GIF, and WebP images are allowed")
+
+    try:
+        with Image.open(upload) as image:
+            if (image.format or '').lower() != kind:
+                raise UploadRejected("The file contents don't match an image type")
+            width, height = image.size
+            frames = getattr(image, 'n_frames', 1)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError):
+        raise UploadRejected("The file is not a valid image")
+    finally:
+        upload.seek(0)
+
+    if max(width, height) > settings.IMAGE_UPLOAD_MAX_DIMENSION:
+        raise UploadRejected(f"Images can be at most {settings.IMAGE_UPLOAD_MAX_DIMENSION}px on a side")
+    if width * height * frames > settings.IMAGE_UPLOAD_MAX_PIXELS:
+        raise UploadRejected("The image is too large to process")
+    return kind, width, height
+
+
+# ============ DURABLE UPLOADS ============
+
+# Row states for a background upload; '' = nothing in flight
+UPLOAD_PENDING = 'pending'
+UPLOAD_UPLOADING = 'uploading'
+UPLOAD_FAILED = 'failed'
+
+UPLOAD_STATUS_CHOICES = [
+    ('', 'None'),
+    (UPLOAD_PENDING, 'Pending'),
+    (UPLOAD_UPLOADING, 'Uploading'),
+    (UPLOAD_FAILED, 'Failed'),
+]
+
+FAILED_MESSAGE = "The image could not be stored. Please upload it again."
+
+
+class UploadTarget:
+    """
+    A model whose rows take background uploads into `field`. Each row carries
+    its pending upload: the spooled file in `path_field`, plus `status_field`
+    and `error_field`. `on_uploaded(pk, resource, path)` runs after the
+    resource is stored, with the spooled file still on disk.
+    """
+
+    def __init__(self, model, field, folder, on_uploaded=None,
+                 status_field='upload_status', error_field='upload_error', path_field='upload_path'):
+        self.model = model
+        self.field = field
+        self.folder = folder
+        self.on_uploaded = on_uploaded
+        self.status_field = status_field
+        self.error_field = error_field
+        self.path_field = path_field
+
+    def rows(self, pk, **filters):
+        return self.model.objects.filter(pk=pk, **filters)
+
+
+_targets = []
+
+
+def register_upload_target(target):
+    """Called from AppConfig.ready()"""
+    _targets.append(target)
+    return target
+
+
+def target_for(model):
+    for target in _targets:
+        if target.model is model._meta.concrete_model:
+            return target
+    raise LookupError(f"{model._meta.label} isn't registered for background uploads")
+
+
+def spool(upload):
+    """Move an uploaded temp file where the worker can read it; returns the path"""
+    suffix = os.path.splitext(upload.name or '')[1].lower()[:10]
+    os.makedirs(settings.IMAGE_UPLOAD_SPOOL_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=settings.IMAGE_UPLOAD_SPOOL_DIR)
+    os.close(fd)
+    if hasattr(upload, 'temporary_file_path'):
+        file_move_safe(upload.temporary_file_path(), path, allow_overwrite=True)
+    else:
+        upload.seek(0)
+        with open(path, 'wb') as f:
+            for chunk in upload.chunks():
+                f.write(chunk)
+    return path
+
+
+def remove_spooled(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def as_resource(result):
+    """CloudinaryResource for an upload API result, as CloudinaryField stores it"""
+    return CloudinaryResource(
+        result['public_id'],
+        version=result.get('version'),
+        format=result.get('format'),
+        type=result.get('type', 'upload'),
+        resource_type=result.get('resource_type', 'image'),
+    )
+
+
+def queue_upload(instance, upload):
+    """
+    Spool `upload` and record it on `instance`'s row as pending; the worker
+    (process_uploads) sends it. Replaces any upload still waiting for the row.
+    Returns the spooled path.
+    """
+    target = target_for(type(instance))
+    pk = instance.pk
+    path = spool(upload)
+    previous = target.rows(pk).values_list(target.path_field, target.status_field).first()
+    target.rows(pk).update(**{
+        target.status_field: UPLOAD_PENDING,
+        target.error_field: '',
+        target.path_field: path,
+    })
+    setattr(instance, target.status_field, UPLOAD_PENDING)
+    setattr(instance, target.error_field, '')
+    setattr(instance, target.path_field, path)
+    if previous and previous[0] and previous[1] != UPLOAD_UPLOADING:
+        # Never claimed, so nothing else will remove it (a claimed one is removed by its sender)
+        transaction.on_commit(lambda: remove_spooled(previous[0]))
+    return path
+
+
+def upload_status(status, error=None):
+    """(client status, client error) for a row: 'processing', 'failed' or None"""
+    if status in (UPLOAD_PENDING, UPLOAD_UPLOADING):
+        return 'processing', None
+    if status == UPLOAD_FAILED:
+        return 'failed', FAILED_MESSAGE
+    return None, None
+
+
+def send_upload(target, pk, path):
+    """Upload one claimed row's file and store the result; False if it failed"""
+    # Only while the row still points at this file: a newer upload may have replaced it
+    rows = target.rows(pk, **{target.path_field: path})
+    try:
+        # Named after the spooled file, so sending the same upload twice overwrites rather than duplicates
+        public_id = os.path.splitext(os.path.basename(path))[0]
+        result = cloudinary.uploader.upload(
+            path, folder=target.folder, public_id=public_id, overwrite=True, resource_type='image',
+        )
+    except Exception as e:
+        logger.exception(f"❌ Upload of {path} to '{target.folder}' failed")
+        rows.update(**{target.status_field: UPLOAD_FAILED, target.error_field: str(e)[:1000], target.path_field: ''})
+        remove_spooled(path)
+        return False
+
+    resource = as_resource(result)
+    stored = rows.update(**{
+        target.field: resource,
+        target.status_field: '',
+        target.error_field: '',
+        target.path_field: '',
+    })
+    try:
+        if stored and target.on_uploaded:
+            target.on_uploaded(pk, resource, path)
+    finally:
+        remove_spooled(path)
+    return True
+
+
+def requeue_interrupted_uploads():
+    """Put uploads left 'uploading' by a worker that stopped back in the queue"""
+    requeued = 0
+    for target in _targets:
+        requeued += target.model.objects.filter(**{target.status_field: UPLOAD_UPLOADING}).update(
+            **{target.status_field: UPLOAD_PENDING}
+        )
+    return requeued
+
+
+def process_uploads(batch_size=20):
+    """
+    Worker step: claim pending uploads (conditional UPDATE, so each is sent
+    by one worker) and send them. Returns how many were handled.
+    """
+    handled = 0
+    for target in _targets:
+        pending = (
+            target.model.objects.filter(**{target.status_field: UPLOAD_PENDING})
+            .exclude(**{target.path_field: ''})
+            .order_by('pk')
+            .values_list('pk', target.path_field)[:batch_size]
+        )
+        for pk, path in list(pending):
+            claimed = target.rows(pk, **{target.status_field: UPLOAD_PENDING, target.path_field: path}).update(
+                **{target.status_field: UPLOAD_UPLOADING}
+            )
+            if claimed:
+                send_upload(target, pk, path)
+                handled += 1
+    return handled
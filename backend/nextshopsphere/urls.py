@@ -16,6 +16,7 @@ Including another URLconf
 """
 
 from django.contrib import admin
+from django.http import JsonResponse
 from django.urls import path, include
 
 # Import settings to access DEBUG and MEDIA_ROOT
@@ -24,19 +25,27 @@ from django.conf import settings
 # Import static() to serve media files in development
 from django.conf.urls.static import static
 
-
-
-# Swagger UI imports
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-    SpectacularRedocView,
-)
+from .exports import ExportView
 
 # Health check endpoint for container orchestration
 def health_check(request):
     return JsonResponse({'status': 'healthy', 'service': 'nextshopsphere-api'})
 
+
+def docs_view(name, **initkwargs):
+    """A drf-spectacular view imported on its first request, not when the URLconf loads"""
+    view = None
+
+    def lazy(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            from drf_spectacular import views
+            view = getattr(views, name).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    return lazy
+
+
 urlpatterns = [
     # =============================================
     # ADMIN
@@ -104,14 +113,21 @@ urlpatterns = [
     # - /api/notifications/
     path('api/notifications/', include('alerts.urls')),
 
-    # =============================================
-    # API DOCUMENTATION
-    # =============================================
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
-    path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+    # Exports (admin only) - /api/exports/{dataset}/?fmt=csv|ndjson&gzip=1
+    # - orders, order_items, products, images, reviews
+    path('api/exports/<str:dataset>/', ExportView.as_view(), name='export'),
 ]
 
+# =============================================
+# API DOCUMENTATION
+# =============================================
+if settings.API_DOCS:
+    urlpatterns += [
+        path('api/schema/', docs_view('SpectacularAPIView'), name='schema'),
+        path('api/docs/', docs_view('SpectacularSwaggerView', url_name='schema'), name='swagger-ui'),
+        path('api/redoc/', docs_view('SpectacularRedocView', url_name='schema'), name='redoc'),
+    ]
+
 # Serve media files in development
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Order, OrderItem
+from .models import Order, OrderEvent, OrderItem, OutboxEmail
+from .transitions import record_created, transition
 
 
 class OrderItemInline(admin.TabularInline):
@@ -44,4 +45,42 @@ class OrderAdmin(admin.ModelAdmin):
         ('Timestamps', {
             'fields': ('created_at', 'updated_at')
         }),
-    )
\ No newline at end of file
+    )
+
+    def save_model(self, request, obj, form, change):
+        """Status changes go through the transition service so they're logged"""
+        if not change:
+            super().save_model(request, obj, form, change)
+            record_created(obj, actor=request.user, source='admin')
+            return
+
+        status, payment_status = obj.status, obj.payment_status
+        previous = Order.objects.only('status', 'payment_status').get(pk=obj.pk)
+        obj.status, obj.payment_status = previous.status, previous.payment_status
+        super().save_model(request, obj, form, change)
+        transition(
+            obj,
+            status=status,
+            payment_status=payment_status,
+            actor=request.user,
+            source='admin',
+            force=True,
+        )
+
+
+@admin.register(OrderEvent)
+class OrderEventAdmin(admin.ModelAdmin):
+    list_display = ['id', 'order', 'kind', 'from_status', 'to_status', 'to_payment_status', 'source', 'created_at', 'processed_at']
+    list_filter = ['kind', 'source', 'to_status']
+    search_fields = ['order__id', 'order__user__email']
+    raw_id_fields = ['order', 'actor']
+    readonly_fields = ['created_at']
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ['id', 'to_email', 'subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status']
+    search_fields = ['to_email', 'subject']
+    raw_id_fields = ['event']
+    readonly_fields = ['created_at', 'sent_at']
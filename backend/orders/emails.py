@@ -1,7 +1,10 @@
+import asyncio
 import threading
 import logging
 import os
-import requests
+
+import httpx
+from asgiref.sync import async_to_sync
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +15,61 @@ DEFAULT_FROM_NAME = os.getenv("DEFAULT_FROM_NAME", "NextShopSphere")
 FRONTEND_URL = os.getenv("FRONTEND_URL", "https://nextshopsphere-ui.onrender.com")
 
 BREVO_API_URL = "https://api.brevo.com/v3/smtp/email"
+BREVO_TIMEOUT = 10
+
+
+def brevo_client():
+    """An AsyncClient for the Brevo API; share one across a batch of sends"""
+    return httpx.AsyncClient(
+        timeout=BREVO_TIMEOUT,
+        headers={"api-key": BREVO_API_KEY or "", "Content-Type": "application/json"},
+    )
+
+
+async def asend_email(subject, text_content, html_content, recipient_email, client=None):
+    """Send one email via the Brevo API without blocking the event loop; raises on failure"""
+    if not BREVO_API_KEY:
+        raise RuntimeError("BREVO_API_KEY not set")
+
+    payload = {
+        "sender": {"name": DEFAULT_FROM_NAME, "email": DEFAULT_FROM_EMAIL},
+        "to": [{"email": recipient_email}],
+        "subject": subject,
+        "htmlContent": html_content,
+        "textContent": text_content,
+    }
+
+    if client is None:
+        async with brevo_client() as client:
+            response = await client.post(BREVO_API_URL, json=payload)
+    else:
+        response = await client.post(BREVO_API_URL, json=payload)
+    response.raise_for_status()
+    logger.info(f"✅ Email sent to {recipient_email}")
+
+
+async def asend_many(messages, concurrency=8):
+    """
+    Send (subject, text, html, recipient) tuples concurrently over one
+    connection pool; returns one exception (or None) per message, in order.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async with brevo_client() as client:
+        async def send(message):
+            async with semaphore:
+                try:
+                    await asend_email(*message, client=client)
+                except Exception as e:
+                    return e
+                return None
+
+        return await asyncio.gather(*(send(message) for message in messages))
+
+
+def send_email(subject, text_content, html_content, recipient_email):
+    """Blocking wrapper around asend_email for sync callers; raises on failure"""
+    async_to_sync(asend_email)(subject, text_content, html_content, recipient_email)
 
 
 def send_email_async(subject, text_content, html_content, recipient_email):
@@ -21,22 +79,8 @@ def send_email_async(subject, text_content, html_content, recipient_email):
             logger.warning("⚠️ BREVO_API_KEY not set - skipping email")
             return
 
-        payload = {
-            "sender": {"name": DEFAULT_FROM_NAME, "email": DEFAULT_FROM_EMAIL},
-            "to": [{"email": recipient_email}],
-            "subject": subject,
-            "htmlContent": html_content,
-            "textContent": text_content,
-        }
-        headers = {
-            "api-key": BREVO_API_KEY,
-            "Content-Type": "application/json"
-        }
-
         try:
-            response = requests.post(BREVO_API_URL, json=payload, headers=headers)
-            response.raise_for_status()
-            logger.info(f"✅ Email sent to {recipient_email}")
+            send_email(subject, text_content, html_content, recipient_email)
         except Exception as e:
             logger.error(f"❌ Failed to send email to {recipient_email}: {e}")
 
@@ -46,10 +90,9 @@ def send_email_async(subject, text_content, html_content, recipient_email):
     return True
 
 
-def send_order_confirmation_email(order):
-    """Send order confirmation email via Brevo API"""
+def build_order_confirmation_email(order):
+    """(subject, text, html) for an order confirmation"""
     user_name = order.user.first_name or order.user.username or "Customer"
-    user_email = order.user.email
     is_paid = order.payment_status == "paid"
 
     text_content = f"""
@@ -127,18 +170,16 @@ Thank you for shopping with NextShopSphere!
 </html>
 """
 
-    return send_email_async(
+    return (
         f"🛍️ Order Confirmation - #{order.id} | NextShopSphere",
         text_content,
         html_content,
-        user_email
     )
 
 
-def send_payment_confirmation_email(order):
-    """Send payment confirmation email via Brevo API"""
+def build_payment_confirmation_email(order):
+    """(subject, text, html) for a payment confirmation"""
     user_name = order.user.first_name or order.user.username or "Customer"
-    user_email = order.user.email
 
     text_content = f"""
 Payment Confirmed - Order #{order.id}
@@ -191,9 +232,18 @@ Thank you for shopping with NextShopSphere!
 </html>
 """
 
-    return send_email_async(
+    return (
         f"💳 Payment Confirmed - Order #{order.id} | NextShopSphere",
         text_content,
         html_content,
-        user_email
-    )
\ No newline at end of file
+    )
+
+
+def send_order_confirmation_email(order):
+    """Send order confirmation email via Brevo API"""
+    return send_email_async(*build_order_confirmation_email(order), order.user.email)
+
+
+def send_payment_confirmation_email(order):
+    """Send payment confirmation email via Brevo API"""
+    return send_email_async(*build_payment_confirmation_email(order), order.user.email)
\ No newline at end of file
@@ -0,0 +1,190 @@
+# orders/events.py
+"""
+OrderEvent consumer.
+
+Takes unprocessed events in id order, a batch at a time, and derives their
+side effects: one bulk_create of UserNotification rows, OutboxEmail rows for
+the confirmation emails, and the events' processed_at — all in a single
+transaction, so a crash never half-applies a batch. Rows are claimed with
+SKIP LOCKED where the database supports it, so several consumers can run.
+
+Emails are then delivered from the outbox: a batch is claimed and committed,
+sent with no transaction open, and the results written back. Failures are
+retried with exponential backoff (next_attempt_at) up to max_attempts.
+"""
+
+import logging
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from alerts.counters import reconcile_counters
+from alerts.models import UserNotification
+
+from .emails import build_order_confirmation_email, build_payment_confirmation_email, asend_many
+from .models import OrderEvent, OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+# (notification type, title, message) per status / payment status
+STATUS_NOTIFICATIONS = {
+    'processing': ('order', 'Order processing', 'Order #{id} is being prepared.'),
+    'shipped': ('shipping', 'Order shipped', 'Order #{id} is on its way.'),
+    'delivered': ('shipping', 'Order delivered', 'Order #{id} has been delivered.'),
+    'cancelled': ('order', 'Order cancelled', 'Order #{id} has been cancelled.'),
+}
+PAYMENT_NOTIFICATIONS = {
+    'paid': ('payment', 'Payment received', 'Payment for order #{id} was successful.'),
+    'refunded': ('payment', 'Payment refunded', 'Payment for order #{id} has been refunded.'),
+}
+
+
+def notifications_for(event):
+    """List of (type, title, message) for an event"""
+    if event.kind == 'created':
+        return [('order', 'Order placed', 'Order #{id} has been received.')]
+    notifications = []
+    if event.kind == 'payment':
+        if event.to_payment_status in PAYMENT_NOTIFICATIONS:
+            notifications.append(PAYMENT_NOTIFICATIONS[event.to_payment_status])
+        # One event when a payment also moves the order on (pending -> processing)
+        if event.to_status == event.from_status:
+            return notifications
+    if event.to_status in STATUS_NOTIFICATIONS:
+        notifications.append(STATUS_NOTIFICATIONS[event.to_status])
+    return notifications
+
+
+def email_for(event):
+    """(subject, text, html) for an event, or None"""
+    if event.kind == 'created':
+        return build_order_confirmation_email(event.order)
+    if event.kind == 'payment' and event.to_payment_status == 'paid':
+        return build_payment_confirmation_email(event.order)
+    return None
+
+
+def _pending_events(batch_size):
+    events = OrderEvent.objects.filter(processed_at__isnull=True).order_by('id')
+    events = events.select_for_update(skip_locked=connection.features.has_select_for_update_skip_locked)
+    # Ids first: select_for_update can't be combined with the nullable joins below
+    ids = list(events.values_list('id', flat=True)[:batch_size])
+    return list(
+        OrderEvent.objects.filter(id__in=ids)
+        .select_related('order', 'order__user')
+        .order_by('id')
+    )
+
+
+def process_batch(batch_size=500, emails=True):
+    """Process one batch of events; returns how many were handled"""
+    with transaction.atomic():
+        events = _pending_events(batch_size)
+        if not events:
+            return 0
+
+        notifications = []
+        outbox = []
+        for event in events:
+            for notification_type, title, message in notifications_for(event):
+                notifications.append(UserNotification(
+                    user_id=event.order.user_id,
+                    type=notification_type,
+                    title=title,
+                    message=message.format(id=event.order_id),
+                    link=f'/orders/{event.order_id}',
+                ))
+            email = email_for(event) if emails else None
+            if email and event.order.user.email:
+                subject, text, html = email
+                outbox.append(OutboxEmail(
+                    event=event,
+                    to_email=event.order.user.email,
+                    subject=subject,
+                    text_content=text,
+                    html_content=html,
+                ))
+
+        UserNotification.objects.bulk_create(notifications)
+        OutboxEmail.objects.bulk_create(outbox)
+        OrderEvent.objects.filter(id__in=[event.id for event in events]).update(processed_at=timezone.now())
+
+    # bulk_create skips UserNotification.save(), so bring the badges back in line
+    if notifications:
+        reconcile_counters(sorted({n.user_id for n in notifications}))
+    return len(events)
+
+
+def claim_outbox(batch_size=100, max_attempts=5):
+    """
+    Claim due outbox rows for this sender: mark them `sending` (counting the
+    attempt) and commit, so the send happens with no transaction or row locks
+    held. A claim lapses after OUTBOX_CLAIM_SECONDS, so rows left `sending` by
+    a sender that died are picked up again.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        # Out of attempts and abandoned mid-send: give up rather than re-claim
+        OutboxEmail.objects.filter(
+            status='sending', next_attempt_at__lte=now, attempts__gte=max_attempts
+        ).update(status='failed', last_error='Claim expired before the send was recorded')
+
+        due = OutboxEmail.objects.filter(status__in=('pending', 'sending'), next_attempt_at__lte=now)
+        due = due.order_by('next_attempt_at', 'id')
+        due = due.select_for_update(skip_locked=connection.features.has_select_for_update_skip_locked)
+        emails = list(due[:batch_size])
+        if emails:
+            OutboxEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+                status='sending',
+                attempts=F('attempts') + 1,
+                next_attempt_at=now + timedelta(seconds=settings.OUTBOX_CLAIM_SECONDS),
+            )
+    for email in emails:
+        email.attempts += 1
+    return emails
+
+
+def retry_delay(attempts):
+    """Exponential backoff after the n-th failed attempt"""
+    return timedelta(seconds=min(
+        settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+        settings.OUTBOX_RETRY_MAX_SECONDS,
+    ))
+
+
+def deliver_outbox(batch_size=100, max_attempts=5):
+    """Send due outbox emails; returns (sent, failed)"""
+    emails = claim_outbox(batch_size, max_attempts)
+    if not emails:
+        return 0, 0
+
+    # Sent concurrently over one connection pool, outside any transaction
+    errors = async_to_sync(asend_many)(
+        [(e.subject, e.text_content, e.html_content, e.to_email) for e in emails],
+        settings.OUTBOX_SEND_CONCURRENCY,
+    )
+
+    sent = failed = 0
+    now = timezone.now()
+    for email, error in zip(emails, errors):
+        if error is not None:
+            logger.error(f"❌ Outbox email {email.pk} to {email.to_email} failed: {error}")
+            email.last_error = str(error)
+            if email.attempts >= max_attempts:
+                email.status = 'failed'
+            else:
+                email.status = 'pending'
+                email.next_attempt_at = now + retry_delay(email.attempts)
+            failed += 1
+        else:
+            email.status = 'sent'
+            email.sent_at = now
+            email.last_error = ''
+            sent += 1
+
+    OutboxEmail.objects.bulk_update(emails, ['status', 'last_error', 'sent_at', 'next_attempt_at'])
+    return sent, failed
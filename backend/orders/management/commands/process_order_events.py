@@ -0,0 +1,83 @@
+# orders/management/commands/process_order_events.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from alerts.fanout import CampaignRunner
+from nextshopsphere.uploads import process_uploads, requeue_interrupted_uploads
+from orders.events import deliver_outbox, process_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Turn pending order events into notifications and outbox emails, then send the emails, "
+        "queued image uploads and queued promo campaigns. With --loop this is the background worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Events per transaction")
+        parser.add_argument('--no-email', action='store_true', help="Don't queue or send emails")
+        parser.add_argument('--max-attempts', type=int, default=5, help="Give up on an email after this many tries")
+        parser.add_argument('--loop', action='store_true', help="Keep running, polling for new events")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds between polls with --loop")
+        parser.add_argument('--no-campaigns', action='store_true', help="Don't send queued promo campaigns")
+        parser.add_argument('--no-uploads', action='store_true', help="Don't send queued image uploads")
+        parser.add_argument('--campaign-slice', type=float, default=10.0,
+                            help="Seconds spent on campaigns per pass before checking for events again")
+
+    def handle(self, *args, **options):
+        campaigns = CampaignRunner(options['campaign_slice'])
+        if not options['no_uploads']:
+            # Any upload still marked as in flight was interrupted by a restart. Re-sending one that
+            # another worker is still on is harmless: the Cloudinary public id is fixed per upload.
+            requeued = requeue_interrupted_uploads()
+            if requeued:
+                self.stdout.write(f"↻ {requeued} interrupted image uploads queued again")
+        while True:
+            processed = self.drain(options)
+            if not options['no_uploads']:
+                processed += self.send_uploads()
+            if not options['no_campaigns']:
+                processed += campaigns.step()
+            if not options['loop']:
+                # A single pass still finishes what it started
+                while campaigns.busy:
+                    campaigns.step()
+                break
+            if not processed and not campaigns.busy:
+                time.sleep(options['interval'])
+
+    def send_uploads(self):
+        sent = 0
+        while True:
+            handled = process_uploads()
+            sent += handled
+            if not handled:
+                break
+        if sent:
+            self.stdout.write(self.style.SUCCESS(f"✅ {sent} image uploads handled"))
+        return sent
+
+    def drain(self, options):
+        processed = 0
+        while True:
+            handled = process_batch(options['batch_size'], emails=not options['no_email'])
+            processed += handled
+            if handled < options['batch_size']:
+                break
+
+        sent = failed = 0
+        if not options['no_email']:
+            while True:
+                batch_sent, batch_failed = deliver_outbox(max_attempts=options['max_attempts'])
+                sent += batch_sent
+                failed += batch_failed
+                # Failures are rescheduled with backoff, so this ends once nothing is due
+                if not (batch_sent or batch_failed):
+                    break
+
+        if processed or sent or failed:
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {processed} events processed, {sent} emails sent, {failed} failed"
+            ))
+        return processed
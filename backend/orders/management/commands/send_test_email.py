@@ -0,0 +1,31 @@
+# orders/management/commands/send_test_email.py
+from django.conf import settings
+from django.core.mail import send_mail
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Print the email configuration and send a test email (to EMAIL_HOST_USER by default)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--to', help="Recipient (default: EMAIL_HOST_USER, i.e. yourself)")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Email Backend: {settings.EMAIL_BACKEND}")
+        self.stdout.write(f"Email Host User: {settings.EMAIL_HOST_USER}")
+        self.stdout.write(f"Email configured: {'Yes' if settings.EMAIL_HOST_USER else 'No'}")
+
+        if not settings.EMAIL_HOST_USER:
+            raise CommandError("❌ EMAIL_HOST_USER not configured in .env file")
+
+        try:
+            send_mail(
+                subject='🎉 NextShopSphere Test Email',
+                message='If you receive this, your email configuration is working!',
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                recipient_list=[options['to'] or settings.EMAIL_HOST_USER],
+                fail_silently=False,
+            )
+        except Exception as e:
+            raise CommandError(f"❌ Error sending email: {e}") from e
+        self.stdout.write(self.style.SUCCESS("✅ Test email sent successfully! Check your inbox."))
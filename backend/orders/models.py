@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from products.models import Product
 
 
@@ -146,4 +147,87 @@ class OrderItem(models.Model):
     @property
     def subtotal(self):
         """Property for templates and serializers"""
-        return self.get_subtotal()
\ No newline at end of file
+        return self.get_subtotal()
+
+
+class OrderEvent(models.Model):
+    """Append-only log of order state changes, written by orders.transitions"""
+
+    KIND_CHOICES = [
+        ('created', 'Created'),
+        ('status', 'Status change'),
+        ('payment', 'Payment'),
+    ]
+
+    SOURCE_CHOICES = [
+        ('api', 'Customer API'),
+        ('admin', 'Admin'),
+        ('payment', 'Payment processor'),
+        ('system', 'System'),
+    ]
+
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='events')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    from_status = models.CharField(max_length=20, blank=True)
+    to_status = models.CharField(max_length=20, blank=True)
+    from_payment_status = models.CharField(max_length=20, blank=True)
+    to_payment_status = models.CharField(max_length=20, blank=True)
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES, default='system')
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        help_text="User who caused the change"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When process_order_events generated its side effects"
+    )
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['processed_at', 'id'], name='orderevent_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"Order #{self.order_id} {self.kind}: {self.from_status or '-'} -> {self.to_status or '-'}"
+
+
+class OutboxEmail(models.Model):
+    """Email queued by the event consumer and delivered outside the request path"""
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    event = models.ForeignKey(OrderEvent, on_delete=models.SET_NULL, null=True, blank=True, related_name='emails')
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    text_content = models.TextField()
+    html_content = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="Pending: retry backoff. Sending: when the claim lapses if the sender died."
+    )
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outboxemail_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.status})"
@@ -0,0 +1,72 @@
+# orders/purchases.py
+"""
+Per-user purchased-product sets.
+
+Reviews need to know whether the author bought the product. Instead of
+joining over orders on every review save, the set of product ids from a
+user's delivered orders is cached and dropped whenever one of their orders
+moves to or from delivered (forced admin moves included).
+
+The delete runs on commit: done inside the transition's transaction, a
+concurrent has_purchased() could cache the old set again before the commit.
+Without a shared cache (REDIS_URL) the other workers keep their own copy and
+never see the delete, so the set is only kept for a few seconds there.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+PURCHASES_CACHE_TIMEOUT = 60 * 60 * 24
+LOCAL_CACHE_TIMEOUT = 30
+
+
+def _cache_key(user_id):
+    return f"purchased-products:{user_id}"
+
+
+def purchased_product_ids(user_id):
+    """Ids of products the user has received (cached)"""
+    key = _cache_key(user_id)
+    product_ids = cache.get(key)
+    if product_ids is None:
+        from .models import OrderItem
+        product_ids = frozenset(
+            OrderItem.objects.filter(
+                order__user_id=user_id,
+                order__status='delivered',
+                product__isnull=False,
+            ).values_list('product_id', flat=True).distinct()
+        )
+        timeout = PURCHASES_CACHE_TIMEOUT if settings.SHARED_CACHE else LOCAL_CACHE_TIMEOUT
+        cache.set(key, product_ids, timeout)
+    return product_ids
+
+
+def has_purchased(user_id, product_id):
+    return product_id in purchased_product_ids(user_id)
+
+
+def invalidate_purchases(user_id):
+    """Drop the user's cached set once the current transaction commits"""
+    key = _cache_key(user_id)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def mark_delivered(order):
+    """
+    Called once when an order transitions to delivered: flag the user's
+    existing reviews of its products as verified in one update.
+    """
+    from reviews.models import Review
+
+    product_ids = list(
+        order.items.filter(product__isnull=False).values_list('product_id', flat=True)
+    )
+    if not product_ids:
+        return 0
+    return Review.objects.filter(
+        user_id=order.user_id,
+        product_id__in=product_ids,
+        is_verified_purchase=False,
+    ).update(is_verified_purchase=True)
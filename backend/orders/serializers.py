@@ -92,21 +92,12 @@ class CreateOrderSerializer(serializers.Serializer):
         for item_data in items_data:
             product = Product.objects.get(id=item_data['product_id'])
 
-            # Get primary image URL
-            primary_image = product.images.filter(is_primary=True).first()
-            if not primary_image:
-                primary_image = product.images.first()
-
-            image_url = None
-            if primary_image:
-                image_url = str(primary_image.image)
-
             OrderItem.objects.create(
                 order=order,
                 product=product,
                 product_name=product.name,
                 product_price=product.price,
-                product_image=image_url,
+                product_image=product.primary_image_url or None,
                 product_slug=product.slug,
                 quantity=item_data['quantity'],
             )
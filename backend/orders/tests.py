@@ -1,3 +1,167 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from alerts.counters import unread_count
+from alerts.models import UserNotification
+from nextshopsphere.querybudget import query_budget
+from products.models import Category, Product
+
+from .events import claim_outbox, deliver_outbox, process_batch
+from .models import Order, OrderEvent, OrderItem, OutboxEmail
+from .transitions import InvalidTransition, cancel_order, record_created, transition
+
+
+def make_product(slug, stock=10):
+    category, _ = Category.objects.get_or_create(name='Phones', slug='phones')
+    return Product.objects.create(
+        name=slug.title(), slug=slug, description='-', price=Decimal('10.00'), sku=slug.upper(),
+        category=category, stock=stock,
+    )
+
+
+def make_order(user, products, quantity=1, **kwargs):
+    order = Order.objects.create(
+        user=user, shipping_address='1 Main St', shipping_city='Springfield', shipping_country='US',
+        shipping_phone='555-0100', **kwargs,
+    )
+    for product in products:
+        OrderItem.objects.create(
+            order=order, product=product, product_name=product.name, product_slug=product.slug,
+            product_price=product.price, quantity=quantity,
+        )
+    return order
+
+
+# ============ QUERY BUDGETS ============
+
+class OrderQueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='buyer@example.com', username='buyer')
+        products = [make_product(f'item-{i}') for i in range(3)]
+        for _ in range(8):
+            make_order(cls.user, products)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_order_list(self):
+        with query_budget(settings.QUERY_BUDGETS['order-list']):
+            response = self.client.get('/api/orders/', secure=True)
+        self.assertEqual(response.status_code, 200)
+
+
+# ============ CANCELLATION ============
+
+class CancelOrderTests(TestCase):
+    def test_second_cancel_does_not_restock_again(self):
+        user = User.objects.create_user(email='buyer@example.com', username='buyer')
+        product = make_product('phone', stock=5)
+        order = make_order(user, [product], quantity=2)
+
+        cancel_order(order)
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 7)
+
+        with self.assertRaises(InvalidTransition):
+            cancel_order(Order.objects.get(pk=order.pk))
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 7)
+
+
+# ============ EVENT CONSUMER ============
+
+class ProcessBatchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='buyer@example.com', username='buyer')
+        self.order = make_order(self.user, [make_product('phone')])
+        record_created(self.order)
+
+    def titles(self):
+        return list(UserNotification.objects.order_by('id').values_list('title', flat=True))
+
+    def test_payment_that_moves_the_order_on(self):
+        transition(self.order, status='processing', payment_status='paid', source='payment')
+        self.assertEqual(process_batch(), 2)
+
+        self.assertEqual(self.titles(), ['Order placed', 'Payment received', 'Order processing'])
+        self.assertEqual(unread_count(self.user.pk), 3)
+        self.assertEqual(OutboxEmail.objects.count(), 2)  # order and payment confirmations
+        self.assertFalse(OrderEvent.objects.filter(processed_at__isnull=True).exists())
+        self.assertEqual(process_batch(), 0)
+
+    def test_status_only_event(self):
+        transition(self.order, status='cancelled')
+        process_batch()
+        self.assertEqual(self.titles(), ['Order placed', 'Order cancelled'])
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+
+    def test_without_emails(self):
+        transition(self.order, payment_status='paid')
+        process_batch(emails=False)
+        self.assertEqual(self.titles(), ['Order placed', 'Payment received'])
+        self.assertFalse(OutboxEmail.objects.exists())
+
+    def test_batches_in_id_order(self):
+        transition(self.order, status='processing')
+        self.assertEqual(process_batch(batch_size=1), 1)
+        self.assertEqual(self.titles(), ['Order placed'])
+        self.assertEqual(process_batch(batch_size=1), 1)
+        self.assertEqual(self.titles(), ['Order placed', 'Order processing'])
+
+
+# ============ OUTBOX ============
+
+def fake_sender(errors):
+    async def asend_many(messages, concurrency=8):
+        return [errors.pop(0) if errors else None for _ in messages]
+    return asend_many
+
+
+class OutboxDeliveryTests(TestCase):
+    def setUp(self):
+        self.email = OutboxEmail.objects.create(to_email='buyer@example.com', subject='Hi', text_content='-')
+
+    def deliver(self, *errors):
+        with mock.patch('orders.events.asend_many', fake_sender(list(errors))):
+            return deliver_outbox()
+
+    @override_settings(OUTBOX_RETRY_BASE_SECONDS=60)
+    def test_failure_is_retried_with_backoff(self):
+        self.assertEqual(self.deliver(RuntimeError('down')), (0, 1))
+        self.email.refresh_from_db()
+        self.assertEqual((self.email.status, self.email.attempts), ('pending', 1))
+        self.assertGreater(self.email.next_attempt_at, timezone.now() + timedelta(seconds=50))
+
+        # Not due yet
+        self.assertEqual(self.deliver(), (0, 0))
+
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(self.deliver(), (1, 0))
+        self.email.refresh_from_db()
+        self.assertEqual((self.email.status, self.email.attempts), ('sent', 2))
+
+    def test_gives_up_after_max_attempts(self):
+        OutboxEmail.objects.update(attempts=4)
+        self.deliver(RuntimeError('down'))
+        self.email.refresh_from_db()
+        self.assertEqual(self.email.status, 'failed')
+
+    def test_claim_is_committed_before_sending(self):
+        claimed = claim_outbox()
+        self.assertEqual([email.pk for email in claimed], [self.email.pk])
+        self.email.refresh_from_db()
+        self.assertEqual(self.email.status, 'sending')
+        # Another sender doesn't get it while the claim holds...
+        self.assertEqual(claim_outbox(), [])
+        # ...but does once it lapses
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(len(claim_outbox()), 1)
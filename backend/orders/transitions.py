@@ -0,0 +1,114 @@
+# orders/transitions.py
+"""
+The one place order state changes happen.
+
+Every status / payment_status change goes through transition(): the order
+row is locked, the change validated, saved, and recorded as an OrderEvent in
+the same transaction. Side effects that must be immediate (verified-purchase
+flags, live SSE events) run here; notifications and emails are derived from
+the events later by `manage.py process_order_events`.
+"""
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import Order, OrderEvent
+
+# Allowed customer/system status moves; admin changes may force others
+STATUS_TRANSITIONS = {
+    'pending': {'processing', 'cancelled'},
+    'processing': {'shipped', 'cancelled'},
+    'shipped': {'delivered'},
+    'delivered': set(),
+    'cancelled': set(),
+}
+
+CANCELLABLE_STATUSES = ('pending', 'processing')
+
+
+class InvalidTransition(Exception):
+    """Raised when an order can't move to the requested state"""
+
+
+def record_created(order, actor=None, source='api'):
+    """Log the creation of an order"""
+    return OrderEvent.objects.create(
+        order=order,
+        kind='created',
+        to_status=order.status,
+        to_payment_status=order.payment_status,
+        source=source,
+        actor=actor,
+    )
+
+
+def transition(order, status=None, payment_status=None, actor=None, source='system', force=False):
+    """
+    Move `order` to a new status and/or payment_status and log an OrderEvent.
+    Returns the event, or None if nothing changed. `order` is updated in place.
+    """
+    with transaction.atomic():
+        current = Order.objects.select_for_update().only('status', 'payment_status').get(pk=order.pk)
+        new_status = status or current.status
+        new_payment_status = payment_status or current.payment_status
+
+        if (new_status, new_payment_status) == (current.status, current.payment_status):
+            order.status, order.payment_status = current.status, current.payment_status
+            return None
+
+        if (
+            not force
+            and new_status != current.status
+            and new_status not in STATUS_TRANSITIONS.get(current.status, set())
+        ):
+            raise InvalidTransition(
+                f'Cannot move order from "{current.get_status_display()}" to "{new_status}".'
+            )
+
+        order.status = new_status
+        order.payment_status = new_payment_status
+        order.save(update_fields=['status', 'payment_status', 'updated_at'])
+
+        event = OrderEvent.objects.create(
+            order=order,
+            kind='payment' if new_payment_status != current.payment_status else 'status',
+            from_status=current.status,
+            to_status=new_status,
+            from_payment_status=current.payment_status,
+            to_payment_status=new_payment_status,
+            source=source,
+            actor=actor,
+        )
+
+        if 'delivered' in (current.status, new_status) and new_status != current.status:
+            from .purchases import invalidate_purchases, mark_delivered
+            invalidate_purchases(order.user_id)
+            if new_status == 'delivered':
+                mark_delivered(order)
+
+        from alerts.broker import publish_on_commit
+        from alerts.stream import order_event
+        publish_on_commit(order.user_id, 'order_status', order_event(
+            order.id, new_status, new_payment_status, current.status
+        ))
+
+    return event
+
+
+def cancel_order(order, actor=None, source='api'):
+    """Cancel a pending/processing order and put its items back in stock"""
+    from products.models import Product
+
+    with transaction.atomic():
+        # Lock the row before restocking: a concurrent cancel waits here, then
+        # finds the order already cancelled instead of restocking it again
+        try:
+            Order.objects.select_for_update().only('status').get(pk=order.pk, status__in=CANCELLABLE_STATUSES)
+        except Order.DoesNotExist:
+            order.refresh_from_db(fields=['status'])
+            raise InvalidTransition(f'Cannot cancel order with status "{order.get_status_display()}".')
+
+        for product_id, quantity in order.items.filter(product__isnull=False).values_list('product_id', 'quantity'):
+            Product.objects.filter(pk=product_id).update(stock=F('stock') + quantity)
+
+        return transition(order, status='cancelled', actor=actor, source=source)
@@ -4,7 +4,7 @@ from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, extend_schema_view
 from .models import Order
 from .serializers import OrderSerializer, CreateOrderSerializer
-# from .emails import send_order_confirmation_email  # Comment this out
+from .transitions import InvalidTransition, cancel_order, record_created
 import logging
 import os
 
@@ -24,7 +24,7 @@ class OrderViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Return only orders for current user"""
-        return Order.objects.filter(user=self.request.user)
+        return Order.objects.filter(user=self.request.user).prefetch_related('items')
 
     def get_serializer_class(self):
         """Use different serializer for creating orders"""
@@ -38,17 +38,10 @@ class OrderViewSet(viewsets.ModelViewSet):
 
         if serializer.is_valid():
             order = serializer.save()
-
-            # Skip email for now - it causes timeout on free tier
+            # Confirmation email and notification come from process_order_events
+            record_created(order, actor=request.user)
             logger.info(f"Order #{order.id} created successfully")
 
-            # TODO: Add async email later
-            # try:
-            #     email_sent = send_order_confirmation_email(order)
-            #     logger.info(f"Order #{order.id} email sent: {email_sent}")
-            # except Exception as e:
-            #     logger.error(f"Failed to send order email: {str(e)}")
-
             return Response(
                 OrderSerializer(order).data,
                 status=status.HTTP_201_CREATED
@@ -60,19 +53,10 @@ class OrderViewSet(viewsets.ModelViewSet):
         """Cancel/Delete an order - only if pending or processing"""
         order = self.get_object()
 
-        if order.status not in ['pending', 'processing']:
-            return Response(
-                {'detail': f'Cannot cancel order with status "{order.get_status_display()}".'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        for item in order.items.all():
-            if item.product:
-                item.product.stock += item.quantity
-                item.product.save()
-
-        order.status = 'cancelled'
-        order.save()
+        try:
+            cancel_order(order, actor=request.user)
+        except InvalidTransition as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response(
             {'detail': 'Order cancelled successfully.'},
@@ -85,19 +69,10 @@ class OrderViewSet(viewsets.ModelViewSet):
         """Alternative cancel endpoint"""
         order = self.get_object()
 
-        if order.status not in ['pending', 'processing']:
-            return Response(
-                {'detail': f'Cannot cancel order with status "{order.get_status_display()}".'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        for item in order.items.all():
-            if item.product:
-                item.product.stock += item.quantity
-                item.product.save()
-
-        order.status = 'cancelled'
-        order.save()
+        try:
+            cancel_order(order, actor=request.user)
+        except InvalidTransition as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response(
             OrderSerializer(order).data,
@@ -1,4 +1,5 @@
 import time
+from django.conf import settings
 from django.utils import timezone
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
@@ -7,7 +8,8 @@ from drf_spectacular.utils import extend_schema, extend_schema_view
 from .models import Payment
 from .serializers import PaymentSerializer, ProcessPaymentSerializer
 from orders.models import Order
-from orders.emails import send_payment_confirmation_email
+from orders.transitions import transition
+from alerts.broker import publish_on_commit
 import logging
 
 logger = logging.getLogger(__name__)
@@ -60,7 +62,7 @@ class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['post'], url_path='process')
     def process_payment(self, request):
         """
-        Process a mock payment and send confirmation email
+        Process a mock payment; the confirmation email is queued by process_order_events
 
         Test Cards:
         - 4242 4242 4242 4242 (Visa - Success)
@@ -81,8 +83,8 @@ class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
         order = Order.objects.get(id=data['order_id'])
         card_number = data['card_number']
 
-        # Simulate processing delay (1-2 seconds)
-        time.sleep(1.5)
+        # Simulate processing delay (PAYMENT_SIMULATED_DELAY seconds)
+        time.sleep(settings.PAYMENT_SIMULATED_DELAY)
 
         # Check test card or use default behavior
         card_info = TEST_CARDS.get(card_number)
@@ -115,26 +117,26 @@ class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
             payment.paid_at = timezone.now()
             payment.save()
 
-            # Update order status
-            order.payment_status = 'paid'
-            order.status = 'processing'
-            order.save()
+            # Update order status (recorded as an OrderEvent)
+            transition(
+                order,
+                status='processing' if order.status == 'pending' else None,
+                payment_status='paid',
+                actor=request.user,
+                source='payment',
+            )
+
+            publish_on_commit(order.user_id, 'payment', {
+                'order_id': order.id, 'status': 'success', 'payment_id': payment.id,
+            })
 
-            # Send payment confirmation email
-            email_sent = False
-            try:
-                email_sent = send_payment_confirmation_email(order)
-                logger.info(f"Payment for order #{order.id} successful. Email sent: {email_sent}")
-            except Exception as e:
-                logger.error(f"Failed to send payment email: {str(e)}")
-                # Don't fail the payment if email fails
+            logger.info(f"Payment for order #{order.id} successful")
 
             return Response({
                 'status': 'success',
                 'message': 'Payment processed successfully',
                 'payment': PaymentSerializer(payment).data,
                 'order_id': order.id,
-                'email_sent': email_sent,
             })
         else:
             # Payment failed
@@ -143,6 +145,9 @@ class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
             payment.save()
 
             logger.warning(f"Payment failed for order #{order.id}: {error_message}")
+            publish_on_commit(order.user_id, 'payment', {
+                'order_id': order.id, 'status': 'failed', 'payment_id': payment.id, 'message': error_message,
+            })
 
             return Response({
                 'status': 'failed',
@@ -3,3 +3,30 @@ from django.apps import AppConfig
 
 class ProductsConfig(AppConfig):
     name = 'products'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        configure_cloudinary()
+        register_uploads()
+
+
+def configure_cloudinary():
+    """Point the Cloudinary SDK at the account in settings (the models already import it)"""
+    import cloudinary
+    from django.conf import settings
+
+    credentials = settings.CLOUDINARY_STORAGE
+    cloudinary.config(
+        cloud_name=credentials.get('CLOUD_NAME'),
+        api_key=credentials.get('API_KEY'),
+        api_secret=credentials.get('API_SECRET'),
+        secure=True,  # https:// URLs
+    )
+
+
+def register_uploads():
+    from nextshopsphere.uploads import UploadTarget, register_upload_target
+    from .images import product_image_uploaded
+    from .models import ProductImage
+
+    register_upload_target(UploadTarget(ProductImage, 'image', 'products', on_uploaded=product_image_uploaded))
@@ -0,0 +1,253 @@
+# products/async_views.py
+"""
+Async catalog reads: the homepage shelves, search and the category tree.
+
+These are plain async views (like alerts.stream): under the ASGI entry point
+a request waiting on the database is a parked coroutine, not a pinned
+worker thread. Everything the serializers read is loaded up front with the
+async ORM — review stats via select_related, category product counts and the
+user's wishlist ids in one query each — so serializing runs no queries and
+is safe on the event loop. Under WSGI Django runs them in a per-request event
+loop and they behave the same.
+
+They take over the URLs of the former ProductViewSet / CategoryViewSet
+actions of the same names (see products/urls.py), and read from a replica
+when one is configured (nextshopsphere/routers.py). Like those actions, a
+request without a token is anonymous and one with an invalid or expired
+token gets a 401 (so the client refreshes it), and DEFAULT_THROTTLE_CLASSES
+apply with the same rates and cache keys. @documented keeps them in
+/api/schema/ (nextshopsphere/schema.py).
+"""
+
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import Q
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework.exceptions import Throttled
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from alerts.stream import bearer_user_id
+from nextshopsphere.routers import replica_reads
+from nextshopsphere.schema import documented
+from wishlist.cache import wishlist_product_ids
+
+from .models import Category, Product
+from .serializers import CategoryTreeSerializer, ProductListSerializer, available_counts_queryset
+
+SHELF_SIZE = 8
+SALE_SIZE = 12
+SEARCH_SIZE = 20
+
+
+# ============ SERIALIZERS ============
+
+class PreloadedCategoryTreeSerializer(CategoryTreeSerializer):
+    """CategoryTreeSerializer reading children and counts from context['tree'] / ['counts']"""
+
+    def get_children(self, obj):
+        children = self.context['tree'].get(obj.id, [])
+        return PreloadedCategoryTreeSerializer(children, many=True, context=self.context).data
+
+    def get_product_count(self, obj):
+        counts = self.context['counts']
+        return counts.get(obj.id, 0) + sum(counts.get(child.id, 0) for child in self.context['tree'].get(obj.id, []))
+
+
+# ============ LOADERS ============
+
+def json_response(data, status=200):
+    # DRF's encoder, so decimals and dates come out as they did from the viewsets
+    return JsonResponse(data, encoder=JSONEncoder, safe=False, status=status)
+
+
+def jwt_authenticated(view):
+    """Sets request.jwt_user_id (None when anonymous); 401 for a bad token, as JWTAuthentication would"""
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            request.jwt_user_id = bearer_user_id(request)
+        except InvalidToken as e:
+            response = json_response(e.detail, status=401)
+            response['WWW-Authenticate'] = 'Bearer realm="api"'
+            return response
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+class TokenUser:
+    """The user DRF's rate throttles see for a valid token: they only read pk"""
+
+    is_authenticated = True
+
+    def __init__(self, pk):
+        self.pk = self.id = pk
+
+
+class ThrottleRequest:
+    """What DRF's throttles read from a request: META (client address) and user"""
+
+    def __init__(self, request):
+        self.META = request.META
+        self.user = TokenUser(request.jwt_user_id) if request.jwt_user_id else AnonymousUser()
+
+
+def throttle_waits(request, view):
+    """wait() of every DEFAULT_THROTTLE_CLASSES throttle refusing the request (empty when allowed)"""
+    throttle_request = ThrottleRequest(request)
+    waits = []
+    for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES:
+        throttle = throttle_class()
+        if not throttle.allow_request(throttle_request, view):
+            waits.append(throttle.wait())
+    return waits
+
+
+def throttled(view):
+    """Rate limits as on the DRF views (after jwt_authenticated); 429 with Retry-After when over"""
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if api_settings.DEFAULT_THROTTLE_CLASSES:
+            # The throttles read and write the cache
+            waits = await sync_to_async(throttle_waits)(request, view)
+            if waits:
+                exc = Throttled(max((wait for wait in waits if wait is not None), default=None))
+                response = json_response({'detail': exc.detail}, status=exc.status_code)
+                if exc.wait:
+                    response['Retry-After'] = '%d' % exc.wait
+                return response
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def catalog_products():
+    return Product.objects.filter(is_available=True).select_related('category', 'brand', 'review_stats')
+
+
+async def available_counts(category_ids):
+    """{category id: available products}, one query"""
+    if not category_ids:
+        return {}
+    return {category_id: total async for category_id, total in available_counts_queryset(category_ids)}
+
+
+async def product_list_response(request, queryset):
+    products = [product async for product in queryset]
+    context = {
+        'request': request,
+        'category_product_counts': await available_counts({p.category_id for p in products if p.category_id}),
+    }
+    user_id = request.jwt_user_id
+    # The serializer would look this up itself, synchronously
+    context['wishlist_ids'] = await sync_to_async(wishlist_product_ids)(user_id) if user_id else frozenset()
+    # Stats, counts and wishlist ids are all loaded: serializing runs no queries
+    data = ProductListSerializer(products, many=True, context=context).data
+    return json_response(data)
+
+
+# ============ PRODUCTS ============
+
+@documented(tags=['Products'], summary='Get featured products', responses=ProductListSerializer(many=True))
+@require_GET
+@jwt_authenticated
+@throttled
+@replica_reads
+async def featured_products(request):
+    """Featured products for the homepage"""
+    return await product_list_response(
+        request, catalog_products().filter(featured=True)[:SHELF_SIZE]
+    )
+
+
+@documented(tags=['Products'], summary='Get new arrivals', responses=ProductListSerializer(many=True))
+@require_GET
+@jwt_authenticated
+@throttled
+@replica_reads
+async def new_arrivals(request):
+    """Newest products"""
+    return await product_list_response(
+        request, catalog_products().filter(is_new=True).order_by('-created_at')[:SHELF_SIZE]
+    )
+
+
+@documented(tags=['Products'], summary='Get bestsellers', responses=ProductListSerializer(many=True))
+@require_GET
+@jwt_authenticated
+@throttled
+@replica_reads
+async def bestsellers(request):
+    """Bestseller products"""
+    return await product_list_response(
+        request, catalog_products().filter(is_bestseller=True)[:SHELF_SIZE]
+    )
+
+
+@documented(tags=['Products'], summary='Get products on sale', responses=ProductListSerializer(many=True))
+@require_GET
+@jwt_authenticated
+@throttled
+@replica_reads
+async def on_sale(request):
+    """Products with a compare-at price"""
+    return await product_list_response(
+        request,
+        catalog_products().filter(compare_price__isnull=False, compare_price__gt=0).order_by('-created_at')[:SALE_SIZE],
+    )
+
+
+@documented(
+    tags=['Products'], summary='Search products', responses=ProductListSerializer(many=True),
+    parameters=[OpenApiParameter('q', str, description="Matched against name, description, brand and category")],
+)
+@require_GET
+@jwt_authenticated
+@throttled
+@replica_reads
+async def search_products(request):
+    """Search products by name, description, brand, or category"""
+    query = request.GET.get('q', '')
+    if not query:
+        return json_response([])
+    products = catalog_products().filter(
+        Q(name__icontains=query) |
+        Q(description__icontains=query) |
+        Q(category__name__icontains=query) |
+        Q(brand__name__icontains=query)
+    )[:SEARCH_SIZE]
+    return await product_list_response(request, products)
+
+
+# ============ CATEGORIES ============
+
+@documented(tags=['Categories'], summary='Get full category tree', responses=CategoryTreeSerializer(many=True))
+@require_GET
+@jwt_authenticated
+@throttled
+@replica_reads
+async def category_tree(request):
+    """Full category tree for navigation, in two queries"""
+    categories = [
+        category async for category in
+        Category.objects.filter(is_active=True).order_by('display_order', 'name')
+    ]
+    tree = {}
+    for category in categories:
+        tree.setdefault(category.parent_id, []).append(category)
+
+    context = {
+        'request': request,
+        'tree': tree,
+        'counts': await available_counts([category.id for category in categories]),
+    }
+    data = PreloadedCategoryTreeSerializer(tree.get(None, []), many=True, context=context).data
+    return json_response(data)
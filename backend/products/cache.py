@@ -0,0 +1,31 @@
+# products/cache.py
+"""
+Small cached lookups shared by apps that filter by product slug.
+
+Only hits are cached; products/signals.py drops a slug's entry when a
+product is saved under it, renamed away from it or deleted.
+"""
+
+from django.core.cache import cache
+
+SLUG_CACHE_TIMEOUT = 60 * 10
+
+
+def _slug_key(slug):
+    return f"product-slug:{slug}"
+
+
+def product_id_for_slug(slug):
+    """Resolve a product slug to its id, cached; None if no such product"""
+    key = _slug_key(slug)
+    product_id = cache.get(key)
+    if product_id is None:
+        from .models import Product
+        product_id = Product.objects.filter(slug=slug).values_list('pk', flat=True).first()
+        if product_id is not None:
+            cache.set(key, product_id, SLUG_CACHE_TIMEOUT)
+    return product_id
+
+
+def forget_slugs(*slugs):
+    cache.delete_many([_slug_key(slug) for slug in slugs if slug])
@@ -0,0 +1,162 @@
+# products/images.py
+"""
+Responsive derivatives for product images.
+
+Each ProductImage gets resized copies at settings.IMAGE_VARIANT_WIDTHS in every
+format of settings.IMAGE_VARIANT_FORMATS that this Pillow build can encode,
+written to default storage. Their URLs are kept on ProductImage.variants as
+{format: {width: url}}, so serializers can build srcset without touching storage.
+"""
+
+import hashlib
+import io
+import logging
+import os
+
+import requests
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+from nextshopsphere.uploads import queue_upload
+
+from .media_sync import is_remote, stored_name
+
+logger = logging.getLogger(__name__)
+
+# Pillow format name and encoder options per variant format
+ENCODERS = {
+    'avif': ('AVIF', {'speed': 6}),
+    'webp': ('WEBP', {'method': 4}),
+    'jpeg': ('JPEG', {'optimize': True, 'progressive': True}),
+}
+
+# Pillow feature that has to be present to encode each format
+FEATURES = {'avif': 'avif', 'webp': 'webp', 'jpeg': 'jpg'}
+
+
+def supported_formats(formats=None):
+    """The requested formats this Pillow build can write"""
+    available = []
+    for fmt in formats or settings.IMAGE_VARIANT_FORMATS:
+        if fmt not in ENCODERS:
+            continue
+        try:
+            if features.check(FEATURES[fmt]):
+                available.append(fmt)
+        except ValueError:
+            # Pillow too old to know the feature at all
+            continue
+    return available
+
+
+def variant_key(pk, name):
+    """Storage directory for an image's derivatives; changes when the original does"""
+    return f"{settings.IMAGE_VARIANT_PREFIX}/{pk}/{hashlib.md5(name.encode()).hexdigest()[:8]}"
+
+
+def open_source(name, url=None):
+    """A readable source for a stored image: the local file, else a download"""
+    if name and not is_remote(name):
+        path = os.path.join(settings.MEDIA_ROOT, name)
+        if os.path.exists(path):
+            return path
+    if not url:
+        raise FileNotFoundError(f"No source for image {name!r}")
+    response = requests.get(url, timeout=15)
+    response.raise_for_status()
+    return io.BytesIO(response.content)
+
+
+def render_variants(source, key, widths=None, formats=None, quality=None):
+    """
+    Resize `source` (path or file object) to each width and encode it in each
+    format; returns {format: {width: url}}. Widths wider than the original are
+    skipped (no upscaling) — the original width is used instead if none fit.
+    """
+    widths = sorted(set(widths or settings.IMAGE_VARIANT_WIDTHS))
+    formats = supported_formats(formats)
+    quality = quality or settings.IMAGE_VARIANT_QUALITY
+    variants = {}
+    if not formats or not widths:
+        return variants
+
+    with Image.open(source) as original:
+        # Let the JPEG decoder downscale while decoding when it can
+        original.draft('RGB', (max(widths), max(widths)))
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+
+        targets = [width for width in widths if width < image.width] or [image.width]
+        for width in targets:
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+            for fmt in formats:
+                pillow_format, options = ENCODERS[fmt]
+                frame = resized.convert('RGB') if fmt == 'jpeg' and resized.mode == 'RGBA' else resized
+                buffer = io.BytesIO()
+                frame.save(buffer, format=pillow_format, quality=quality, **options)
+
+                name = f"{key}/{width}.{fmt}"
+                if default_storage.exists(name):
+                    default_storage.delete(name)
+                saved = default_storage.save(name, ContentFile(buffer.getvalue()))
+                variants.setdefault(fmt, {})[str(width)] = default_storage.url(saved)
+
+    return variants
+
+
+def render_for_row(pk, name, url):
+    """Process-pool entry point: (pk, variants, error); does no database access"""
+    try:
+        source = open_source(name, url)
+        return pk, render_variants(source, variant_key(pk, name)), None
+    except Exception as e:
+        return pk, None, str(e)
+
+
+def image_source_url(image):
+    try:
+        return image.image.url if image.image else None
+    except Exception:
+        return None
+
+
+def generate_variants(image, source=None):
+    """Build and store derivatives for one ProductImage; returns the variants"""
+    from .models import Product, ProductImage
+
+    name = stored_name(image.image)
+    try:
+        if source is None:
+            source = open_source(name, image_source_url(image))
+        variants = render_variants(source, variant_key(image.pk, name))
+    except Exception as e:
+        logger.error(f"❌ Could not build variants for ProductImage {image.pk}: {e}")
+        return {}
+
+    ProductImage.objects.filter(pk=image.pk).update(variants=variants)
+    # queryset.update skips the signal that keeps the product's card snapshot current
+    Product.objects.filter(primary_image_id=image.pk).update(primary_image_variants=variants)
+    image.variants = variants
+    return variants
+
+
+def upload_product_image(image, upload):
+    """Queue a new file for `image`; the worker uploads it, then builds its variants"""
+    return queue_upload(image, upload)
+
+
+def product_image_uploaded(pk, resource, path):
+    """After the worker stored an upload: refresh the card snapshot and build variants"""
+    from .models import ProductImage
+    from .signals import refresh_primary_image
+
+    product_id = ProductImage.objects.filter(pk=pk).values_list('product_id', flat=True).first()
+    if product_id is None:
+        return
+    refresh_primary_image(product_id)
+    # Resize from the spooled file rather than downloading it back
+    generate_variants(ProductImage(pk=pk, image=resource), source=path)
@@ -0,0 +1,448 @@
+# products/management/commands/generate_catalog.py
+import random
+import time
+import uuid
+from array import array
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from alerts.counters import reconcile_counters
+from alerts.models import UserNotification
+from orders.models import Order, OrderItem
+from products.models import (
+    Brand,
+    Category,
+    Product,
+    ProductImage,
+    ProductSpecification,
+)
+from products.signals import sync_primary_images
+from reviews.aggregates import refresh_product_stats
+from reviews.models import Review
+from wishlist.models import WishlistItem
+
+User = get_user_model()
+
+ADJECTIVES = [
+    'Classic', 'Smart', 'Ultra', 'Compact', 'Premium', 'Eco', 'Pro', 'Lite',
+    'Wireless', 'Portable', 'Deluxe', 'Essential', 'Vintage', 'Modern', 'Rugged',
+]
+NOUNS = [
+    'Headphones', 'Backpack', 'Lamp', 'Sneakers', 'Watch', 'Blender', 'Jacket',
+    'Keyboard', 'Notebook', 'Speaker', 'Camera', 'Bottle', 'Chair', 'Serum', 'Drone',
+]
+CATEGORY_WORDS = [
+    'Electronics', 'Fashion', 'Home', 'Beauty', 'Books', 'Sports', 'Toys',
+    'Garden', 'Kitchen', 'Office', 'Outdoor', 'Audio', 'Gaming', 'Travel',
+]
+SPEC_NAMES = ['Color', 'Material', 'Weight', 'Size', 'Warranty', 'Model Year']
+SPEC_VALUES = ['Black', 'White', 'Steel', 'Cotton', '1.2 kg', 'Large', '2 years', '2025']
+REVIEW_TITLES = ['Great value', 'Not bad', 'Exceeded expectations', 'Could be better', 'Love it']
+
+ORDER_STATUSES = ['delivered'] * 6 + ['shipped', 'processing', 'pending', 'cancelled']
+NOTIFICATION_TYPES = [choice for choice, _ in UserNotification.TYPE_CHOICES]
+
+
+def product_name(index):
+    """Deterministic product name for a product index (no RNG state needed)"""
+    adjective = ADJECTIVES[index % len(ADJECTIVES)]
+    noun = NOUNS[(index // len(ADJECTIVES)) % len(NOUNS)]
+    return f"{adjective} {noun} {index}"
+
+
+class Command(BaseCommand):
+    help = "Deterministically generate a large synthetic catalog (products, users, orders, reviews...) for benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='gen',
+                            help="Prefix for generated slugs/SKUs/emails (used by --flush)")
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--category-depth', type=int, default=3)
+        parser.add_argument('--brands', type=int, default=100)
+        parser.add_argument('--products', type=int, default=10000)
+        parser.add_argument('--specs-per-product', type=int, default=3)
+        parser.add_argument('--images-per-product', type=int, default=2)
+        parser.add_argument('--image-public-id', default='sample',
+                            help="Cloudinary public id used for every generated image")
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--orders', type=int, default=5000)
+        parser.add_argument('--max-items-per-order', type=int, default=4)
+        parser.add_argument('--reviews', type=int, default=20000)
+        parser.add_argument('--wishlist-items', type=int, default=5000)
+        parser.add_argument('--notifications', type=int, default=10000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--flush', action='store_true',
+                            help="Delete previously generated rows with this prefix first")
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.prefix = options['prefix']
+        self.batch_size = options['batch_size']
+        self.rng = random.Random(options['seed'])
+        # Order markers must not match an earlier run's, whatever the seed
+        self.run_id = uuid.uuid4().hex[:12]
+
+        if options['reviews'] > options['users'] * options['products']:
+            raise CommandError("--reviews cannot exceed users × products (one review per user/product)")
+        if options['wishlist_items'] > options['users'] * options['products']:
+            raise CommandError("--wishlist-items cannot exceed users × products")
+        if options['products'] and not options['categories']:
+            raise CommandError("--categories must be at least 1 when generating products")
+
+        if options['flush']:
+            self.flush()
+
+        started = time.monotonic()
+        self.stdout.write(self.style.HTTP_INFO(
+            f"\n🧪 Generating synthetic catalog (seed={options['seed']}, prefix={self.prefix})\n"
+        ))
+
+        category_ids = self.generate_categories()
+        brand_ids = self.generate_brands()
+        product_ids, product_cents = self.generate_products(category_ids, brand_ids)
+        self.generate_specifications(product_ids)
+        self.generate_images(product_ids)
+        user_ids = self.generate_users()
+        self.generate_orders(user_ids, product_ids, product_cents)
+        self.generate_reviews(user_ids, product_ids)
+        self.generate_wishlist(user_ids, product_ids)
+        self.generate_notifications(user_ids)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✅ Synthetic catalog generated in {time.monotonic() - started:.1f}s"
+        ))
+
+    # -------------------------------
+    # HELPERS
+    # -------------------------------
+    def insert(self, label, model, rows, total):
+        """bulk_create rows from a generator in batches, with progress output"""
+        started = time.monotonic()
+        batch = []
+        done = 0
+        for obj in rows:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                model.objects.bulk_create(batch)
+                done += len(batch)
+                batch = []
+                self.progress(label, done, total, started)
+        if batch:
+            model.objects.bulk_create(batch)
+            done += len(batch)
+        self.progress(label, done, total, started, final=True)
+
+    def insert_with_ids(self, label, model, rows, total, key):
+        """
+        Like insert(), but returns the ids in generation order. Ids are read
+        back by their unique key so this works on backends that don't return
+        primary keys from bulk inserts (MySQL).
+        """
+        started = time.monotonic()
+        ids = array('q')
+        batch = []
+
+        def flush_batch():
+            model.objects.bulk_create(batch)
+            keys = [getattr(obj, key) for obj in batch]
+            lookup = dict(model.objects.filter(**{f'{key}__in': keys}).values_list(key, 'id'))
+            ids.extend(lookup[k] for k in keys)
+
+        for obj in rows:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                flush_batch()
+                batch = []
+                self.progress(label, len(ids), total, started)
+        if batch:
+            flush_batch()
+        self.progress(label, len(ids), total, started, final=True)
+        return ids
+
+    def progress(self, label, done, total, started, final=False):
+        elapsed = time.monotonic() - started
+        rate = done / elapsed if elapsed else 0
+        line = f"  {'✓' if final else '…'} {label}: {done:,}/{total:,} ({rate:,.0f} rows/s)"
+        if final:
+            self.stdout.write(self.style.SUCCESS(line))
+        else:
+            self.stdout.write(line)
+
+    def unique_pairs(self, count, user_count, product_count, step):
+        """
+        Yield `count` distinct (user_index, product_index) pairs.
+        Pair k is (k % U, (k // U + user * step) % P): for a fixed user the
+        product offsets k // U are all distinct, so no pair repeats.
+        """
+        for k in range(count):
+            user = k % user_count
+            yield user, (k // user_count + user * step) % product_count
+
+    # -------------------------------
+    # CATALOG
+    # -------------------------------
+    def generate_categories(self):
+        total = self.options['categories']
+        depth = max(1, self.options['category_depth'])
+        per_level = [total // depth] * depth
+        per_level[0] += total - sum(per_level)
+
+        levels = []
+        index = 0
+        for level, count in enumerate(per_level):
+            parents = levels[-1] if levels else None
+            objs = []
+            for _ in range(count):
+                word = CATEGORY_WORDS[index % len(CATEGORY_WORDS)]
+                objs.append(Category(
+                    name=f"{word} {index}",
+                    slug=f"{self.prefix}-category-{index}",
+                    parent_id=self.rng.choice(parents) if parents else None,
+                    display_order=index,
+                    featured=level == 0 and index < 8,
+                ))
+                index += 1
+            levels.append(self.insert_with_ids(f"categories (level {level})", Category, objs, count, 'slug'))
+
+        # Products go into the deepest level that has categories
+        for level_ids in reversed(levels):
+            if level_ids:
+                return level_ids
+        return array('q')
+
+    def generate_brands(self):
+        total = self.options['brands']
+        rows = (
+            Brand(
+                name=f"{self.prefix.title()} Brand {i}",
+                slug=f"{self.prefix}-brand-{i}",
+                is_featured=i < 10,
+            )
+            for i in range(total)
+        )
+        return self.insert_with_ids('brands', Brand, rows, total, 'slug')
+
+    def generate_products(self, category_ids, brand_ids):
+        total = self.options['products']
+        rng = self.rng
+        cents = array('q')
+
+        def rows():
+            for i in range(total):
+                price = rng.randint(199, 199999)
+                cents.append(price)
+                on_sale = rng.random() < 0.2
+                name = product_name(i)
+                yield Product(
+                    name=name,
+                    slug=f"{self.prefix}-product-{i}",
+                    sku=f"{self.prefix.upper()}-{i:08d}",
+                    description=f"{name} — synthetic product generated for load testing.",
+                    short_description=f"Synthetic {name.lower()}",
+                    product_type='digital' if rng.random() < 0.1 else 'physical',
+                    price=Decimal(price) / 100,
+                    compare_price=Decimal(price * 5 // 4) / 100 if on_sale else None,
+                    stock=rng.randint(0, 500),
+                    category_id=rng.choice(category_ids),
+                    brand_id=rng.choice(brand_ids) if brand_ids and rng.random() < 0.9 else None,
+                    featured=rng.random() < 0.01,
+                    is_new=rng.random() < 0.2,
+                    is_bestseller=rng.random() < 0.05,
+                )
+
+        ids = self.insert_with_ids('products', Product, rows(), total, 'sku')
+        return ids, cents
+
+    def generate_specifications(self, product_ids):
+        per_product = self.options['specs_per_product']
+        rng = self.rng
+        rows = (
+            ProductSpecification(
+                product_id=product_id,
+                name=SPEC_NAMES[n % len(SPEC_NAMES)],
+                value=rng.choice(SPEC_VALUES),
+                order=n,
+            )
+            for product_id in product_ids
+            for n in range(per_product)
+        )
+        self.insert('specifications', ProductSpecification, rows, len(product_ids) * per_product)
+
+    def generate_images(self, product_ids):
+        per_product = self.options['images_per_product']
+        public_id = self.options['image_public_id']
+        rows = (
+            ProductImage(
+                product_id=product_id,
+                image=public_id,
+                alt_text=f"Product {product_id} image {n + 1}",
+                is_primary=n == 0,
+                order=n,
+            )
+            for product_id in product_ids
+            for n in range(per_product)
+        )
+        self.insert('images', ProductImage, rows, len(product_ids) * per_product)
+
+        # bulk_create skips the signals that maintain Product's card image snapshot
+        started = time.monotonic()
+        sync_primary_images(product_ids, self.batch_size)
+        self.progress('primary images', len(product_ids), len(product_ids), started, final=True)
+
+    # -------------------------------
+    # CUSTOMERS & ACTIVITY
+    # -------------------------------
+    def generate_users(self):
+        total = self.options['users']
+        # Hashing is deliberately slow; every generated user shares one hash
+        password = make_password('loadtest-password')
+        rows = (
+            User(
+                username=f"{self.prefix}-user-{i}",
+                email=f"{self.prefix}-user-{i}@example.com",
+                first_name=f"User{i}",
+                last_name=self.prefix.title(),
+                password=password,
+            )
+            for i in range(total)
+        )
+        return self.insert_with_ids('users', User, rows, total, 'email')
+
+    def generate_orders(self, user_ids, product_ids, product_cents):
+        total = self.options['orders']
+        if not total or not user_ids or not product_ids:
+            return
+        rng = self.rng
+        max_items = max(1, self.options['max_items_per_order'])
+        started = time.monotonic()
+        done = 0
+
+        while done < total:
+            count = min(self.batch_size, total - done)
+            orders, lines = [], []
+            for i in range(done, done + count):
+                status = rng.choice(ORDER_STATUSES)
+                items = []
+                subtotal = 0
+                for _ in range(rng.randint(1, max_items)):
+                    index = rng.randrange(len(product_ids))
+                    quantity = rng.randint(1, 3)
+                    subtotal += product_cents[index] * quantity
+                    items.append((index, quantity))
+                subtotal = Decimal(subtotal) / 100
+                shipping = Decimal(0) if subtotal >= 50 else Decimal(5)
+                tax = (subtotal * 10 / 100).quantize(Decimal('0.01'))
+                orders.append(Order(
+                    user_id=rng.choice(user_ids),
+                    status=status,
+                    payment_status='pending' if status in ('pending', 'cancelled') else 'paid',
+                    shipping_address=f"{i} Synthetic Street",
+                    shipping_city='Testville',
+                    shipping_country='Testland',
+                    shipping_phone='+10000000000',
+                    subtotal=subtotal,
+                    shipping_cost=shipping,
+                    tax=tax,
+                    total=subtotal + shipping + tax,
+                    notes=f"{self.prefix}:{self.run_id}:order:{i}",
+                ))
+                lines.append(items)
+
+            with transaction.atomic():
+                Order.objects.bulk_create(orders)
+                if not connection.features.can_return_rows_from_bulk_insert:
+                    # No PKs back from the insert (MySQL): find the orders by their marker
+                    order_ids = dict(
+                        Order.objects.filter(notes__in=[o.notes for o in orders]).values_list('notes', 'id')
+                    )
+                    for order in orders:
+                        order.pk = order_ids[order.notes]
+                OrderItem.objects.bulk_create([
+                    OrderItem(
+                        order_id=order.pk,
+                        product_id=product_ids[index],
+                        product_name=product_name(index),
+                        product_price=Decimal(product_cents[index]) / 100,
+                        product_slug=f"{self.prefix}-product-{index}",
+                        quantity=quantity,
+                    )
+                    for order, items in zip(orders, lines)
+                    for index, quantity in items
+                ])
+
+            done += count
+            self.progress('orders', done, total, started, final=done >= total)
+
+    def generate_reviews(self, user_ids, product_ids):
+        total = self.options['reviews']
+        if not total:
+            return
+        rng = self.rng
+        step = max(1, len(product_ids) // max(1, len(user_ids)))
+        rows = (
+            Review(
+                user_id=user_ids[u],
+                product_id=product_ids[p],
+                rating=rng.choices([1, 2, 3, 4, 5], weights=[5, 5, 15, 35, 40])[0],
+                title=rng.choice(REVIEW_TITLES),
+                comment=f"Synthetic review of {product_name(p)}.",
+                is_approved=rng.random() < 0.95,
+            )
+            for u, p in self.unique_pairs(total, len(user_ids), len(product_ids), step)
+        )
+        self.insert('reviews', Review, rows, total)
+
+        # bulk_create skips Review.save(), so rebuild the aggregates in one pass
+        started = time.monotonic()
+        refresh_product_stats(product_ids, self.options['batch_size'])
+        self.progress('review stats', len(product_ids), len(product_ids), started, final=True)
+
+    def generate_wishlist(self, user_ids, product_ids):
+        total = self.options['wishlist_items']
+        if not total:
+            return
+        # A different step than reviews so wishlists don't mirror them
+        step = max(1, len(product_ids) // max(1, len(user_ids))) + 7
+        rows = (
+            WishlistItem(user_id=user_ids[u], product_id=product_ids[p])
+            for u, p in self.unique_pairs(total, len(user_ids), len(product_ids), step)
+        )
+        self.insert('wishlist items', WishlistItem, rows, total)
+
+    def generate_notifications(self, user_ids):
+        total = self.options['notifications']
+        if not total or not user_ids:
+            return
+        rng = self.rng
+        rows = (
+            UserNotification(
+                user_id=rng.choice(user_ids),
+                type=rng.choice(NOTIFICATION_TYPES),
+                title=f"Synthetic notification {i}",
+                message="Generated for load testing.",
+                is_read=rng.random() < 0.7,
+            )
+            for i in range(total)
+        )
+        self.insert('notifications', UserNotification, rows, total)
+
+        # bulk_create skips UserNotification.save(), so seed the unread counters
+        started = time.monotonic()
+        reconcile_counters(user_ids, self.options['batch_size'])
+        self.progress('unread counters', len(user_ids), len(user_ids), started, final=True)
+
+    # -------------------------------
+    # CLEANUP
+    # -------------------------------
+    def flush(self):
+        self.stdout.write(self.style.WARNING(f"🗑️  Removing generated rows with prefix '{self.prefix}'..."))
+        # Deleting users/products cascades to orders, reviews, wishlist, notifications, images, specs
+        User.objects.filter(email__startswith=f"{self.prefix}-user-").delete()
+        Product.objects.filter(sku__startswith=f"{self.prefix.upper()}-").delete()
+        Category.objects.filter(slug__startswith=f"{self.prefix}-category-").delete()
+        Brand.objects.filter(slug__startswith=f"{self.prefix}-brand-").delete()
@@ -0,0 +1,87 @@
+# products/management/commands/generate_image_variants.py
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from products.images import image_source_url, render_for_row, supported_formats
+from products.media_sync import stored_name
+from products.models import ProductImage
+from products.signals import sync_primary_images
+
+
+def _init_worker():
+    # Spawned (non-fork) workers start without Django configured
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+class Command(BaseCommand):
+    help = "Build responsive derivatives for product images that don't have them yet, on a process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+        parser.add_argument('--batch-size', type=int, default=200, help="Rows per bulk_update")
+        parser.add_argument('--force', action='store_true', help="Rebuild images that already have variants")
+        parser.add_argument('--product', help="Only this product slug")
+
+    def handle(self, *args, **options):
+        formats = supported_formats()
+        if not formats:
+            self.stdout.write(self.style.WARNING("⚠️ Pillow here can't encode any of IMAGE_VARIANT_FORMATS"))
+            return
+
+        images = ProductImage.objects.select_related('product').order_by('pk')
+        if not options['force']:
+            images = images.filter(variants={})
+        if options['product']:
+            images = images.filter(product__slug=options['product'])
+
+        # Workers only get plain values; the database stays in this process
+        jobs = []
+        product_ids = set()
+        for image in images.iterator():
+            jobs.append((image.pk, stored_name(image.image), image_source_url(image)))
+            product_ids.add(image.product_id)
+        self.stdout.write(
+            f"🖼️  {len(jobs)} images → {', '.join(formats)} at {settings.IMAGE_VARIANT_WIDTHS}"
+        )
+        if not jobs:
+            return
+
+        # Forked children must not inherit open database connections
+        connections.close_all()
+
+        started = time.monotonic()
+        done = failed = 0
+        pending = []
+
+        def flush():
+            ProductImage.objects.bulk_update(pending, ['variants'], batch_size=options['batch_size'])
+            pending.clear()
+
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as pool:
+            futures = [pool.submit(render_for_row, *job) for job in jobs]
+            for future in as_completed(futures):
+                pk, variants, error = future.result()
+                if error:
+                    failed += 1
+                    self.stdout.write(self.style.ERROR(f"  ❌ ProductImage {pk}: {error}"))
+                    continue
+                pending.append(ProductImage(pk=pk, variants=variants))
+                done += 1
+                if len(pending) >= options['batch_size']:
+                    flush()
+                    self.stdout.write(f"  … {done}/{len(jobs)}")
+        if pending:
+            flush()
+        # bulk_update skips the signals that keep product card snapshots current
+        sync_primary_images(product_ids, options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Built variants for {done} images in {time.monotonic() - started:.1f}s ({failed} failed)"
+        ))
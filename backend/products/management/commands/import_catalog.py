@@ -0,0 +1,561 @@
+# products/management/commands/import_catalog.py
+import csv
+import json
+import os
+import sys
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from products.models import (
+    Brand,
+    Category,
+    Product,
+    ProductImage,
+    ProductSpecification,
+)
+from products.signals import sync_primary_images
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+PRODUCT_UPDATE_FIELDS = [
+    'name', 'slug', 'description', 'short_description', 'product_type',
+    'price', 'compare_price', 'stock', 'low_stock_threshold', 'is_available',
+    'category', 'brand', 'weight', 'dimensions', 'meta_title', 'meta_description',
+    'featured', 'is_new', 'is_bestseller', 'updated_at',
+]
+
+TRUE_VALUES = ('1', 'true', 'yes', 'y', 't')
+
+
+# ============ INPUT READERS ============
+
+def iter_ndjson(f):
+    for line in f:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def iter_json_array(f, read_size=64 * 1024):
+    """Incrementally decode a top-level JSON array of objects"""
+    decoder = json.JSONDecoder()
+    buffer = f.read(read_size).lstrip()
+    if not buffer.startswith('['):
+        raise CommandError("Expected a JSON array of products")
+    buffer = buffer[1:]
+    eof = False
+
+    while True:
+        buffer = buffer.lstrip().lstrip(',').lstrip()
+        if buffer.startswith(']'):
+            return
+        try:
+            obj, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if eof:
+                raise CommandError("Truncated or invalid JSON input")
+            chunk = f.read(read_size)
+            eof = not chunk
+            buffer += chunk
+            continue
+        yield obj
+        buffer = buffer[end:]
+        if len(buffer) < read_size and not eof:
+            chunk = f.read(read_size)
+            eof = not chunk
+            buffer += chunk
+
+
+def iter_backup_document(data):
+    """
+    Flatten a migrate_data (export) style backup ({categories, brands, products,
+    images, specifications}) into one record per product.
+    """
+    category_slugs = {c['id']: c['slug'] for c in data.get('categories', [])}
+    brand_slugs = {b['id']: b['slug'] for b in data.get('brands', [])}
+
+    images = {}
+    for img in data.get('images', []):
+        images.setdefault(img['product_id'], []).append(img)
+    specs = {}
+    for spec in data.get('specifications', []):
+        specs.setdefault(spec['product_id'], []).append(spec)
+
+    for prod in data.get('products', []):
+        record = dict(prod)
+        record['category'] = category_slugs.get(prod.get('category_id'))
+        record['brand'] = brand_slugs.get(prod.get('brand_id'))
+        record['images'] = images.get(prod.get('id'), [])
+        record['specifications'] = specs.get(prod.get('id'), [])
+        yield record
+
+
+def split_csv_list(value):
+    """CSV list columns hold either JSON or '|' separated values"""
+    value = (value or '').strip()
+    if not value:
+        return []
+    if value.startswith('['):
+        return json.loads(value)
+    return [part.strip() for part in value.split('|') if part.strip()]
+
+
+def iter_csv(f):
+    for row in csv.DictReader(f):
+        record = {k: v for k, v in row.items() if k is not None}
+        if 'images' in record:
+            record['images'] = [
+                item if isinstance(item, dict) else {'image': item}
+                for item in split_csv_list(record['images'])
+            ]
+        if 'specifications' in record:
+            parsed = []
+            for item in split_csv_list(record['specifications']):
+                if isinstance(item, dict):
+                    parsed.append(item)
+                elif ':' in item:
+                    name, value = item.split(':', 1)
+                    parsed.append({'name': name.strip(), 'value': value.strip()})
+            record['specifications'] = parsed
+        yield record
+
+
+# ============ VALIDATION ============
+
+def to_decimal(value, field, required=False):
+    if value in (None, ''):
+        if required:
+            raise ValueError(f"{field} is required")
+        return None
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f"{field} is not a number: {value!r}")
+
+
+def to_bool(value, default):
+    if value in (None, ''):
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def to_int(value, field, default):
+    if value in (None, ''):
+        return default
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} is not an integer: {value!r}")
+    if number < 0:
+        raise ValueError(f"{field} must not be negative")
+    return number
+
+
+def clean_record(record):
+    """Validate one input record and return a normalised dict"""
+    sku = str(record.get('sku') or '').strip()
+    name = str(record.get('name') or '').strip()
+    if not sku:
+        raise ValueError("sku is required")
+    if not name:
+        raise ValueError("name is required")
+
+    price = to_decimal(record.get('price'), 'price', required=True)
+    if price < Decimal('0.01'):
+        raise ValueError("price must be at least 0.01")
+
+    product_type = record.get('product_type') or 'physical'
+    if product_type not in dict(Product.PRODUCT_TYPE_CHOICES):
+        raise ValueError(f"unknown product_type: {product_type!r}")
+
+    cleaned = {
+        'sku': sku[:100],
+        'name': name[:255],
+        'slug': slugify(record.get('slug') or f"{name}-{sku}")[:255],
+        'description': record.get('description') or '',
+        'short_description': (record.get('short_description') or '')[:500],
+        'product_type': product_type,
+        'price': price,
+        'compare_price': to_decimal(record.get('compare_price'), 'compare_price'),
+        'stock': to_int(record.get('stock'), 'stock', 0),
+        'low_stock_threshold': to_int(record.get('low_stock_threshold'), 'low_stock_threshold', 5),
+        'weight': to_decimal(record.get('weight'), 'weight'),
+        'dimensions': (record.get('dimensions') or '')[:100],
+        'meta_title': (record.get('meta_title') or '')[:255],
+        'meta_description': (record.get('meta_description') or '')[:500],
+        'category': (record.get('category') or record.get('category_slug') or '').strip() or None,
+        'brand': (record.get('brand') or record.get('brand_slug') or '').strip() or None,
+        'specifications': None,
+        'images': None,
+    }
+    for field, default in (('is_available', True), ('featured', False),
+                           ('is_new', True), ('is_bestseller', False)):
+        cleaned[field] = to_bool(record.get(field), default)
+
+    if record.get('specifications') is not None:
+        specs = []
+        for order, spec in enumerate(record['specifications']):
+            spec_name = str(spec.get('name') or '').strip()
+            if not spec_name:
+                raise ValueError("specification without a name")
+            specs.append({
+                'name': spec_name[:100],
+                'value': str(spec.get('value') or '')[:255],
+                'order': to_int(spec.get('order'), 'specification order', order),
+            })
+        cleaned['specifications'] = specs
+
+    if record.get('images') is not None:
+        images = []
+        for order, img in enumerate(record['images']):
+            image = str(img.get('image') or img.get('url') or '').strip()
+            if not image:
+                continue
+            images.append({
+                'image': image,
+                'alt_text': (img.get('alt_text') or '')[:200],
+                'is_primary': to_bool(img.get('is_primary'), False),
+                'order': to_int(img.get('order'), 'image order', order),
+            })
+        # Exactly one primary image per product
+        primaries = [img for img in images if img['is_primary']]
+        for img in primaries[1:]:
+            img['is_primary'] = False
+        if images and not primaries:
+            images[0]['is_primary'] = True
+        cleaned['images'] = images
+
+    return cleaned
+
+
+# ============ COMMAND ============
+
+class Command(BaseCommand):
+    help = "Bulk import/upsert a product catalog from JSON, NDJSON or CSV in batched transactions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Input file ('-' for stdin, needs --format)")
+        parser.add_argument('--format', choices=['json', 'ndjson', 'csv'],
+                            help="Input format (default: from file extension)")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--create-missing', action='store_true',
+                            help="Create categories/brands referenced by slug that don't exist yet")
+        parser.add_argument('--dry-run', action='store_true', help="Validate only, write nothing")
+        parser.add_argument('--max-errors', type=int, default=20,
+                            help="Number of row errors to print (all are counted)")
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.create_missing = options['create_missing']
+        self.dry_run = options['dry_run']
+        self.max_errors = options['max_errors']
+
+        self.stats = {
+            'rows': 0, 'invalid': 0, 'products': 0, 'failed_batches': 0,
+            'specs_created': 0, 'specs_updated': 0, 'specs_deleted': 0,
+            'images_created': 0, 'images_updated': 0, 'images_deleted': 0,
+        }
+        self.errors_shown = 0
+
+        self.category_ids = dict(Category.objects.values_list('slug', 'id'))
+        self.brand_ids = dict(Brand.objects.values_list('slug', 'id'))
+
+        started = time.monotonic()
+        self.stdout.write(self.style.HTTP_INFO(
+            f"🚚 Importing catalog from {options['path']} (batch size {self.batch_size})"
+            + (" [dry run]" if self.dry_run else "")
+        ))
+
+        batch = []
+        for record in self.iter_records(options['path'], options['format']):
+            self.stats['rows'] += 1
+            try:
+                batch.append(clean_record(record))
+            except (ValueError, TypeError, AttributeError) as e:
+                self.row_error(self.stats['rows'], e)
+                continue
+
+            if len(batch) >= self.batch_size:
+                self.process_batch(batch)
+                batch = []
+                self.report_progress(started)
+
+        if batch:
+            self.process_batch(batch)
+
+        elapsed = time.monotonic() - started
+        rate = self.stats['rows'] / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✅ Done in {elapsed:.1f}s — {self.stats['rows']:,} rows ({rate:,.0f} rows/s), "
+            f"peak memory {self.peak_memory_mb():.1f} MB"
+        ))
+        for key, value in self.stats.items():
+            self.stdout.write(f"  {key}: {value:,}")
+
+    # -------------------------------
+    # INPUT
+    # -------------------------------
+    def iter_records(self, path, fmt):
+        if not fmt:
+            ext = os.path.splitext(path)[1].lower()
+            fmt = {'.jsonl': 'ndjson', '.ndjson': 'ndjson', '.csv': 'csv', '.json': 'json'}.get(ext)
+            if not fmt:
+                raise CommandError("Cannot infer input format, pass --format")
+
+        f = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8', newline='')
+        try:
+            if fmt == 'ndjson':
+                yield from iter_ndjson(f)
+            elif fmt == 'csv':
+                yield from iter_csv(f)
+            else:
+                head = f.read(1)
+                while head and head.isspace():
+                    head = f.read(1)
+                if head == '{':
+                    # migrate_data backup document: must be loaded whole
+                    yield from iter_backup_document(json.loads(head + f.read()))
+                else:
+                    yield from iter_json_array(_Prepend(head, f))
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+    # -------------------------------
+    # BATCH PROCESSING
+    # -------------------------------
+    def process_batch(self, batch):
+        # Last occurrence of a SKU wins (an upsert can't touch a row twice)
+        rows = list({row['sku']: row for row in batch}.values())
+
+        rows = self.resolve_relations(rows)
+        rows = self.check_slugs(rows)
+        if not rows or self.dry_run:
+            self.stats['products'] += len(rows)
+            return
+
+        try:
+            with transaction.atomic():
+                product_ids = self.upsert_products(rows)
+                self.sync_specifications(rows, product_ids)
+                self.sync_images(rows, product_ids)
+        except IntegrityError as e:
+            self.stats['failed_batches'] += 1
+            self.stderr.write(self.style.ERROR(
+                f"❌ Batch of {len(rows)} rows rolled back: {e}"
+            ))
+            return
+
+        self.stats['products'] += len(rows)
+
+    def resolve_relations(self, rows):
+        """Map category/brand slugs to ids using the in-memory lookup tables"""
+        missing_categories = {r['category'] for r in rows if r['category']} - self.category_ids.keys()
+        missing_brands = {r['brand'] for r in rows if r['brand']} - self.brand_ids.keys()
+
+        if self.create_missing and not self.dry_run:
+            if missing_categories:
+                Category.objects.bulk_create(
+                    [Category(name=slug.replace('-', ' ').title(), slug=slug) for slug in missing_categories],
+                    ignore_conflicts=True,
+                )
+                self.category_ids.update(
+                    Category.objects.filter(slug__in=missing_categories).values_list('slug', 'id')
+                )
+            if missing_brands:
+                Brand.objects.bulk_create(
+                    [Brand(name=slug.replace('-', ' ').title(), slug=slug) for slug in missing_brands],
+                    ignore_conflicts=True,
+                )
+                self.brand_ids.update(
+                    Brand.objects.filter(slug__in=missing_brands).values_list('slug', 'id')
+                )
+            missing_categories = missing_categories - self.category_ids.keys()
+            missing_brands = missing_brands - self.brand_ids.keys()
+
+        if self.create_missing and self.dry_run:
+            return rows
+
+        resolved = []
+        for row in rows:
+            if row['category'] in missing_categories:
+                self.row_error(row['sku'], f"unknown category {row['category']!r}")
+                continue
+            if row['brand'] in missing_brands:
+                self.row_error(row['sku'], f"unknown brand {row['brand']!r}")
+                continue
+            resolved.append(row)
+        return resolved
+
+    def check_slugs(self, rows):
+        """
+        Drop rows whose slug belongs to another SKU, here or in this batch.
+        The upsert would otherwise fail the batch (Postgres/SQLite) or, on
+        MySQL where it fires on any unique key, overwrite that other product.
+        """
+        owners = dict(Product.objects.filter(slug__in=[r['slug'] for r in rows]).values_list('slug', 'sku'))
+        checked = []
+        for row in rows:
+            owner = owners.setdefault(row['slug'], row['sku'])
+            if owner != row['sku']:
+                self.row_error(row['sku'], f"slug {row['slug']!r} already belongs to SKU {owner!r}")
+                continue
+            checked.append(row)
+        return checked
+
+    def upsert_products(self, rows):
+        now = timezone.now()
+        products = []
+        for row in rows:
+            fields = {k: v for k, v in row.items() if k not in ('category', 'brand', 'specifications', 'images')}
+            products.append(Product(
+                category_id=self.category_ids.get(row['category']),
+                brand_id=self.brand_ids.get(row['brand']),
+                updated_at=now,
+                **fields,
+            ))
+
+        # MySQL upserts on any unique key and rejects an explicit conflict target
+        unique_fields = ['sku'] if connection.features.supports_update_conflicts_with_target else None
+        Product.objects.bulk_create(
+            products,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=PRODUCT_UPDATE_FIELDS,
+        )
+        # PKs aren't returned for upserts on every backend (MySQL), so look them up
+        product_ids = dict(Product.objects.filter(sku__in=[r['sku'] for r in rows]).values_list('sku', 'id'))
+        missing = [r['sku'] for r in rows if r['sku'] not in product_ids]
+        if missing:
+            # The upsert hit another unique key instead of inserting: undo the batch
+            raise IntegrityError(f"SKUs not written: {', '.join(missing[:10])}")
+        return product_ids
+
+    def sync_specifications(self, rows, product_ids):
+        """Make each product's specifications match its record (keyed by name)"""
+        incoming = {
+            product_ids[row['sku']]: row['specifications']
+            for row in rows if row['specifications'] is not None
+        }
+        if not incoming:
+            return
+
+        existing = {}
+        for spec in ProductSpecification.objects.filter(product_id__in=incoming.keys()):
+            existing[(spec.product_id, spec.name)] = spec
+
+        to_create, to_update, keep = [], [], set()
+        for product_id, specs in incoming.items():
+            for spec in specs:
+                key = (product_id, spec['name'])
+                current = existing.get(key)
+                if current is None:
+                    to_create.append(ProductSpecification(product_id=product_id, **spec))
+                else:
+                    keep.add(current.pk)
+                    if current.value != spec['value'] or current.order != spec['order']:
+                        current.value = spec['value']
+                        current.order = spec['order']
+                        to_update.append(current)
+
+        stale = [spec.pk for spec in existing.values() if spec.pk not in keep]
+        if stale:
+            ProductSpecification.objects.filter(pk__in=stale).delete()
+        ProductSpecification.objects.bulk_create(to_create)
+        ProductSpecification.objects.bulk_update(to_update, ['value', 'order'])
+
+        self.stats['specs_created'] += len(to_create)
+        self.stats['specs_updated'] += len(to_update)
+        self.stats['specs_deleted'] += len(stale)
+
+    def sync_images(self, rows, product_ids):
+        """Make each product's images match its record (keyed by image path/URL)"""
+        incoming = {
+            product_ids[row['sku']]: row['images']
+            for row in rows if row['images'] is not None
+        }
+        if not incoming:
+            return
+
+        existing = {}
+        for img in ProductImage.objects.filter(product_id__in=incoming.keys()):
+            existing[(img.product_id, str(img.image))] = img
+
+        # bulk_create/bulk_update skip ProductImage.save(), so clean_record()
+        # already guarantees a single primary per product
+        to_create, to_update, keep = [], [], set()
+        for product_id, images in incoming.items():
+            for img in images:
+                current = existing.get((product_id, img['image']))
+                if current is None:
+                    to_create.append(ProductImage(product_id=product_id, **img))
+                else:
+                    keep.add(current.pk)
+                    if (current.alt_text, current.is_primary, current.order) != \
+                            (img['alt_text'], img['is_primary'], img['order']):
+                        current.alt_text = img['alt_text']
+                        current.is_primary = img['is_primary']
+                        current.order = img['order']
+                        to_update.append(current)
+
+        stale = [img.pk for img in existing.values() if img.pk not in keep]
+        if stale:
+            ProductImage.objects.filter(pk__in=stale).delete()
+        ProductImage.objects.bulk_create(to_create)
+        ProductImage.objects.bulk_update(to_update, ['alt_text', 'is_primary', 'order'])
+        # The bulk writes skip the signals that keep Product's card image snapshot current
+        sync_primary_images(incoming.keys())
+
+        self.stats['images_created'] += len(to_create)
+        self.stats['images_updated'] += len(to_update)
+        self.stats['images_deleted'] += len(stale)
+
+    # -------------------------------
+    # REPORTING
+    # -------------------------------
+    def row_error(self, row, error):
+        self.stats['invalid'] += 1
+        if self.errors_shown < self.max_errors:
+            self.errors_shown += 1
+            self.stderr.write(self.style.WARNING(f"  ⚠️ Row {row}: {error}"))
+
+    def report_progress(self, started):
+        elapsed = time.monotonic() - started
+        rate = self.stats['rows'] / elapsed if elapsed else 0
+        self.stdout.write(
+            f"  ✓ {self.stats['rows']:,} rows ({rate:,.0f} rows/s, "
+            f"peak {self.peak_memory_mb():.1f} MB)"
+        )
+
+    @staticmethod
+    def peak_memory_mb():
+        if resource is None:
+            return 0.0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class _Prepend:
+    """Re-attach characters already consumed while sniffing the input"""
+
+    def __init__(self, head, f):
+        self.head = head
+        self.f = f
+
+    def read(self, size=-1):
+        if self.head:
+            data, self.head = self.head + self.f.read(size), ''
+            return data
+        return self.f.read(size)
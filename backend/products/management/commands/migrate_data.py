@@ -1,14 +1,13 @@
-import os
-import sys
-import django
+# products/management/commands/migrate_data.py
+import json
+from decimal import Decimal
 
-# Setup Django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nextshopsphere.settings')
-django.setup()
+from django.core.management.base import BaseCommand
 
 from products.models import Category, Brand, Product, ProductImage, ProductSpecification, ShippingOption
 
-def export_data():
+
+def export_data(out):
     """Export data from local database"""
     data = {
         'categories': [],
@@ -109,22 +108,20 @@ def export_data():
             'display_order': ship.display_order,
         })
 
-    print(f"Exported: {len(data['categories'])} categories")
-    print(f"Exported: {len(data['brands'])} brands")
-    print(f"Exported: {len(data['products'])} products")
-    print(f"Exported: {len(data['images'])} images")
-    print(f"Exported: {len(data['specifications'])} specifications")
-    print(f"Exported: {len(data['shipping'])} shipping options")
+    out.write(f"Exported: {len(data['categories'])} categories")
+    out.write(f"Exported: {len(data['brands'])} brands")
+    out.write(f"Exported: {len(data['products'])} products")
+    out.write(f"Exported: {len(data['images'])} images")
+    out.write(f"Exported: {len(data['specifications'])} specifications")
+    out.write(f"Exported: {len(data['shipping'])} shipping options")
 
     return data
 
 
-def import_data(data):
+def import_data(data, out):
     """Import data to Railway database"""
-    from decimal import Decimal
-
     # Clear existing data
-    print("Clearing existing data...")
+    out.write("Clearing existing data...")
     ProductImage.objects.all().delete()
     ProductSpecification.objects.all().delete()
     Product.objects.all().delete()
@@ -133,7 +130,7 @@ def import_data(data):
     ShippingOption.objects.all().delete()
 
     # Import categories (parent=None first)
-    print("Importing categories...")
+    out.write("Importing categories...")
     for cat_data in sorted(data['categories'], key=lambda x: (x['parent_id'] or 0)):
         Category.objects.create(
             id=cat_data['id'],
@@ -148,7 +145,7 @@ def import_data(data):
         )
 
     # Import brands
-    print("Importing brands...")
+    out.write("Importing brands...")
     for brand_data in data['brands']:
         Brand.objects.create(
             id=brand_data['id'],
@@ -161,7 +158,7 @@ def import_data(data):
         )
 
     # Import products
-    print("Importing products...")
+    out.write("Importing products...")
     for prod_data in data['products']:
         Product.objects.create(
             id=prod_data['id'],
@@ -188,7 +185,7 @@ def import_data(data):
         )
 
     # Import images
-    print("Importing images...")
+    out.write("Importing images...")
     for img_data in data['images']:
         img = ProductImage(
             id=img_data['id'],
@@ -203,7 +200,7 @@ def import_data(data):
         img.save()
 
     # Import specifications
-    print("Importing specifications...")
+    out.write("Importing specifications...")
     for spec_data in data['specifications']:
         ProductSpecification.objects.create(
             id=spec_data['id'],
@@ -214,7 +211,7 @@ def import_data(data):
         )
 
     # Import shipping options
-    print("Importing shipping options...")
+    out.write("Importing shipping options...")
     for ship_data in data['shipping']:
         ShippingOption.objects.create(
             id=ship_data['id'],
@@ -230,32 +227,29 @@ def import_data(data):
             display_order=ship_data['display_order'],
         )
 
-    print("\n✅ Import complete!")
-    print(f"Categories: {Category.objects.count()}")
-    print(f"Brands: {Brand.objects.count()}")
-    print(f"Products: {Product.objects.count()}")
-    print(f"Images: {ProductImage.objects.count()}")
-
+    out.write("\n✅ Import complete!")
+    out.write(f"Categories: {Category.objects.count()}")
+    out.write(f"Brands: {Brand.objects.count()}")
+    out.write(f"Products: {Product.objects.count()}")
+    out.write(f"Images: {ProductImage.objects.count()}")
 
-if __name__ == '__main__':
-    if len(sys.argv) < 2:
-        print("Usage: python migrate_data.py [export|import]")
-        sys.exit(1)
 
-    command = sys.argv[1]
 
-    if command == 'export':
-        import json
-        data = export_data()
-        with open('data_backup.json', 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print("\n✅ Data exported to data_backup.json")
+class Command(BaseCommand):
+    help = "Export the catalog from this database to a JSON backup, or replace the catalog with one."
 
-    elif command == 'import':
-        import json
-        with open('data_backup.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        import_data(data)
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['export', 'import'])
+        parser.add_argument('--file', default='data_backup.json', help="Backup file (default: data_backup.json)")
 
-    else:
-        print("Unknown command. Use 'export' or 'import'")
\ No newline at end of file
+    def handle(self, *args, **options):
+        path = options['file']
+        if options['action'] == 'export':
+            data = export_data(self.stdout)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"\n✅ Data exported to {path}"))
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            import_data(data, self.stdout)
@@ -0,0 +1,64 @@
+# products/management/commands/repair_image_references.py
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from products.references import IMAGE_FIELDS, RepairReport, repair_image_fields, repair_order_items
+
+
+class Command(BaseCommand):
+    help = "Normalise stored image references and repair order item image snapshots, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows per read and bulk_update")
+        parser.add_argument('--only', choices=['images', 'orders'], help="Only the image fields or only order items")
+        parser.add_argument('--refresh-snapshots', action='store_true',
+                            help="Replace every order item snapshot with the product's current primary image")
+        parser.add_argument('--cloud-name', help="Cloud name for building URLs (default: Cloudinary config)")
+        parser.add_argument('--diff', help="Write every change as NDJSON to this file")
+        parser.add_argument('--samples', type=int, default=10, help="Changes to print per table")
+        parser.add_argument('--dry-run', action='store_true', help="Report changes without writing them")
+
+    def handle(self, *args, **options):
+        report = RepairReport()
+        printed = {}
+        diff_file = open(options['diff'], 'w') if options['diff'] else None
+
+        def on_change(table, pk, field, old, new):
+            if diff_file:
+                diff_file.write(json.dumps({'table': table, 'id': pk, 'field': field, 'old': old, 'new': new}) + '\n')
+            if printed.get(table, 0) < options['samples']:
+                printed[table] = printed.get(table, 0) + 1
+                self.stdout.write(f"  {table} #{pk} {field}:\n    - {str(old)[:100]}\n    + {str(new)[:100]}")
+
+        started = time.monotonic()
+        try:
+            if options['only'] != 'orders':
+                self.stdout.write("\n🖼️  Image fields:")
+                repair_image_fields(report, options['batch_size'], options['dry_run'], on_change)
+            if options['only'] != 'images':
+                self.stdout.write("\n🧾 Order items:")
+                repair_order_items(
+                    report, options['batch_size'], options['dry_run'],
+                    refresh=options['refresh_snapshots'],
+                    cloud_name=options['cloud_name'],
+                    on_change=on_change,
+                )
+        finally:
+            if diff_file:
+                diff_file.close()
+
+        self.stdout.write("\n📊 Summary:")
+        for table in [*IMAGE_FIELDS, 'order_items']:
+            if table not in report.scanned:
+                continue
+            line = f"  {table}: {report.scanned[table]:,} scanned, {report.changed.get(table, 0):,} changed"
+            if report.unresolved.get(table):
+                line += f", {report.unresolved[table]:,} still without a usable image"
+            self.stdout.write(line)
+
+        verb = "Would repair" if options['dry_run'] else "Repaired"
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✅ {verb} {sum(report.changed.values()):,} rows in {time.monotonic() - started:.1f}s"
+        ))
@@ -0,0 +1,61 @@
+# products/management/commands/sync_media.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from products.media_sync import DEFAULT_MANIFEST, TARGETS, Manifest, SyncReport, configure, sync_target
+
+
+class Command(BaseCommand):
+    help = "Upload local product, category and brand images to Cloudinary (concurrent, resumable)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', action='append', choices=sorted(TARGETS), help="Only sync this kind (repeatable)")
+        parser.add_argument('--workers', type=int, default=8, help="Concurrent uploads")
+        parser.add_argument('--batch-size', type=int, default=200, help="Rows per bulk_update")
+        parser.add_argument('--manifest', default=DEFAULT_MANIFEST, help="Upload manifest used to resume")
+        parser.add_argument('--api-url', help="Upload endpoint override, e.g. http://127.0.0.1:8765 for a local fake")
+        parser.add_argument('--dry-run', action='store_true', help="Report what would be uploaded")
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError("--workers must be at least 1")
+
+        configure(options['api_url'])
+        manifest = Manifest(options['manifest'])
+        report = SyncReport()
+        started = time.monotonic()
+
+        self.stdout.write(f"\n☁️  Syncing media ({len(manifest.entries)} uploads already in the manifest)")
+        try:
+            for name in options['only'] or TARGETS:
+                self.stdout.write(f"\n📦 {name}:")
+                before = (report.rows, report.files, report.uploaded, report.reused)
+                sync_target(
+                    name, manifest,
+                    workers=options['workers'],
+                    batch_size=options['batch_size'],
+                    dry_run=options['dry_run'],
+                    report=report,
+                )
+                rows, files, uploaded, reused = (
+                    now - then for now, then in
+                    zip((report.rows, report.files, report.uploaded, report.reused), before)
+                )
+                verb = "to upload" if options['dry_run'] else "uploaded"
+                self.stdout.write(f"  ✓ {rows} local rows, {files} distinct files: {uploaded} {verb}, {reused} already uploaded")
+        finally:
+            manifest.close()
+
+        for name, pk, path in report.missing:
+            self.stdout.write(self.style.WARNING(f"  ⚠️ {name} #{pk}: missing file {path}"))
+        for name, path, error in report.failed:
+            self.stdout.write(self.style.ERROR(f"  ❌ {name}: {path} | {error}"))
+
+        verb = "Would update" if options['dry_run'] else "Updated"
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✅ {verb} {report.updated} rows in {time.monotonic() - started:.1f}s "
+            f"({len(report.missing)} missing, {len(report.failed)} failed)"
+        ))
+        if report.failed:
+            raise CommandError("Some uploads failed; run the command again to retry them")
@@ -0,0 +1,237 @@
+# products/media_sync.py
+"""
+Local media -> Cloudinary sync.
+
+Finds ProductImage / Category / Brand rows whose image still points at a file
+under MEDIA_ROOT, uploads each distinct file once (keyed by its SHA-256, so
+copies of the same image share one upload) on a bounded thread pool, and
+writes the new references back with bulk_update in batches.
+
+Every finished upload is appended to a JSON-lines manifest before its rows are
+updated, so an interrupted run can be restarted and only the files that never
+completed are uploaded again.
+"""
+
+import hashlib
+import json
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+import cloudinary
+import cloudinary.uploader
+from django.conf import settings
+
+from .models import Brand, Category, ProductImage
+
+# (model, image field, Cloudinary folder, what to store: public_id or secure_url)
+# ProductImage.image is a CloudinaryField (public id); the others are plain
+# ImageFields, which the serializers read as absolute URLs.
+TARGETS = {
+    'products': (ProductImage, 'image', 'products', 'public_id'),
+    'categories': (Category, 'image', 'categories', 'secure_url'),
+    'brands': (Brand, 'logo', 'brands', 'secure_url'),
+}
+
+DEFAULT_MANIFEST = os.path.join(settings.MEDIA_ROOT, '.cloudinary-manifest.jsonl')
+
+
+def is_remote(value):
+    """True if a stored image reference is already on Cloudinary (or empty)"""
+    value = str(value or '')
+    if not value:
+        return True
+    if value.startswith(('http://', 'https://')) or 'res.cloudinary.com' in value:
+        return True
+    # Bare public ids (no folder) were written by earlier syncs
+    return '/' not in value and '\\' not in value
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def configure(api_url=None):
+    """Point the SDK at a different upload endpoint (e.g. a local fake)"""
+    if not api_url:
+        return
+    config = cloudinary.config()
+    cloudinary.config(
+        upload_prefix=api_url.rstrip('/'),
+        cloud_name=config.cloud_name or 'local',
+        api_key=config.api_key or 'local',
+        api_secret=config.api_secret or 'local',
+    )
+
+
+def upload_file(path, folder, digest):
+    """Upload one file under a content-addressed public id"""
+    result = cloudinary.uploader.upload(
+        path,
+        folder=folder,
+        public_id=digest[:32],
+        overwrite=False,
+        unique_filename=False,
+        resource_type='image',
+    )
+    return {'public_id': result['public_id'], 'secure_url': result['secure_url']}
+
+
+# ============ MANIFEST ============
+
+class Manifest:
+    """Append-only record of finished uploads: {folder:sha256: result}"""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self._file = None
+        if path and os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by a crash
+                    self.entries[self.key(entry['folder'], entry['sha256'])] = entry
+
+    @staticmethod
+    def key(folder, digest):
+        return f'{folder}:{digest}'
+
+    def get(self, folder, digest):
+        return self.entries.get(self.key(folder, digest))
+
+    def add(self, folder, digest, result):
+        entry = {'folder': folder, 'sha256': digest, **result}
+        self.entries[self.key(folder, digest)] = entry
+        if self.path:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                self._file = open(self.path, 'a')
+            self._file.write(json.dumps(entry) + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        return entry
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+# ============ SYNC ============
+
+@dataclass
+class SyncReport:
+    rows: int = 0
+    files: int = 0
+    uploaded: int = 0
+    reused: int = 0
+    updated: int = 0
+    missing: list = field(default_factory=list)
+    failed: list = field(default_factory=list)
+
+
+def stored_name(value):
+    """The raw stored string; CloudinaryField hands back a resource without its extension"""
+    if hasattr(value, 'public_id'):
+        if not value.public_id:
+            return ''
+        return f'{value.public_id}.{value.format}' if value.format else value.public_id
+    return str(value or '')
+
+
+def local_rows(model, field_name):
+    """(pk, stored name) for rows whose image is still a local file"""
+    rows = model.objects.exclude(**{f'{field_name}__isnull': True}).exclude(**{field_name: ''})
+    for pk, value in rows.order_by('pk').values_list('pk', field_name).iterator():
+        value = stored_name(value)
+        if not is_remote(value):
+            yield pk, value
+
+
+def sync_target(name, manifest, workers=8, batch_size=200, dry_run=False, progress=None, report=None):
+    """Sync one entry of TARGETS; returns the (updated) SyncReport"""
+    model, field_name, folder, stored = TARGETS[name]
+    report = report or SyncReport()
+
+    # Group rows by file content so each distinct image is uploaded once
+    by_digest = defaultdict(list)
+    paths = {}
+    for pk, value in local_rows(model, field_name):
+        report.rows += 1
+        path = os.path.join(settings.MEDIA_ROOT, value)
+        if not os.path.exists(path):
+            report.missing.append((name, pk, value))
+            continue
+        digest = file_digest(path)
+        by_digest[digest].append(pk)
+        paths.setdefault(digest, path)
+    report.files += len(by_digest)
+
+    pending = []
+
+    def flush():
+        if pending and not dry_run:
+            model.objects.bulk_update(pending, [field_name], batch_size=batch_size)
+            if model is ProductImage:
+                # bulk_update skips the signals behind Product's card image snapshot
+                from .signals import sync_primary_images
+                sync_primary_images(
+                    ProductImage.objects.filter(pk__in=[i.pk for i in pending]).values_list('product_id', flat=True)
+                )
+        report.updated += len(pending)
+        pending.clear()
+
+    def resolved(digest, result):
+        for pk in by_digest[digest]:
+            instance = model(pk=pk)
+            setattr(instance, field_name, result[stored])
+            pending.append(instance)
+        if len(pending) >= batch_size:
+            flush()
+        if progress:
+            progress(name, report)
+
+    to_upload = []
+    for digest in by_digest:
+        entry = manifest.get(folder, digest)
+        if entry:
+            report.reused += 1
+            resolved(digest, entry)
+        else:
+            to_upload.append(digest)
+
+    if dry_run:
+        report.uploaded += len(to_upload)
+        for digest in to_upload:
+            resolved(digest, {'public_id': '', 'secure_url': ''})
+        flush()
+        return report
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(upload_file, paths[digest], folder, digest): digest for digest in to_upload}
+        try:
+            for future in as_completed(futures):
+                digest = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    report.failed.append((name, paths[digest], str(e)))
+                    continue
+                manifest.add(folder, digest, result)
+                report.uploaded += 1
+                resolved(digest, result)
+        finally:
+            # Keep what finished even if we're interrupted
+            for future in futures:
+                future.cancel()
+            flush()
+
+    return report
@@ -0,0 +1,65 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill(apps, schema_editor):
+    # Same choice as products.signals: primary image, else the first by order
+    Product = apps.get_model('products', 'Product')
+    ProductImage = apps.get_model('products', 'ProductImage')
+    batch_size = 1000
+    last_id = 0
+    while True:
+        product_ids = list(
+            Product.objects.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not product_ids:
+            return
+        last_id = product_ids[-1]
+
+        chosen = {}
+        images = ProductImage.objects.filter(product_id__in=product_ids).order_by('product_id', '-is_primary', 'order', 'id')
+        for image in images:
+            chosen.setdefault(image.product_id, image)
+
+        updates = []
+        for product_id in product_ids:
+            image = chosen.get(product_id)
+            url = ''
+            if image is not None and image.image:
+                try:
+                    url = image.image.url
+                except Exception:
+                    pass
+            updates.append(Product(
+                pk=product_id,
+                primary_image=image,
+                primary_image_url=url,
+                primary_image_variants=image.variants if image is not None else {},
+            ))
+        Product.objects.bulk_update(updates, ['primary_image', 'primary_image_url', 'primary_image_variants'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_productimage_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='primary_image',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='products.productimage'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='primary_image_url',
+            field=models.URLField(blank=True, default='', editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='primary_image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_product_primary_image_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productimage',
+            name='upload_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='upload_path',
+            field=models.CharField(blank=True, help_text='Spooled file awaiting upload', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='upload_status',
+            field=models.CharField(blank=True, choices=[('', 'None'), ('pending', 'Pending'), ('uploading', 'Uploading'), ('failed', 'Failed')], default='', max_length=20),
+        ),
+    ]
@@ -1,8 +1,10 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 from cloudinary.models import CloudinaryField
 
+from nextshopsphere.uploads import UPLOAD_STATUS_CHOICES
+
 
 class Category(models.Model):
     """Product categories with optional parent for nesting"""
@@ -239,6 +241,17 @@ class Product(models.Model):
         default=False,
         help_text="Show 'Bestseller' badge on product"
     )
+    # Snapshot of the card image (primary, else first), kept current by products/signals.py
+    primary_image = models.ForeignKey(
+        'ProductImage',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        editable=False,
+    )
+    primary_image_url = models.URLField(max_length=500, blank=True, default='', editable=False)
+    primary_image_variants = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -287,6 +300,15 @@ class ProductImage(models.Model):
         default=0,
         help_text="Display order (0 = first, 1 = second, etc.)"
     )
+    variants = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Resized derivatives as {format: {width: url}} (products/images.py)"
+    )
+    # Background upload of `image` (nextshopsphere/uploads.py); empty until it lands
+    upload_status = models.CharField(max_length=20, choices=UPLOAD_STATUS_CHOICES, blank=True, default='')
+    upload_error = models.TextField(blank=True)
+    upload_path = models.CharField(max_length=500, blank=True, help_text="Spooled file awaiting upload")
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -296,12 +318,17 @@ class ProductImage(models.Model):
         return f"{self.product.name} - Image {self.order}"
 
     def save(self, *args, **kwargs):
-        if self.is_primary:
-            ProductImage.objects.filter(
-                product=self.product,
-                is_primary=True
-            ).update(is_primary=False)
-        super().save(*args, **kwargs)
+        # The product snapshot (post_save) is refreshed in the same transaction
+        with transaction.atomic():
+            if self.is_primary:
+                # The product row already knows the current primary: demote it by pk
+                ProductImage.objects.filter(
+                    pk=models.Subquery(
+                        Product.objects.filter(pk=self.product_id).values('primary_image_id')[:1]
+                    ),
+                    is_primary=True,
+                ).exclude(pk=self.pk).update(is_primary=False)
+            super().save(*args, **kwargs)
 
 
 
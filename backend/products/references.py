@@ -0,0 +1,245 @@
+# products/references.py
+"""
+Image reference repair.
+
+Older imports and sync scripts left image references in several shapes:
+full Cloudinary URLs in CloudinaryFields, URL-encoded or half-schemed URLs
+("/media/https%3A/res.cloudinary.com/…", "https:/res…"), Windows separators,
+and order items whose image snapshot is empty or not a usable URL.
+
+Everything here is set-based: tables are walked in primary-key order in
+fixed-size batches, corrections are computed in memory against maps built
+with one query each, and written back with bulk_update. Raw column values
+are read through Cast so CloudinaryField's own parsing doesn't hide what is
+actually stored.
+"""
+
+import re
+from dataclasses import dataclass, field
+from urllib.parse import unquote
+
+from cloudinary import CloudinaryResource
+from django.db.models import CharField
+from django.db.models.functions import Cast
+
+from .models import Brand, Category, Product, ProductImage
+from .signals import sync_primary_images
+
+# res.cloudinary.com/<cloud>/<resource type>/<delivery type>/[transformations/][v<version>/]<public id>[.<format>]
+CLOUDINARY_URL = re.compile(
+    r'res\.cloudinary\.com/(?P<cloud>[^/]+)/(?P<resource_type>image|video|raw)/'
+    r'(?P<type>upload|private|authenticated)/(?:[a-z]{1,3}_[^/]*/)*'
+    r'(?:v(?P<version>\d+)/)?(?P<public_id>.+?)(?:\.(?P<format>[A-Za-z0-9]{2,5}))?$'
+)
+
+# What CloudinaryField stores: <resource type>/<delivery type>/[v<version>/]<public id>[.<format>]
+STORED_RESOURCE = re.compile(
+    r'^(?P<resource_type>image|video|raw)/(?P<type>upload|private|authenticated)/'
+    r'(?:v(?P<version>\d+)/)?(?P<public_id>.+?)(?:\.(?P<format>[A-Za-z0-9]{2,5}))?$'
+)
+
+# (model, field, how the field is read: 'resource' = CloudinaryField, 'url' = absolute URL)
+IMAGE_FIELDS = {
+    'product_images': (ProductImage, 'image', 'resource'),
+    'categories': (Category, 'image', 'url'),
+    'brands': (Brand, 'logo', 'url'),
+}
+
+
+def clean(value):
+    return unquote(str(value or '')).replace('\\', '/').strip()
+
+
+def parse_url(value):
+    """Match dict for a Cloudinary URL anywhere in `value` (however mangled), or None"""
+    match = CLOUDINARY_URL.search(clean(value))
+    return match.groupdict() if match else None
+
+
+def as_stored_resource(parts):
+    """CloudinaryField's database form for parsed URL parts"""
+    stored = f"{parts['resource_type']}/{parts['type']}/"
+    if parts.get('version'):
+        stored += f"v{parts['version']}/"
+    stored += parts['public_id']
+    if parts.get('format'):
+        stored += f".{parts['format']}"
+    return stored
+
+
+def normalize(value, kind):
+    """The corrected reference for a stored value, or the value itself if it's fine"""
+    if not value:
+        return value
+    parts = parse_url(value)
+    if parts:
+        if kind == 'resource':
+            return as_stored_resource(parts)
+        return 'https://' + CLOUDINARY_URL.search(clean(value)).group(0)
+    if '\\' in value:
+        return value.replace('\\', '/').lstrip('/')
+    return value
+
+
+def delivery_url(value, cloud_name=None):
+    """Absolute https URL for a stored image reference, or None if it can't be built"""
+    if not value:
+        return None
+    parts = parse_url(value)
+    if parts:
+        return 'https://' + CLOUDINARY_URL.search(clean(value)).group(0)
+    match = STORED_RESOURCE.match(clean(value))
+    if not match:
+        return None
+    parts = match.groupdict()
+    resource = CloudinaryResource(
+        parts['public_id'],
+        format=parts['format'],
+        version=parts['version'],
+        type=parts['type'],
+        resource_type=parts['resource_type'],
+    )
+    options = {'secure': True}
+    if cloud_name:
+        options['cloud_name'] = cloud_name
+    try:
+        return resource.build_url(**options)
+    except Exception:
+        # No cloud name configured
+        return None
+
+
+def is_usable_url(value):
+    value = str(value or '')
+    return value.startswith('https://') and parse_url(value) is not None and clean(value) == value
+
+
+# ============ BATCHED SCAN ============
+
+@dataclass
+class RepairReport:
+    scanned: dict = field(default_factory=dict)
+    changed: dict = field(default_factory=dict)
+    unresolved: dict = field(default_factory=dict)
+
+    def count(self, bucket, name, n=1):
+        getattr(self, bucket)[name] = getattr(self, bucket).get(name, 0) + n
+
+
+def raw_rows(model, fields, batch_size, **filters):
+    """Yield lists of dicts with raw (Cast) values, walking the primary key in batches"""
+    annotations = {f'raw_{name}': Cast(name, output_field=CharField()) for name in fields}
+    last_id = 0
+    while True:
+        batch = list(
+            model.objects.filter(pk__gt=last_id, **filters)
+            .annotate(**annotations)
+            .order_by('pk')
+            .values('pk', *annotations)[:batch_size]
+        )
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1]['pk']
+
+
+def repair_image_fields(report, batch_size=1000, dry_run=False, on_change=None):
+    """Normalise ProductImage / Category / Brand image references"""
+    for name, (model, field_name, kind) in IMAGE_FIELDS.items():
+        for batch in raw_rows(model, [field_name], batch_size):
+            report.count('scanned', name, len(batch))
+            updates = []
+            for row in batch:
+                old = row[f'raw_{field_name}']
+                new = normalize(old, kind)
+                if new != old:
+                    updates.append(model(pk=row['pk'], **{field_name: new}))
+                    if on_change:
+                        on_change(name, row['pk'], field_name, old, new)
+            if updates:
+                report.count('changed', name, len(updates))
+                if not dry_run:
+                    model.objects.bulk_update(updates, [field_name], batch_size=batch_size)
+                    if model is ProductImage:
+                        # Keep Product's card image snapshot in step (bulk_update skips signals)
+                        sync_primary_images(
+                            ProductImage.objects.filter(pk__in=[u.pk for u in updates])
+                            .values_list('product_id', flat=True)
+                        )
+
+
+def primary_image_urls(cloud_name=None):
+    """{product id: delivery URL of its primary (else first) image}, one query"""
+    urls = {}
+    rows = (
+        ProductImage.objects.annotate(raw=Cast('image', output_field=CharField()))
+        .order_by('product_id', '-is_primary', 'order', 'id')
+        .values_list('product_id', 'raw')
+    )
+    for product_id, raw in rows.iterator(chunk_size=5000):
+        if product_id not in urls:
+            urls[product_id] = delivery_url(normalize(raw, 'resource'), cloud_name)
+    return urls
+
+
+def product_ids_for_slugs(slugs, chunk_size=1000):
+    slugs = list(slugs)
+    found = {}
+    for start in range(0, len(slugs), chunk_size):
+        found.update(Product.objects.filter(slug__in=slugs[start:start + chunk_size]).values_list('slug', 'pk'))
+    return found
+
+
+def repair_order_items(report, batch_size=1000, dry_run=False, refresh=False, cloud_name=None, on_change=None):
+    """
+    Relink order items that lost their product (by slug) and fix their image
+    snapshot: malformed URLs are cleaned up, and empty or unusable snapshots
+    are taken from the product's primary image. With `refresh`, every
+    snapshot is replaced by the current primary image.
+    """
+    from orders.models import OrderItem
+
+    images = primary_image_urls(cloud_name)
+    orphan_slugs = (
+        OrderItem.objects.filter(product__isnull=True)
+        .exclude(product_slug__isnull=True).exclude(product_slug='')
+        .values_list('product_slug', flat=True).distinct().order_by()
+    )
+    slug_ids = product_ids_for_slugs(orphan_slugs)
+
+    name = 'order_items'
+    last_id = 0
+    while True:
+        batch = list(
+            OrderItem.objects.filter(pk__gt=last_id)
+            .order_by('pk')
+            .values_list('pk', 'product_id', 'product_slug', 'product_image')[:batch_size]
+        )
+        if not batch:
+            break
+        last_id = batch[-1][0]
+        report.count('scanned', name, len(batch))
+
+        updates = []
+        for pk, product_id, slug, image in batch:
+            new_product_id = product_id or slug_ids.get(slug)
+            new_image = image
+            if image and not is_usable_url(image) and parse_url(image):
+                new_image = delivery_url(image, cloud_name)
+            if refresh or not is_usable_url(new_image):
+                new_image = images.get(new_product_id) or new_image
+
+            if not is_usable_url(new_image):
+                report.count('unresolved', name)
+            if (new_product_id, new_image) != (product_id, image):
+                updates.append(OrderItem(pk=pk, product_id=new_product_id, product_image=new_image))
+                if on_change:
+                    if new_product_id != product_id:
+                        on_change(name, pk, 'product_id', product_id, new_product_id)
+                    if new_image != image:
+                        on_change(name, pk, 'product_image', image, new_image)
+
+        if updates:
+            report.count('changed', name, len(updates))
+            if not dry_run:
+                OrderItem.objects.bulk_update(updates, ['product_id', 'product_image'], batch_size=batch_size)
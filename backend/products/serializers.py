@@ -1,9 +1,10 @@
 # products/serializers.py
 
 from rest_framework import serializers
-from django.db.models import Avg
+from django.db.models import Count
 from urllib.parse import unquote
 import re
+from nextshopsphere import uploads
 from .models import (
     Category, Product, ProductImage, ProductSpecification,
     Brand, ShippingOption
@@ -152,6 +153,29 @@ class CategorySerializer(serializers.ModelSerializer):
         return count
 
 
+def available_counts_queryset(category_ids):
+    """(category id, available products) rows for the given categories, one GROUP BY"""
+    return (
+        Product.objects.filter(category_id__in=category_ids, is_available=True)
+        .values_list('category_id')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+
+
+def category_product_counts(category_ids):
+    """{category id: available products}, for a listing's context['category_product_counts']"""
+    category_ids = {category_id for category_id in category_ids if category_id}
+    if not category_ids:
+        return {}
+    return dict(available_counts_queryset(category_ids))
+
+
+def listing_context(products):
+    """Serializer context for a page of ProductListSerializer rows (their category counts)"""
+    return {'category_product_counts': category_product_counts(p.category_id for p in products)}
+
+
 class CategoryListSerializer(serializers.ModelSerializer):
     product_count = serializers.SerializerMethodField()
     image_url = serializers.SerializerMethodField()
@@ -164,6 +188,10 @@ class CategoryListSerializer(serializers.ModelSerializer):
         return get_image_url(obj.image, self.context.get('request'))
 
     def get_product_count(self, obj):
+        # Listings can precompute counts for all their categories in one query
+        counts = self.context.get('category_product_counts')
+        if counts is not None:
+            return counts.get(obj.id, 0)
         return obj.products.filter(is_available=True).count()
 
 
@@ -192,14 +220,43 @@ class CategoryTreeSerializer(serializers.ModelSerializer):
 
 # ============ PRODUCT IMAGE SERIALIZER ============
 
+def variant_urls(variants, request=None):
+    """{format: {width: absolute url}}; local-storage derivatives are relative"""
+    return {
+        fmt: {
+            width: request.build_absolute_uri(url) if request and url.startswith('/') else url
+            for width, url in urls.items()
+        }
+        for fmt, urls in (variants or {}).items()
+    }
+
+
+def srcset(urls):
+    """Ready-made srcset strings per format, e.g. {"webp": "… 320w, … 640w"}"""
+    return {
+        fmt: ', '.join(f'{by_width[width]} {width}w' for width in sorted(by_width, key=int))
+        for fmt, by_width in urls.items()
+    }
+
+
 class ProductImageSerializer(serializers.ModelSerializer):
+    image = serializers.ImageField(write_only=True, required=False)
     image_url = serializers.SerializerMethodField()
+    variants = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
+    upload_status = serializers.SerializerMethodField()
+    upload_error = serializers.SerializerMethodField()
 
     class Meta:
         model = ProductImage
         fields = [
             'id',
+            'image',
             'image_url',
+            'upload_status',
+            'upload_error',
+            'variants',
+            'srcset',
             'alt_text',
             'is_primary',
             'order'
@@ -210,6 +267,35 @@ class ProductImageSerializer(serializers.ModelSerializer):
             return obj.image.url  # ✅ THIS LINE FIXES EVERYTHING
         return None
 
+    def validate_image(self, value):
+        """Sniffs the real type and checks size/dimensions"""
+        try:
+            uploads.validate_image(value)
+        except uploads.UploadRejected as e:
+            raise serializers.ValidationError(str(e))
+        return value
+
+    def validate(self, attrs):
+        request = self.context.get('request')
+        if request is not None and uploads.oversized(request, 'image'):
+            raise serializers.ValidationError({'image': uploads.size_error()})
+        if self.instance is None and 'image' not in attrs:
+            raise serializers.ValidationError({'image': 'No image file provided'})
+        return attrs
+
+    def get_upload_status(self, obj):
+        """'processing' until the uploaded file is stored, 'failed' if it couldn't be, else None"""
+        return uploads.upload_status(obj.upload_status)[0]
+
+    def get_upload_error(self, obj):
+        return uploads.upload_status(obj.upload_status)[1]
+
+    def get_variants(self, obj):
+        return variant_urls(obj.variants, self.context.get('request'))
+
+    def get_srcset(self, obj):
+        return srcset(variant_urls(obj.variants, self.context.get('request')))
+
 
 # ============ PRODUCT SPECIFICATION SERIALIZER ============
 
@@ -230,6 +316,7 @@ class ProductListSerializer(serializers.ModelSerializer):
     discount_percentage = serializers.ReadOnlyField()
     average_rating = serializers.SerializerMethodField()
     review_count = serializers.SerializerMethodField()
+    in_wishlist = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
@@ -238,29 +325,41 @@ class ProductListSerializer(serializers.ModelSerializer):
             'price', 'compare_price', 'discount_percentage',
             'category', 'brand', 'primary_image',
             'in_stock', 'stock', 'featured', 'is_new', 'is_bestseller',
-            'average_rating', 'review_count', 'product_type'
+            'average_rating', 'review_count', 'product_type', 'in_wishlist'
         ]
 
     def get_primary_image(self, obj):
-        primary = obj.images.filter(is_primary=True).first()
-        if not primary:
-            primary = obj.images.first()
-        if primary:
-            return ProductImageSerializer(primary, context=self.context).data
-        return None
-
+        """From the snapshot on the product row (products/signals.py), no image query"""
+        if not obj.primary_image_id:
+            return None
+        variants = variant_urls(obj.primary_image_variants, self.context.get('request'))
+        return {
+            'id': obj.primary_image_id,
+            'image_url': obj.primary_image_url or None,
+            'variants': variants,
+            'srcset': srcset(variants),
+        }
+
+    # From ProductReviewStats (reviews/aggregates.py); listings select_related('review_stats')
     def get_average_rating(self, obj):
-        if hasattr(obj, 'reviews'):
-            reviews = obj.reviews.filter(is_approved=True)
-            if reviews.exists():
-                avg = reviews.aggregate(Avg('rating'))['rating__avg']
-                return round(avg, 1) if avg else 0
-        return 0
+        stats = getattr(obj, 'review_stats', None)
+        return round(float(stats.average_rating), 1) if stats else 0
 
     def get_review_count(self, obj):
-        if hasattr(obj, 'reviews'):
-            return obj.reviews.filter(is_approved=True).count()
-        return 0
+        stats = getattr(obj, 'review_stats', None)
+        return stats.review_count if stats else 0
+
+    def get_in_wishlist(self, obj):
+        """From the user's cached wishlist id set, looked up once per response"""
+        if 'wishlist_ids' not in self.context:
+            request = self.context.get('request')
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                from wishlist.cache import wishlist_product_ids
+                self.context['wishlist_ids'] = wishlist_product_ids(user.id)
+            else:
+                self.context['wishlist_ids'] = frozenset()
+        return obj.id in self.context['wishlist_ids']
 
 
 class ProductDetailSerializer(serializers.ModelSerializer):
@@ -303,24 +402,21 @@ class ProductDetailSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
     def get_average_rating(self, obj):
-        if hasattr(obj, 'reviews'):
-            reviews = obj.reviews.filter(is_approved=True)
-            if reviews.exists():
-                avg = reviews.aggregate(Avg('rating'))['rating__avg']
-                return round(avg, 1) if avg else 0
-        return 0
+        stats = getattr(obj, 'review_stats', None)
+        return round(float(stats.average_rating), 1) if stats else 0
 
     def get_review_count(self, obj):
-        if hasattr(obj, 'reviews'):
-            return obj.reviews.filter(is_approved=True).count()
-        return 0
+        stats = getattr(obj, 'review_stats', None)
+        return stats.review_count if stats else 0
 
     def get_related_products(self, obj):
-        related = Product.objects.filter(
-            category=obj.category,
-            is_available=True
-        ).exclude(id=obj.id)[:4]
-        return ProductListSerializer(related, many=True, context=self.context).data
+        related = list(
+            Product.objects.filter(category=obj.category, is_available=True)
+            .select_related('category', 'brand', 'review_stats')
+            .exclude(id=obj.id)[:4]
+        )
+        context = {**self.context, 'category_product_counts': category_product_counts({obj.category_id})}
+        return ProductListSerializer(related, many=True, context=context).data
 
 
 class ProductCreateSerializer(serializers.ModelSerializer):
@@ -0,0 +1,141 @@
+# products/signals.py
+"""
+Keeps Product.primary_image / primary_image_url / primary_image_variants in
+step with the product's images, so cards and order snapshots read the card
+image from the product row instead of querying ProductImage.
+
+Bulk writes (bulk_create, queryset.update) skip these signals; follow them
+with sync_primary_images(). Images still waiting for their upload are passed
+over. If an image's URL can't be built (e.g. Cloudinary isn't configured) the
+product's snapshot is left as it was rather than blanked; re-run
+sync_primary_images() once that's fixed.
+
+Also drops cached slug -> id lookups (products/cache.py) when a product's
+slug appears, changes or goes away.
+"""
+
+import logging
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import forget_slugs
+from .models import Product, ProductImage
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_ORDER = ('product_id', '-is_primary', 'order', 'id')
+SNAPSHOT_FIELDS = ['primary_image', 'primary_image_url', 'primary_image_variants']
+
+
+class SnapshotUnavailable(Exception):
+    """An image's delivery URL can't be built, so its snapshot would be wrong"""
+
+
+def image_url(image):
+    """Delivery URL for a ProductImage; raises SnapshotUnavailable if it can't be built"""
+    try:
+        url = image.image.url
+    except Exception as e:
+        # e.g. Cloudinary not configured
+        raise SnapshotUnavailable(f"No URL for ProductImage {image.pk}: {e}") from e
+    if not url:
+        raise SnapshotUnavailable(f"No URL for ProductImage {image.pk}")
+    return url
+
+
+def card_images():
+    """Images that can be a card image: the ones whose file has been stored"""
+    return ProductImage.objects.exclude(image='').only('id', 'product_id', 'image', 'variants', 'is_primary', 'order')
+
+
+def snapshot(image):
+    """Product field values for `image` as the card image (None = no images)"""
+    if image is None:
+        return {'primary_image': None, 'primary_image_url': '', 'primary_image_variants': {}}
+    return {
+        'primary_image': image,
+        'primary_image_url': image_url(image),
+        'primary_image_variants': image.variants or {},
+    }
+
+
+def refresh_primary_image(product_id):
+    """Recompute one product's snapshot: one read, one UPDATE"""
+    image = card_images().filter(product_id=product_id).order_by(*PRIMARY_ORDER[1:]).first()
+    try:
+        values = snapshot(image)
+    except SnapshotUnavailable as e:
+        logger.warning(f"⚠️ Card image for product {product_id} not updated: {e}")
+        return
+    Product.objects.filter(pk=product_id).update(**values)
+
+
+def _all_product_ids(batch_size):
+    # Keyset pages rather than one open cursor, since we write between reads
+    last_id = 0
+    while True:
+        batch = list(Product.objects.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not batch:
+            return
+        yield from batch
+        last_id = batch[-1]
+
+
+def sync_primary_images(product_ids=None, batch_size=1000):
+    """
+    Set-based rebuild of the snapshots (all products, or the given ones);
+    returns rows updated. Products whose card image has no URL are skipped.
+    """
+    if product_ids is None:
+        ids = _all_product_ids(batch_size)
+    else:
+        ids = iter(sorted(set(product_ids)))
+
+    updated = 0
+    while True:
+        chunk = [product_id for _, product_id in zip(range(batch_size), ids)]
+        if not chunk:
+            return updated
+        chosen = {}
+        for image in card_images().filter(product_id__in=chunk).order_by(*PRIMARY_ORDER):
+            chosen.setdefault(image.product_id, image)
+
+        products = []
+        for product_id in chunk:
+            try:
+                products.append(Product(pk=product_id, **snapshot(chosen.get(product_id))))
+            except SnapshotUnavailable as e:
+                logger.warning(f"⚠️ Card image for product {product_id} not updated: {e}")
+        Product.objects.bulk_update(products, SNAPSHOT_FIELDS)
+        updated += len(products)
+
+
+@receiver(post_save, sender=ProductImage)
+def product_image_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_primary_image(instance.product_id)
+
+
+@receiver(post_delete, sender=ProductImage)
+def product_image_deleted(sender, instance, **kwargs):
+    refresh_primary_image(instance.product_id)
+
+
+@receiver(pre_save, sender=Product)
+def product_slug_changing(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    previous = Product.objects.filter(pk=instance.pk).values_list('slug', flat=True).first()
+    if previous and previous != instance.slug:
+        instance._previous_slug = previous
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, **kwargs):
+    forget_slugs(instance.slug, instance.__dict__.pop('_previous_slug', None))
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    forget_slugs(instance.slug)
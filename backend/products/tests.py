@@ -1,3 +1,640 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import cloudinary
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from drf_spectacular.generators import SchemaGenerator
+from drf_spectacular.settings import patched_settings
+from PIL import Image
+from rest_framework.test import APIClient
+from rest_framework.throttling import SimpleRateThrottle
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import User
+from nextshopsphere.exports import parse_since
+from nextshopsphere.querybudget import QueryBudgetExceeded, query_budget
+from nextshopsphere.uploads import process_uploads
+from orders.models import Order, OrderItem
+
+from .cache import product_id_for_slug
+from .images import generate_variants, render_variants
+from .media_sync import Manifest, file_digest, sync_target
+from .models import Brand, Category, Product, ProductImage, ProductSpecification
+from .references import RepairReport, delivery_url, normalize, repair_order_items
+from .signals import sync_primary_images
+
+
+def setUpModule():
+    # Image URLs are built locally from the cloud name; nothing is uploaded
+    cloudinary.config(cloud_name='nextshopsphere-test')
+
+
+# ============ EXPORTS ============
+
+class ParseSinceTests(TestCase):
+    def test_date_is_aware_midnight(self):
+        since = parse_since('2025-01-31')
+        self.assertTrue(timezone.is_aware(since))
+        self.assertEqual(since, timezone.make_aware(datetime(2025, 1, 31)))
+
+    def test_naive_datetime_is_made_aware(self):
+        self.assertTrue(timezone.is_aware(parse_since('2025-01-31T12:30:00')))
+
+    def test_invalid_values(self):
+        for value in ('yesterday', '2025-02-30', '2025-13-01T00:00:00', ''):
+            with self.subTest(value=value):
+                self.assertIsNone(parse_since(value))
+
+
+class ExportViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(email='admin@example.com', username='admin', password='x')
+        category = Category.objects.create(name='Phones', slug='phones')
+        Product.objects.create(
+            name='Phone', slug='phone', description='-', price=Decimal('10.00'), sku='PHONE-1', category=category,
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_streams_csv(self):
+        response = self.client.get('/api/exports/products/', {'since': '2000-01-01'}, secure=True)
+        self.assertEqual(response.status_code, 200)
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn('PHONE-1', body)
+
+    def test_unparseable_since_is_rejected(self):
+        response = self.client.get('/api/exports/products/', {'since': 'last-week'}, secure=True)
+        self.assertEqual(response.status_code, 400)
+
+
+# ============ SLUG CACHE ============
+
+class ProductSlugCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Phones', slug='phones')
+
+    def make_product(self, slug):
+        return Product.objects.create(
+            name='Phone', slug=slug, description='-', price=Decimal('10.00'), sku='PHONE-1', category=self.category,
+        )
+
+    def test_unknown_slug_is_not_cached(self):
+        self.assertIsNone(product_id_for_slug('phone'))
+        product = self.make_product('phone')
+        self.assertEqual(product_id_for_slug('phone'), product.pk)
+
+    def test_renamed_and_deleted_products_are_forgotten(self):
+        product = self.make_product('phone')
+        self.assertEqual(product_id_for_slug('phone'), product.pk)
+
+        product.slug = 'phone-2'
+        product.save()
+        self.assertIsNone(product_id_for_slug('phone'))
+        self.assertEqual(product_id_for_slug('phone-2'), product.pk)
+
+        product.delete()
+        self.assertIsNone(product_id_for_slug('phone-2'))
+
+
+# ============ IMAGE UPLOADS ============
+
+class ProductImageUploadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(email='admin@example.com', username='admin', password='x')
+        category = Category.objects.create(name='Phones', slug='phones')
+        cls.product = Product.objects.create(
+            name='Phone', slug='phone', description='-', price=Decimal('10.00'), sku='PHONE-1', category=category,
+        )
+
+    def setUp(self):
+        spool_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, spool_dir, ignore_errors=True)
+        spool = override_settings(IMAGE_UPLOAD_SPOOL_DIR=spool_dir)
+        spool.enable()
+        self.addCleanup(spool.disable)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def add_image(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (8, 8), 'blue').save(buffer, format='PNG')
+        upload = SimpleUploadedFile('phone.png', buffer.getvalue(), content_type='image/png')
+        response = self.client.post(
+            f'/api/products/{self.product.slug}/images/', {'image': upload, 'is_primary': True}, secure=True,
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['upload_status'], 'processing')
+        self.assertIsNone(response.data['image_url'])
+        return response.data['id']
+
+    def image(self, image_id):
+        images = self.client.get(f'/api/products/{self.product.slug}/images/', secure=True).data['results']
+        return next(image for image in images if image['id'] == image_id)
+
+    def test_worker_stores_the_image(self):
+        image_id = self.add_image()
+        result = {'public_id': 'products/phone', 'version': 1, 'format': 'png', 'type': 'upload'}
+        with mock.patch('cloudinary.uploader.upload', return_value=result), \
+                mock.patch('products.images.generate_variants') as generate_variants:
+            self.assertEqual(process_uploads(), 1)
+        generate_variants.assert_called_once()
+
+        data = self.image(image_id)
+        self.assertIsNone(data['upload_status'])
+        self.assertIn('products/phone', data['image_url'])
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.primary_image_id, image_id)
+
+    def test_failure_is_reported(self):
+        image_id = self.add_image()
+        with mock.patch('cloudinary.uploader.upload', side_effect=RuntimeError('cloudinary down')):
+            process_uploads()
+        data = self.image(image_id)
+        self.assertEqual(data['upload_status'], 'failed')
+        self.assertTrue(data['upload_error'])
+
+
+# ============ IMAGE VARIANTS ============
+
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        media = override_settings(
+            MEDIA_ROOT=self.media, IMAGE_VARIANT_WIDTHS=[160, 320, 1024], IMAGE_VARIANT_FORMATS=['webp', 'jpeg'],
+        )
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def source(self, width, height, mode='RGB'):
+        buffer = io.BytesIO()
+        Image.new(mode, (width, height), 'red').save(buffer, format='PNG')
+        buffer.seek(0)
+        return buffer
+
+    def test_each_width_in_each_format(self):
+        variants = render_variants(self.source(640, 480), 'derivatives/products/1/abc')
+        self.assertEqual({fmt: sorted(urls) for fmt, urls in variants.items()}, {
+            'webp': ['160', '320'], 'jpeg': ['160', '320'],  # 1024 would upscale
+        })
+        with Image.open(os.path.join(self.media, 'derivatives/products/1/abc/320.webp')) as image:
+            self.assertEqual((image.format, image.size), ('WEBP', (320, 240)))
+
+    def test_smaller_originals_keep_their_width(self):
+        variants = render_variants(self.source(100, 50, 'RGBA'), 'derivatives/products/2/abc')
+        self.assertEqual(sorted(variants['jpeg']), ['100'])
+
+    def test_card_snapshot_gets_the_variants(self):
+        category = Category.objects.create(name='Phones', slug='phones')
+        product = Product.objects.create(
+            name='Phone', slug='phone', description='-', price=Decimal('10.00'), sku='PHONE-1', category=category,
+        )
+        image = ProductImage.objects.create(product=product, image='products/phone', is_primary=True)
+
+        variants = generate_variants(image, source=self.source(640, 480))
+        self.assertEqual(sorted(variants), ['jpeg', 'webp'])
+        product.refresh_from_db()
+        self.assertEqual(product.primary_image_variants, variants)
+        self.assertEqual(ProductImage.objects.get(pk=image.pk).variants, variants)
+
+
+# ============ MEDIA SYNC ============
+
+class MediaSyncTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.manifest_path = os.path.join(self.media, 'manifest.jsonl')
+
+        os.makedirs(os.path.join(self.media, 'brands'))
+        for name, content in [('acme.png', b'acme'), ('acme-copy.png', b'acme'), ('globex.png', b'globex')]:
+            with open(os.path.join(self.media, 'brands', name), 'wb') as f:
+                f.write(content)
+        self.brands = {
+            name: Brand.objects.create(name=name, slug=name, logo=f'brands/{name}.png')
+            for name in ['acme', 'acme-copy', 'globex', 'missing']
+        }
+
+    def upload(self, path, folder, digest):
+        if path.endswith('globex.png'):
+            raise RuntimeError('cloudinary down')
+        return {'public_id': f'{folder}/{digest[:8]}', 'secure_url': f'https://cdn.example.com/{digest[:8]}.png'}
+
+    def sync(self):
+        manifest = Manifest(self.manifest_path)
+        try:
+            with mock.patch('products.media_sync.upload_file', side_effect=self.upload) as upload_file:
+                return sync_target('brands', manifest, workers=2, batch_size=1), upload_file
+        finally:
+            manifest.close()
+
+    def logo(self, name):
+        return str(Brand.objects.get(pk=self.brands[name].pk).logo)
+
+    def test_copies_share_one_upload(self):
+        report, upload_file = self.sync()
+        self.assertEqual(upload_file.call_count, 2)
+        self.assertEqual((report.rows, report.files, report.uploaded, report.updated), (4, 2, 1, 2))
+        self.assertEqual([row[1] for row in report.missing], [self.brands['missing'].pk])
+        self.assertEqual(len(report.failed), 1)
+
+        digest = file_digest(os.path.join(self.media, 'brands', 'acme.png'))
+        self.assertEqual(self.logo('acme'), f'https://cdn.example.com/{digest[:8]}.png')
+        self.assertEqual(self.logo('acme-copy'), self.logo('acme'))
+        self.assertEqual(self.logo('globex'), 'brands/globex.png')
+
+    def test_resume_reuses_finished_uploads(self):
+        self.sync()
+        # Interrupted after the upload was recorded but before the row was written
+        Brand.objects.filter(pk=self.brands['acme'].pk).update(logo='brands/acme.png')
+
+        report, upload_file = self.sync()
+        self.assertEqual(report.reused, 1)
+        self.assertEqual([call.args[0] for call in upload_file.call_args_list], [
+            os.path.join(self.media, 'brands', 'globex.png'),
+        ])
+        self.assertEqual(self.logo('acme'), self.logo('acme-copy'))
+
+
+# ============ CARD IMAGE SNAPSHOT ============
+
+class PrimaryImageSnapshotTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Phones', slug='phones')
+        self.product = Product.objects.create(
+            name='Phone', slug='phone', description='-', price=Decimal('10.00'), sku='PHONE-1', category=category,
+        )
+
+    def test_bulk_created_images_are_picked_up_by_sync(self):
+        ProductImage.objects.bulk_create([
+            ProductImage(product=self.product, image='products/phone-back', order=1),
+            ProductImage(product=self.product, image='products/phone', is_primary=True, order=0),
+        ])
+        self.assertEqual(sync_primary_images([self.product.pk]), 1)
+        self.product.refresh_from_db()
+        self.assertIn('products/phone', self.product.primary_image_url)
+        self.assertEqual(self.product.primary_image.image.public_id, 'products/phone')
+
+    def test_unbuildable_url_keeps_the_snapshot(self):
+        image = ProductImage.objects.create(product=self.product, image='products/phone', is_primary=True)
+        self.product.refresh_from_db()
+        url = self.product.primary_image_url
+        self.assertTrue(url)
+
+        with mock.patch('cloudinary.CloudinaryResource.build_url', side_effect=ValueError('Must supply cloud_name')):
+            ProductImage.objects.create(product=self.product, image='products/phone-2', is_primary=True)
+            self.assertEqual(sync_primary_images([self.product.pk]), 0)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.primary_image_id, image.pk)
+        self.assertEqual(self.product.primary_image_url, url)
+
+
+# ============ IMAGE REFERENCE REPAIR ============
+
+URL = 'https://res.cloudinary.com/demo/image/upload/v123/products/phone.jpg'
+STORED = 'image/upload/v123/products/phone.jpg'
+TEST_CLOUD_URL = 'https://res.cloudinary.com/nextshopsphere-test/image/upload/v123/products/phone.jpg'
+
+
+class ImageReferenceTests(SimpleTestCase):
+    # stored value -> (normalize as CloudinaryField, normalize as URL field, delivery_url)
+    CASES = {
+        URL: (STORED, URL, URL),
+        '/media/https%3A/res.cloudinary.com/demo/image/upload/v123/products/phone.jpg': (STORED, URL, URL),
+        'https:/res.cloudinary.com/demo/image/upload/v123/products/phone.jpg': (STORED, URL, URL),
+        'https://res.cloudinary.com/demo/image/upload/c_fill,w_300/v123/products/phone.jpg': (
+            STORED,
+            'https://res.cloudinary.com/demo/image/upload/c_fill,w_300/v123/products/phone.jpg',
+            'https://res.cloudinary.com/demo/image/upload/c_fill,w_300/v123/products/phone.jpg',
+        ),
+        STORED: (STORED, STORED, TEST_CLOUD_URL),
+        'image\\upload\\v123\\products\\phone.jpg': (STORED, STORED, TEST_CLOUD_URL),
+        'products\\phone.jpg': ('products/phone.jpg', 'products/phone.jpg', None),
+        'not a url': ('not a url', 'not a url', None),
+        '': ('', '', None),
+        None: (None, None, None),
+    }
+
+    def test_mangled_references(self):
+        for value, (resource, url, delivery) in self.CASES.items():
+            with self.subTest(value=value):
+                self.assertEqual(normalize(value, 'resource'), resource)
+                self.assertEqual(normalize(value, 'url'), url)
+                self.assertEqual(delivery_url(value), delivery)
+
+
+class RepairOrderItemsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Phones', slug='phones')
+        cls.product = Product.objects.create(
+            name='Phone', slug='phone', description='-', price=Decimal('10.00'), sku='PHONE-1', category=category,
+        )
+        ProductImage.objects.create(product=cls.product, image=STORED, is_primary=True)
+        user = User.objects.create_user(email='buyer@example.com', username='buyer')
+        order = Order.objects.create(
+            user=user, shipping_address='-', shipping_city='-', shipping_country='-', shipping_phone='-',
+        )
+        item = {'order': order, 'product_name': 'Phone', 'product_price': Decimal('10.00'), 'quantity': 1}
+        cls.orphan = OrderItem.objects.create(product_slug='phone', product_image='', **item)
+        cls.mangled = OrderItem.objects.create(
+            product=cls.product, product_slug='phone',
+            product_image='https:/res.cloudinary.com/demo/image/upload/x.jpg', **item,
+        )
+        cls.fine = OrderItem.objects.create(product=cls.product, product_slug='phone', product_image=URL, **item)
+
+    def snapshot(self):
+        return list(OrderItem.objects.order_by('pk').values_list('product_id', 'product_image'))
+
+    def test_dry_run_reports_without_writing(self):
+        before = self.snapshot()
+        changes = []
+        report = RepairReport()
+        repair_order_items(report, batch_size=2, dry_run=True, on_change=lambda *change: changes.append(change[1:3]))
+
+        self.assertEqual(report.scanned, {'order_items': 3})
+        self.assertEqual(report.changed, {'order_items': 2})
+        self.assertEqual(changes, [
+            (self.orphan.pk, 'product_id'), (self.orphan.pk, 'product_image'), (self.mangled.pk, 'product_image'),
+        ])
+        self.assertEqual(self.snapshot(), before)
+
+    def test_repair(self):
+        repair_order_items(RepairReport())
+        self.orphan.refresh_from_db()
+        self.mangled.refresh_from_db()
+        self.assertEqual(self.orphan.product_id, self.product.pk)
+        self.assertEqual(self.orphan.product_image, TEST_CLOUD_URL)
+        self.assertEqual(self.mangled.product_image, 'https://res.cloudinary.com/demo/image/upload/x.jpg')
+        self.assertEqual(OrderItem.objects.get(pk=self.fine.pk).product_image, URL)
+
+
+# ============ ASYNC CATALOG READS ============
+
+class AsyncCatalogAuthTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='shopper@example.com', username='shopper')
+        category = Category.objects.create(name='Phones', slug='phones')
+        Product.objects.create(
+            name='Phone', slug='phone', description='-', price=Decimal('10.00'), sku='PHONE-1',
+            category=category, featured=True,
+        )
+
+    def get(self, path, token=None):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        return self.client.get(path, secure=True, **headers)
+
+    def test_anonymous_and_valid_token(self):
+        self.assertEqual(len(self.get('/api/products/featured/').json()), 1)
+        self.assertEqual(self.get('/api/products/featured/', AccessToken.for_user(self.user)).status_code, 200)
+
+    def test_invalid_or_expired_token_is_rejected(self):
+        expired = AccessToken.for_user(self.user)
+        expired.set_exp(lifetime=-timedelta(minutes=1))
+        for token in ('not-a-jwt', str(expired)):
+            for path in ('/api/products/featured/', '/api/products/search/?q=Phone', '/api/categories/tree/'):
+                with self.subTest(token=token[:10], path=path):
+                    response = self.get(path, token)
+                    self.assertEqual(response.status_code, 401)
+                    self.assertEqual(response.json()['code'], 'token_not_valid')
+
+    def test_views_are_in_the_schema(self):
+        # Other views' schema warnings aren't this test's business
+        with patched_settings({'DISABLE_ERRORS_AND_WARNINGS': True}):
+            paths = SchemaGenerator().get_schema(public=True)['paths']
+        for path in ('/api/products/featured/', '/api/products/new_arrivals/', '/api/products/bestsellers/',
+                     '/api/products/on_sale/', '/api/products/search/', '/api/categories/tree/'):
+            with self.subTest(path=path):
+                self.assertIn('summary', paths[path]['get'])
+        self.assertEqual(paths['/api/products/search/']['get']['parameters'][0]['name'], 'q')
+
+
+THROTTLES = ['rest_framework.throttling.AnonRateThrottle', 'rest_framework.throttling.UserRateThrottle']
+
+
+@override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_CLASSES': THROTTLES})
+class AsyncCatalogThrottleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='shopper@example.com', username='shopper')
+
+    def setUp(self):
+        cache.clear()
+        # The rates are read once, when DRF's throttling module is imported
+        rates = mock.patch.object(SimpleRateThrottle, 'THROTTLE_RATES', {'anon': '2/min', 'user': '3/min'})
+        rates.start()
+        self.addCleanup(rates.stop)
+
+    def search(self, token=None):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        return self.client.get('/api/products/search/?q=Phone', secure=True, **headers)
+
+    def test_anonymous_rate(self):
+        self.assertEqual(self.search().status_code, 200)
+        # The history the viewsets' AnonRateThrottle keeps for this client
+        self.assertEqual(len(cache.get('throttle_anon_127.0.0.1')), 1)
+        self.assertEqual(self.search().status_code, 200)
+        response = self.search()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '60')
+        self.assertIn('throttled', response.json()['detail'])
+
+    def test_users_get_their_own_rate(self):
+        token = AccessToken.for_user(self.user)
+        self.assertEqual([self.search(token).status_code for _ in range(4)], [200, 200, 200, 429])
+        self.assertEqual(self.search().status_code, 200)
+
+    def test_replica_pin_uses_the_token_user(self):
+        with mock.patch('nextshopsphere.routers.route_reads_to_replica') as route:
+            self.search(AccessToken.for_user(self.user))
+            self.search()
+        self.assertEqual([call.args for call in route.call_args_list], [(self.user.pk,), (None,)])
+
+
+# ============ CATALOG IMPORT ============
+
+class ImportCatalogTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Phones', slug='phones')
+        self.existing = Product.objects.create(
+            name='Old Phone', slug='old-phone', description='-', price=Decimal('10.00'), sku='OLD-1',
+            category=self.category,
+        )
+
+    def run_import(self, *records):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = os.path.join(directory, 'catalog.ndjson')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(record) + '\n' for record in records)
+        out, err = io.StringIO(), io.StringIO()
+        call_command('import_catalog', path, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def record(self, sku, slug, **fields):
+        return {'sku': sku, 'slug': slug, 'name': f'Phone {sku}', 'price': '20.00', 'category': 'phones', **fields}
+
+    def test_creates_then_updates_by_sku(self):
+        self.run_import(self.record(
+            'NEW-1', 'new-phone',
+            specifications=[{'name': 'Colour', 'value': 'Black'}],
+            images=[{'image': 'products/new-phone'}],
+        ))
+        product = Product.objects.get(sku='NEW-1')
+        self.assertEqual(product.specifications.get().value, 'Black')
+        self.assertEqual(product.primary_image.image.public_id, 'products/new-phone')
+
+        self.run_import(self.record('NEW-1', 'new-phone', price='25.00'))
+        product.refresh_from_db()
+        self.assertEqual(product.price, Decimal('25.00'))
+        self.assertEqual(Product.objects.filter(sku='NEW-1').count(), 1)
+
+    def test_slug_of_another_sku_is_a_row_error(self):
+        out, err = self.run_import(
+            self.record('NEW-1', 'old-phone', price='99.00'),
+            self.record('NEW-2', 'new-phone'),
+            self.record('NEW-3', 'new-phone'),
+        )
+        self.assertIn("slug 'old-phone' already belongs to SKU 'OLD-1'", err)
+        self.assertIn("slug 'new-phone' already belongs to SKU 'NEW-2'", err)
+        self.assertIn('invalid: 2', out)
+
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.name, self.existing.price), ('Old Phone', Decimal('10.00')))
+        self.assertEqual(set(Product.objects.values_list('sku', flat=True)), {'OLD-1', 'NEW-2'})
+
+    def test_unwritten_sku_rolls_back_the_batch(self):
+        with mock.patch.object(Product.objects, 'bulk_create'):
+            out, err = self.run_import(self.record('NEW-1', 'new-phone', specifications=[{'name': 'A', 'value': 'B'}]))
+        self.assertIn('SKUs not written: NEW-1', err)
+        self.assertIn('failed_batches: 1', out)
+        self.assertFalse(ProductSpecification.objects.exists())
+
+
+# ============ SYNTHETIC CATALOG ============
+
+class GenerateCatalogTests(TestCase):
+    def generate(self):
+        call_command(
+            'generate_catalog', '--categories=2', '--brands=2', '--products=5', '--users=3', '--orders=6',
+            '--reviews=4', '--wishlist-items=4', '--notifications=4', '--batch-size=4', stdout=io.StringIO(),
+        )
+
+    def assertItemsBelongToNewOrders(self, leftover):
+        generated = Order.objects.exclude(pk=leftover.pk)
+        self.assertEqual(generated.count(), 6)
+        self.assertFalse(leftover.items.exists())
+        self.assertFalse(generated.filter(items=None).exists())
+        self.assertTrue(all(order.notes.startswith('gen:') for order in generated))
+
+    def leftover_order(self):
+        # An earlier run's order carrying the marker this run would otherwise use
+        user = User.objects.create_user(email='old@example.com', username='old')
+        return Order.objects.create(
+            user=user, shipping_address='-', shipping_city='-', shipping_country='-', shipping_phone='-',
+            subtotal=Decimal('1.00'), total=Decimal('1.00'), notes='gen:order:0',
+        )
+
+    def test_items_are_attached_by_returned_pk(self):
+        leftover = self.leftover_order()
+        self.generate()
+        self.assertItemsBelongToNewOrders(leftover)
+        self.assertEqual(Product.objects.filter(sku__startswith='GEN-').count(), 5)
+
+    def test_items_are_attached_by_marker_without_returned_pks(self):
+        leftover = self.leftover_order()
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert',
+                               new_callable=mock.PropertyMock, return_value=False):
+            self.generate()
+        self.assertItemsBelongToNewOrders(leftover)
+
+
+# ============ QUERY BUDGETS ============
+
+class CatalogQueryBudgetTests(TestCase):
+    """Catalog endpoints stay within settings.QUERY_BUDGETS however many rows they list"""
+
+    @classmethod
+    def setUpTestData(cls):
+        parent = Category.objects.create(name='Electronics', slug='electronics')
+        children = [
+            Category.objects.create(name=f'Sub {i}', slug=f'sub-{i}', parent=parent)
+            for i in range(3)
+        ]
+        brand = Brand.objects.create(name='Acme', slug='acme')
+        cls.products = []
+        for i in range(12):
+            product = Product.objects.create(
+                name=f'Product {i}', slug=f'product-{i}', description='-', price=Decimal('9.99'),
+                sku=f'SKU-{i}', category=children[i % 3], brand=brand, stock=5, featured=True,
+            )
+            for order in range(2):
+                ProductImage.objects.create(
+                    product=product, image=f'products/p{i}-{order}', is_primary=order == 0, order=order,
+                )
+            ProductSpecification.objects.create(product=product, name='Colour', value='Black')
+            cls.products.append(product)
+
+    def assertWithinBudget(self, view_name, path):
+        with query_budget(settings.QUERY_BUDGETS[view_name]):
+            response = self.client.get(path, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_product_list(self):
+        self.assertWithinBudget('product-list', '/api/products/')
+
+    def test_product_detail(self):
+        self.assertWithinBudget('product-detail', f'/api/products/{self.products[0].slug}/')
+
+    def test_featured(self):
+        self.assertWithinBudget('product-featured', '/api/products/featured/')
+
+    def test_search(self):
+        self.assertWithinBudget('product-search', '/api/products/search/?q=Product')
+
+    def test_category_list(self):
+        self.assertWithinBudget('category-list', '/api/categories/')
+
+    def test_category_tree(self):
+        self.assertWithinBudget('category-tree', '/api/categories/tree/')
+
+    def test_brand_list(self):
+        self.assertWithinBudget('brand-list', '/api/brands/')
+
+
+class QueryBudgetMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Category.objects.create(name='Phones', slug='phones')
+
+    @override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_ACTION='raise', QUERY_BUDGETS={'category-list': 0})
+    def test_raise_action_fails_the_request(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get('/api/categories/', secure=True)
+
+    @override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        response = self.client.get('/api/categories/', secure=True)
+        self.assertIn('db;dur=', response['Server-Timing'])
@@ -4,7 +4,7 @@ from .views import (
     CategoryViewSet, ProductViewSet, ProductImageViewSet,
     BrandViewSet, ShippingOptionViewSet
 )
-from .views import debug_cloudinary
+from . import async_views
 
 
 router = DefaultRouter()
@@ -14,13 +14,20 @@ router.register(r'brands', BrandViewSet, basename='brand')
 router.register(r'shipping-options', ShippingOptionViewSet, basename='shipping-option')
 
 urlpatterns = [
+    # Async reads, ahead of the router so they win over the viewsets' detail routes
+    path('products/featured/', async_views.featured_products, name='product-featured'),
+    path('products/new_arrivals/', async_views.new_arrivals, name='product-new-arrivals'),
+    path('products/bestsellers/', async_views.bestsellers, name='product-bestsellers'),
+    path('products/on_sale/', async_views.on_sale, name='product-on-sale'),
+    path('products/search/', async_views.search_products, name='product-search'),
+    path('categories/tree/', async_views.category_tree, name='category-tree'),
+
     path('', include(router.urls)),
     path(
         'products/<slug:product_slug>/images/',
         ProductImageViewSet.as_view({'get': 'list', 'post': 'create'}),
         name='product-images'
     ),
-    path('debug-cloudinary/', debug_cloudinary, name='debug-cloudinary'),
 ]
 # products/urls.py
 
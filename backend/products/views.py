@@ -12,60 +12,16 @@ from .models import (
     Brand, ShippingOption
 )
 from .serializers import (
-    CategorySerializer, CategoryListSerializer, CategoryTreeSerializer,
+    CategorySerializer, CategoryListSerializer,
     ProductListSerializer, ProductDetailSerializer, ProductCreateSerializer,
     ProductImageSerializer, ProductSpecificationSerializer,
     BrandSerializer, BrandListSerializer,
     ShippingOptionSerializer,
+    category_product_counts, listing_context,
 )
-# products/views.py - Add temporarily
-
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
-from rest_framework.response import Response
-from django.conf import settings
-import os
-import cloudinary
-
-@api_view(['GET'])
-@permission_classes([AllowAny])
-def debug_cloudinary(request):
-    """Debug Cloudinary configuration"""
-    from products.models import ProductImage
-
-    # Check Cloudinary config
-    cloudinary_config = {
-        'cloud_name': os.environ.get('CLOUDINARY_CLOUD_NAME', 'NOT SET'),
-        'api_key_set': bool(os.environ.get('CLOUDINARY_API_KEY')),
-        'api_secret_set': bool(os.environ.get('CLOUDINARY_API_SECRET')),
-    }
-
-    # Check storage backend
-    storage_info = {
-        'default_storage': settings.DEFAULT_FILE_STORAGE,
-        'is_cloudinary': 'cloudinary' in settings.DEFAULT_FILE_STORAGE.lower(),
-    }
-
-    # Get sample images and their actual URLs
-    sample_images = []
-    for img in ProductImage.objects.all()[:5]:
-        try:
-            img_data = {
-                'id': img.id,
-                'field_name': str(img.image.name) if img.image else None,
-                'field_url': img.image.url if img.image else None,
-                'storage_class': img.image.storage.__class__.__name__ if img.image else None,
-            }
-            sample_images.append(img_data)
-        except Exception as e:
-            sample_images.append({'id': img.id, 'error': str(e)})
-
-    return Response({
-        'cloudinary_config': cloudinary_config,
-        'storage_info': storage_info,
-        'sample_images': sample_images,
-        'render_env': os.environ.get('RENDER', 'not set'),
-    })
+from .images import upload_product_image
+from nextshopsphere.routers import ReplicaReadMixin
+from nextshopsphere.uploads import StreamedImageUploadMixin
 
 # ============================================
 # CATEGORY VIEWSET
@@ -78,7 +34,7 @@ def debug_cloudinary(request):
     partial_update=extend_schema(tags=['Categories'], summary='Partial update category (Admin)'),
     destroy=extend_schema(tags=['Categories'], summary='Delete category (Admin)'),
 )
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for product categories.
 
@@ -91,6 +47,7 @@ class CategoryViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'description']
     ordering_fields = ['name', 'display_order', 'created_at']
     ordering = ['display_order', 'name']
+    replica_actions = ('list', 'retrieve', 'root', 'featured', 'subcategories')
 
     def get_permissions(self):
         if self.action in ['create', 'update', 'partial_update', 'destroy']:
@@ -100,10 +57,17 @@ class CategoryViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.action == 'list':
             return CategoryListSerializer
-        if self.action == 'tree':
-            return CategoryTreeSerializer
         return CategorySerializer
 
+    def get_serializer(self, *args, **kwargs):
+        if self.action == 'list' and args:
+            # Product counts for the whole page in one query
+            kwargs['context'] = {
+                **self.get_serializer_context(),
+                'category_product_counts': category_product_counts(c.id for c in args[0]),
+            }
+        return super().get_serializer(*args, **kwargs)
+
     @extend_schema(tags=['Categories'], summary='Get root categories only')
     @action(detail=False, methods=['get'])
     def root(self, request):
@@ -112,14 +76,6 @@ class CategoryViewSet(viewsets.ModelViewSet):
         serializer = CategorySerializer(root_categories, many=True)
         return Response(serializer.data)
 
-    @extend_schema(tags=['Categories'], summary='Get full category tree')
-    @action(detail=False, methods=['get'])
-    def tree(self, request):
-        """Get full category tree for navigation"""
-        root_categories = self.queryset.filter(parent=None).order_by('display_order', 'name')
-        serializer = CategoryTreeSerializer(root_categories, many=True)
-        return Response(serializer.data)
-
     @extend_schema(tags=['Categories'], summary='Get featured categories')
     @action(detail=False, methods=['get'])
     def featured(self, request):
@@ -133,8 +89,9 @@ class CategoryViewSet(viewsets.ModelViewSet):
     def subcategories(self, request, slug=None):
         """Get subcategories for a specific category"""
         category = self.get_object()
-        subcategories = category.children.filter(is_active=True).order_by('display_order', 'name')
-        serializer = CategoryListSerializer(subcategories, many=True)
+        subcategories = list(category.children.filter(is_active=True).order_by('display_order', 'name'))
+        context = {'category_product_counts': category_product_counts(c.id for c in subcategories)}
+        serializer = CategoryListSerializer(subcategories, many=True, context=context)
         return Response(serializer.data)
 
 
@@ -149,7 +106,7 @@ class CategoryViewSet(viewsets.ModelViewSet):
     partial_update=extend_schema(tags=['Brands'], summary='Partial update brand (Admin)'),
     destroy=extend_schema(tags=['Brands'], summary='Delete brand (Admin)'),
 )
-class BrandViewSet(viewsets.ModelViewSet):
+class BrandViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """ViewSet for product brands"""
     queryset = Brand.objects.filter(is_active=True)
     serializer_class = BrandSerializer
@@ -158,6 +115,7 @@ class BrandViewSet(viewsets.ModelViewSet):
     search_fields = ['name']
     ordering_fields = ['name', 'created_at']
     ordering = ['name']
+    replica_actions = ('list', 'retrieve', 'featured')
 
     def get_permissions(self):
         if self.action in ['create', 'update', 'partial_update', 'destroy']:
@@ -189,15 +147,16 @@ class BrandViewSet(viewsets.ModelViewSet):
     partial_update=extend_schema(tags=['Products'], summary='Partial update product (Admin)'),
     destroy=extend_schema(tags=['Products'], summary='Delete product (Admin)'),
 )
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """ViewSet for products with filtering, search, and ordering"""
-    queryset = Product.objects.filter(is_available=True).select_related('category', 'brand')
+    queryset = Product.objects.filter(is_available=True).select_related('category', 'brand', 'review_stats')
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['category__slug', 'brand__slug', 'featured', 'is_available', 'product_type', 'is_new', 'is_bestseller']
     search_fields = ['name', 'description', 'short_description', 'sku', 'brand__name']
     ordering_fields = ['price', 'created_at', 'name', 'stock']
     ordering = ['-created_at']
     lookup_field = 'slug'
+    replica_actions = ('list', 'retrieve', 'related')
 
     def get_permissions(self):
         if self.action in ['create', 'update', 'partial_update', 'destroy']:
@@ -211,6 +170,11 @@ class ProductViewSet(viewsets.ModelViewSet):
             return ProductCreateSerializer
         return ProductDetailSerializer
 
+    def get_serializer(self, *args, **kwargs):
+        if self.action == 'list' and args:
+            kwargs['context'] = {**self.get_serializer_context(), **listing_context(args[0])}
+        return super().get_serializer(*args, **kwargs)
+
     def get_queryset(self):
         queryset = super().get_queryset()
 
@@ -250,66 +214,16 @@ class ProductViewSet(viewsets.ModelViewSet):
 
         return queryset
 
-    @extend_schema(tags=['Products'], summary='Get featured products')
-    @action(detail=False, methods=['get'])
-    def featured(self, request):
-        """Get featured products for homepage"""
-        featured = self.queryset.filter(featured=True)[:8]
-        serializer = ProductListSerializer(featured, many=True)
-        return Response(serializer.data)
-
-    @extend_schema(tags=['Products'], summary='Get new arrivals')
-    @action(detail=False, methods=['get'])
-    def new_arrivals(self, request):
-        """Get newest products"""
-        new = self.queryset.filter(is_new=True).order_by('-created_at')[:8]
-        serializer = ProductListSerializer(new, many=True)
-        return Response(serializer.data)
-
-    @extend_schema(tags=['Products'], summary='Get bestsellers')
-    @action(detail=False, methods=['get'])
-    def bestsellers(self, request):
-        """Get bestseller products"""
-        bestsellers = self.queryset.filter(is_bestseller=True)[:8]
-        serializer = ProductListSerializer(bestsellers, many=True)
-        return Response(serializer.data)
-
-    @extend_schema(tags=['Products'], summary='Get products on sale')
-    @action(detail=False, methods=['get'])
-    def on_sale(self, request):
-        """Get products on sale"""
-        on_sale = self.queryset.filter(
-            compare_price__isnull=False,
-            compare_price__gt=0
-        ).order_by('-created_at')[:12]
-        serializer = ProductListSerializer(on_sale, many=True)
-        return Response(serializer.data)
-
-    @extend_schema(tags=['Products'], summary='Search products')
-    @action(detail=False, methods=['get'])
-    def search(self, request):
-        """Search products by name, description, brand, or category"""
-        query = request.query_params.get('q', '')
-        if query:
-            products = self.queryset.filter(
-                Q(name__icontains=query) |
-                Q(description__icontains=query) |
-                Q(category__name__icontains=query) |
-                Q(brand__name__icontains=query)
-            )[:20]
-            serializer = ProductListSerializer(products, many=True)
-            return Response(serializer.data)
-        return Response([])
-
     @extend_schema(tags=['Products'], summary='Get related products')
     @action(detail=True, methods=['get'])
     def related(self, request, slug=None):
         """Get related products"""
         product = self.get_object()
-        related = self.queryset.filter(
+        related = list(self.queryset.filter(
             Q(category=product.category) | Q(brand=product.brand)
-        ).exclude(id=product.id)[:6]
-        serializer = ProductListSerializer(related, many=True)
+        ).exclude(id=product.id)[:6])
+        context = {**self.get_serializer_context(), **listing_context(related)}
+        serializer = ProductListSerializer(related, many=True, context=context)
         return Response(serializer.data)
 
 
@@ -324,7 +238,7 @@ class ProductViewSet(viewsets.ModelViewSet):
     partial_update=extend_schema(tags=['Products'], summary='Partial update image (Admin)'),
     destroy=extend_schema(tags=['Products'], summary='Delete product image (Admin)'),
 )
-class ProductImageViewSet(viewsets.ModelViewSet):
+class ProductImageViewSet(StreamedImageUploadMixin, viewsets.ModelViewSet):
     """ViewSet for product images (admin only)"""
     queryset = ProductImage.objects.all()
     serializer_class = ProductImageSerializer
@@ -340,7 +254,16 @@ class ProductImageViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         product_slug = self.kwargs.get('product_slug')
         product = Product.objects.get(slug=product_slug)
-        serializer.save(product=product)
+        upload = serializer.validated_data.pop('image')
+        # image_url stays empty until the background upload lands
+        image = serializer.save(product=product)
+        upload_product_image(image, upload)
+
+    def perform_update(self, serializer):
+        upload = serializer.validated_data.pop('image', None)
+        image = serializer.save()
+        if upload is not None:
+            upload_product_image(image, upload)
 
 
 # ============================================
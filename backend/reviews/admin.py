@@ -2,7 +2,8 @@ from django.contrib import admin
 
 # Register your models here.
 from django.contrib import admin
-from .models import Review
+from .aggregates import set_approval
+from .models import Review, ProductReviewStats
 
 
 @admin.register(Review)
@@ -12,6 +13,7 @@ class ReviewAdmin(admin.ModelAdmin):
     search_fields = ['user__email', 'product__name', 'title', 'comment']
     list_editable = ['is_approved']
     readonly_fields = ['is_verified_purchase', 'created_at', 'updated_at']
+    actions = ['approve_reviews', 'reject_reviews']
 
     fieldsets = (
         ('Review Info', {
@@ -23,4 +25,21 @@ class ReviewAdmin(admin.ModelAdmin):
         ('Timestamps', {
             'fields': ('created_at', 'updated_at')
         }),
-    )
\ No newline at end of file
+    )
+
+    @admin.action(description="Approve selected reviews")
+    def approve_reviews(self, request, queryset):
+        updated, _ = set_approval(queryset, True)
+        self.message_user(request, f"{updated} review(s) approved.")
+
+    @admin.action(description="Reject selected reviews")
+    def reject_reviews(self, request, queryset):
+        updated, _ = set_approval(queryset, False)
+        self.message_user(request, f"{updated} review(s) rejected.")
+
+
+@admin.register(ProductReviewStats)
+class ProductReviewStatsAdmin(admin.ModelAdmin):
+    list_display = ['product', 'review_count', 'average_rating', 'updated_at']
+    search_fields = ['product__name']
+    readonly_fields = [f.name for f in ProductReviewStats._meta.fields]
@@ -0,0 +1,119 @@
+# reviews/aggregates.py
+"""
+ProductReviewStats maintenance.
+
+Stats are recomputed from approved reviews with one grouped query per batch
+of products and written back with a single upsert, so saving a review,
+deleting one or moderating thousands costs the same handful of queries.
+"""
+
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Review, ProductReviewStats
+
+STATS_BATCH_SIZE = 1000
+
+STATS_UPDATE_FIELDS = [
+    'review_count', 'rating_sum', 'average_rating',
+    'count_1', 'count_2', 'count_3', 'count_4', 'count_5', 'updated_at',
+]
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def compute_stats(product_ids):
+    """One grouped query -> {product_id: {rating: count}} for approved reviews"""
+    histograms = {product_id: {} for product_id in product_ids}
+    rows = (
+        Review.objects.filter(product_id__in=product_ids, is_approved=True)
+        .values_list('product_id', 'rating')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    for product_id, rating, total in rows:
+        histograms[product_id][rating] = total
+    return histograms
+
+
+def build_stats(product_id, histogram, now=None):
+    counts = {i: histogram.get(i, 0) for i in range(1, 6)}
+    review_count = sum(counts.values())
+    rating_sum = sum(rating * total for rating, total in counts.items())
+    average = Decimal(rating_sum) / review_count if review_count else Decimal(0)
+    return ProductReviewStats(
+        product_id=product_id,
+        review_count=review_count,
+        rating_sum=rating_sum,
+        average_rating=average.quantize(Decimal('0.01')),
+        updated_at=now or timezone.now(),
+        **{f'count_{i}': counts[i] for i in range(1, 6)},
+    )
+
+
+def refresh_product_stats(product_ids, batch_size=STATS_BATCH_SIZE):
+    """Recompute and upsert stats for the given products"""
+    product_ids = sorted({pid for pid in product_ids if pid})
+    now = timezone.now()
+    kwargs = {'update_conflicts': True, 'update_fields': STATS_UPDATE_FIELDS}
+    if connection.features.supports_update_conflicts_with_target:
+        kwargs['unique_fields'] = ['product']
+
+    for chunk in _chunks(product_ids, batch_size):
+        histograms = compute_stats(chunk)
+        ProductReviewStats.objects.bulk_create(
+            [build_stats(product_id, histogram, now) for product_id, histogram in histograms.items()],
+            **kwargs,
+        )
+    return len(product_ids)
+
+
+def set_approval(reviews, approved):
+    """
+    Approve or reject reviews with a single UPDATE and refresh the stats of
+    the affected products. `reviews` is a queryset or an iterable of ids.
+    """
+    if not hasattr(reviews, 'filter'):
+        reviews = Review.objects.filter(pk__in=list(reviews))
+    changing = reviews.exclude(is_approved=approved)
+
+    with transaction.atomic():
+        product_ids = set(changing.values_list('product_id', flat=True).distinct().order_by())
+        updated = changing.update(is_approved=approved, updated_at=timezone.now())
+        refresh_product_stats(product_ids)
+    return updated, len(product_ids)
+
+
+# ============ READ SIDE ============
+
+STATS_LOOKUP_FIELDS = [
+    'review_stats__review_count', 'review_stats__average_rating', 'review_stats__updated_at',
+    'review_stats__count_1', 'review_stats__count_2', 'review_stats__count_3',
+    'review_stats__count_4', 'review_stats__count_5',
+]
+
+
+def stats_for_slugs(slugs):
+    """
+    {slug: (payload, version)} for existing products in a single LEFT JOIN
+    query. Products without a stats row report zeros with version 0.
+    """
+    from products.models import Product
+
+    rows = Product.objects.filter(slug__in=slugs).values_list('pk', 'slug', *STATS_LOOKUP_FIELDS)
+    results = {}
+    for product_id, slug, total, average, updated_at, *counts in rows:
+        payload = {
+            'average_rating': round(float(average or 0), 1),
+            'total_reviews': total or 0,
+            'rating_distribution': {str(i): counts[i - 1] or 0 for i in range(1, 6)},
+        }
+        version = f"{product_id}.{int(updated_at.timestamp() * 1000) if updated_at else 0}"
+        results[slug] = (payload, version)
+    return results
@@ -0,0 +1,35 @@
+# reviews/management/commands/refresh_review_stats.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from products.models import Product
+from reviews.aggregates import STATS_BATCH_SIZE, refresh_product_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild ProductReviewStats from approved reviews (all products or the given slugs)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('slugs', nargs='*', help="Only refresh these products")
+        parser.add_argument('--batch-size', type=int, default=STATS_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        products = Product.objects.order_by('pk')
+        if options['slugs']:
+            products = products.filter(slug__in=options['slugs'])
+
+        started = time.monotonic()
+        batch = []
+        refreshed = 0
+        for product_id in products.values_list('pk', flat=True).iterator(chunk_size=options['batch_size']):
+            batch.append(product_id)
+            if len(batch) >= options['batch_size']:
+                refreshed += refresh_product_stats(batch, options['batch_size'])
+                batch = []
+        if batch:
+            refreshed += refresh_product_stats(batch, options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Refreshed review stats for {refreshed:,} products in {time.monotonic() - started:.1f}s"
+        ))
@@ -0,0 +1,62 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_stats(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    ProductReviewStats = apps.get_model('reviews', 'ProductReviewStats')
+
+    histograms = {}
+    rows = (
+        Review.objects.filter(is_approved=True)
+        .values_list('product_id', 'rating')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    for product_id, rating, total in rows:
+        histograms.setdefault(product_id, {})[rating] = total
+
+    stats = []
+    for product_id, histogram in histograms.items():
+        review_count = sum(histogram.values())
+        rating_sum = sum(rating * total for rating, total in histogram.items())
+        stats.append(ProductReviewStats(
+            product_id=product_id,
+            review_count=review_count,
+            rating_sum=rating_sum,
+            average_rating=round(rating_sum / review_count, 2),
+            **{f'count_{i}': histogram.get(i, 0) for i in range(1, 6)},
+        ))
+    ProductReviewStats.objects.bulk_create(stats, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_alter_productimage_image'),
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductReviewStats',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='review_stats', serialize=False, to='products.product')),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('average_rating', models.DecimalField(decimal_places=2, default=0, max_digits=3)),
+                ('count_1', models.PositiveIntegerField(default=0)),
+                ('count_2', models.PositiveIntegerField(default=0)),
+                ('count_3', models.PositiveIntegerField(default=0)),
+                ('count_4', models.PositiveIntegerField(default=0)),
+                ('count_5', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Product review stats',
+                'verbose_name_plural': 'Product review stats',
+            },
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
@@ -42,6 +42,10 @@ class Review(models.Model):
         default=True,
         help_text="Review is approved and visible"
     )
+    helpful_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of users who found this review helpful"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -49,17 +53,76 @@ class Review(models.Model):
         ordering = ['-created_at']
         # One review per user per product
         unique_together = ['user', 'product']
+        # Back the product page sort modes (newest, rating, helpful)
+        indexes = [
+            models.Index(fields=['product', 'is_approved', '-created_at'], name='review_product_newest_idx'),
+            models.Index(fields=['product', 'is_approved', '-rating', '-created_at'], name='review_product_rating_idx'),
+            models.Index(fields=['product', 'is_approved', '-helpful_count', '-created_at'], name='review_product_helpful_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.email} - {self.product.name} ({self.rating}★)"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Snapshot of the fields that feed ProductReviewStats
+        instance._loaded_stats = (
+            instance.__dict__.get('product_id'),
+            instance.__dict__.get('rating'),
+            instance.__dict__.get('is_approved'),
+        )
+        return instance
+
     def save(self, *args, **kwargs):
-        # Check if user has purchased this product
-        from orders.models import OrderItem
-        has_purchased = OrderItem.objects.filter(
-            order__user=self.user,
-            product=self.product,
-            order__status='delivered'
-        ).exists()
-        self.is_verified_purchase = has_purchased
-        super().save(*args, **kwargs)
\ No newline at end of file
+        if self._state.adding:
+            # Served from the user's cached purchase set, no join over orders
+            from orders.purchases import has_purchased
+            self.is_verified_purchase = has_purchased(self.user_id, self.product_id)
+        # ProductReviewStats is refreshed by reviews/signals.py
+        super().save(*args, **kwargs)
+
+
+class ReviewVote(models.Model):
+    """A user marking a review as helpful (once per user)"""
+
+    review = models.ForeignKey(Review, on_delete=models.CASCADE, related_name='votes')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='review_votes')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ['review', 'user']
+
+    def __str__(self):
+        return f"{self.user_id} found review {self.review_id} helpful"
+
+
+class ProductReviewStats(models.Model):
+    """Precomputed approved-review aggregates per product"""
+
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='review_stats',
+    )
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    average_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0)
+    count_1 = models.PositiveIntegerField(default=0)
+    count_2 = models.PositiveIntegerField(default=0)
+    count_3 = models.PositiveIntegerField(default=0)
+    count_4 = models.PositiveIntegerField(default=0)
+    count_5 = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Product review stats'
+        verbose_name_plural = 'Product review stats'
+
+    def __str__(self):
+        return f"{self.product_id}: {self.average_rating} ({self.review_count})"
+
+    @property
+    def rating_distribution(self):
+        return {str(i): getattr(self, f'count_{i}') for i in range(1, 6)}
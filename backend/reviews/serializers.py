@@ -1,6 +1,23 @@
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from .models import Review
 
+# Resolved avatar URLs keyed by the stored avatar name; a new upload gets a new
+# name, so entries never go stale and the dict just needs a size bound.
+AVATAR_URL_CACHE_SIZE = 4096
+_avatar_urls = {}
+
+
+def resolve_avatar_url(avatar):
+    key = str(avatar)
+    url = _avatar_urls.get(key)
+    if url is None:
+        url = avatar.url
+        if len(_avatar_urls) >= AVATAR_URL_CACHE_SIZE:
+            _avatar_urls.clear()
+        _avatar_urls[key] = url
+    return url
+
 
 class ReviewSerializer(serializers.ModelSerializer):
     """Serializer for reading reviews"""
@@ -13,10 +30,10 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         fields = [
             'id', 'user', 'user_name', 'user_email', 'user_avatar', 'product',
-            'rating', 'title', 'comment', 'is_verified_purchase',
+            'rating', 'title', 'comment', 'is_verified_purchase', 'helpful_count',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'user', 'is_verified_purchase', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'user', 'is_verified_purchase', 'helpful_count', 'created_at', 'updated_at']
 
     def get_user_name(self, obj):
         """Get user's display name"""
@@ -31,10 +48,12 @@ class ReviewSerializer(serializers.ModelSerializer):
     def get_user_avatar(self, obj):
         """Get user's avatar URL (absolute URL)"""
         if obj.user and obj.user.avatar:
+            url = resolve_avatar_url(obj.user.avatar)
             request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.user.avatar.url)
-            return obj.user.avatar.url
+            # Cloudinary URLs are already absolute; only local media needs the host
+            if request and url.startswith('/'):
+                return request.build_absolute_uri(url)
+            return url
         return None
 
 
@@ -50,22 +69,36 @@ class CreateReviewSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Rating must be between 1 and 5")
         return value
 
-    def validate(self, attrs):
-        user = self.context['request'].user
-        product = attrs.get('product')
-
-        # Check if user already reviewed this product (for create only)
-        if not self.instance:  # Creating new review
-            if Review.objects.filter(user=user, product=product).exists():
-                raise serializers.ValidationError({
-                    "product": "You have already reviewed this product"
-                })
-
-        return attrs
-
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
-        return super().create(validated_data)
+        # The (user, product) unique constraint catches duplicates, no pre-check query
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError({
+                "product": "You have already reviewed this product"
+            })
+
+    def update(self, instance, validated_data):
+        try:
+            with transaction.atomic():
+                return super().update(instance, validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError({
+                "product": "You have already reviewed this product"
+            })
+
+
+class ReviewModerationSerializer(serializers.Serializer):
+    """Bulk approve/reject payload"""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=10000,
+    )
+    action = serializers.ChoiceField(choices=['approve', 'reject'])
 
 
 class ProductReviewStatsSerializer(serializers.Serializer):
@@ -0,0 +1,40 @@
+# reviews/signals.py
+"""
+Keeps ProductReviewStats in step with reviews saved or deleted one at a
+time, including deletes cascading from a user and QuerySet.delete(), which
+both send post_delete per review.
+
+Queryset updates (moderation, imports) skip these signals; they call
+refresh_product_stats() themselves (see aggregates.set_approval).
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from products.models import Product
+
+from .aggregates import refresh_product_stats
+from .models import Review
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_loaded_stats', None)
+    current = (instance.product_id, instance.rating, instance.is_approved)
+    if previous != current:
+        product_ids = {instance.product_id}
+        if previous and previous[0]:
+            product_ids.add(previous[0])
+        refresh_product_stats(product_ids)
+    instance._loaded_stats = current
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, origin=None, **kwargs):
+    # Deleting the product deletes its stats row too; writing one now would
+    # only make the product's own delete fail
+    if isinstance(origin, Product) or getattr(origin, 'model', None) is Product:
+        return
+    refresh_product_stats([instance.product_id])
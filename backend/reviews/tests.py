@@ -1,3 +1,216 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from nextshopsphere.querybudget import query_budget
+from orders.models import Order, OrderItem
+from orders.transitions import transition
+from products.models import Category, Product
+
+from .models import ProductReviewStats, Review, ReviewVote
+
+
+def make_product(slug):
+    category, _ = Category.objects.get_or_create(name='Phones', slug='phones')
+    return Product.objects.create(
+        name=slug.title(), slug=slug, description='-', price=Decimal('10.00'), sku=slug.upper(), category=category,
+    )
+
+
+def make_user(n):
+    return User.objects.create_user(email=f'user{n}@example.com', username=f'user{n}')
+
+
+# ============ QUERY BUDGETS ============
+
+class ReviewQueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.products = [make_product(f'phone-{i}') for i in range(3)]
+        for n in range(10):
+            user = make_user(n)
+            for product in cls.products:
+                Review.objects.create(user=user, product=product, rating=n % 5 + 1, title='t', comment='c')
+
+    def setUp(self):
+        cache.clear()
+
+    def assertWithinBudget(self, view_name, path):
+        with query_budget(settings.QUERY_BUDGETS[view_name]):
+            response = self.client.get(path, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_review_list(self):
+        response = self.assertWithinBudget('review-list', '/api/reviews/?product=phone-0')
+        self.assertEqual(response.json()['count'], 10)
+
+    def test_product_stats(self):
+        response = self.assertWithinBudget('review-product-stats', '/api/reviews/product/phone-0/stats/')
+        self.assertEqual(response.json()['total_reviews'], 10)
+
+    def test_batch_stats(self):
+        self.assertWithinBudget('review-batch-stats', '/api/reviews/stats/?products=phone-0,phone-1,phone-2')
+
+
+# ============ STATS MAINTENANCE ============
+
+class ReviewStatsSignalTests(TestCase):
+    def setUp(self):
+        self.product = make_product('tablet')
+        self.users = [make_user(n) for n in range(3)]
+        for n, user in enumerate(self.users):
+            Review.objects.create(user=user, product=self.product, rating=n + 3, title='t', comment='c')
+
+    def stats(self):
+        return ProductReviewStats.objects.get(product=self.product)
+
+    def test_save_and_edit_refresh_stats(self):
+        self.assertEqual(self.stats().review_count, 3)
+        review = Review.objects.get(user=self.users[0])
+        review.rating = 5
+        review.save()
+        self.assertEqual(self.stats().count_5, 2)
+
+    def test_queryset_delete_refreshes_stats(self):
+        Review.objects.filter(rating__gte=4).delete()
+        stats = self.stats()
+        self.assertEqual(stats.review_count, 1)
+        self.assertEqual(stats.rating_sum, 3)
+
+    def test_cascade_from_user_refreshes_stats(self):
+        self.users[2].delete()
+        self.assertEqual(self.stats().review_count, 2)
+
+    def test_deleting_the_product_removes_its_stats(self):
+        self.product.delete()
+        self.assertFalse(ProductReviewStats.objects.exists())
+
+
+# ============ VERIFIED PURCHASES ============
+
+class VerifiedPurchaseTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.product = make_product('laptop')
+        self.user = make_user(1)
+        self.order = Order.objects.create(
+            user=self.user, status='shipped', shipping_address='1 Main St', shipping_city='Springfield',
+            shipping_country='US', shipping_phone='555-0100',
+        )
+        OrderItem.objects.create(
+            order=self.order, product=self.product, product_name='Laptop', product_slug='laptop',
+            product_price=Decimal('10.00'), quantity=1,
+        )
+
+    def review(self):
+        return Review.objects.create(user=self.user, product=self.product, rating=5, title='t', comment='c')
+
+    def test_review_after_delivery_is_verified(self):
+        self.assertFalse(self.review().is_verified_purchase)  # caches the empty set
+        Review.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            transition(self.order, status='delivered')
+        self.assertTrue(self.review().is_verified_purchase)
+
+    def test_existing_review_is_flagged_on_delivery(self):
+        review = self.review()
+        with self.captureOnCommitCallbacks(execute=True):
+            transition(self.order, status='delivered')
+        review.refresh_from_db()
+        self.assertTrue(review.is_verified_purchase)
+
+    def test_cache_is_dropped_on_commit(self):
+        self.review().delete()  # caches the empty set
+        with self.captureOnCommitCallbacks() as callbacks:
+            transition(self.order, status='delivered')
+        self.assertEqual(cache.get(f'purchased-products:{self.user.pk}'), frozenset())
+        for callback in callbacks:
+            callback()
+        self.assertIsNone(cache.get(f'purchased-products:{self.user.pk}'))
+
+    def test_forced_move_out_of_delivered(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            transition(self.order, status='delivered')
+        self.review().delete()  # caches the delivered set
+        with self.captureOnCommitCallbacks(execute=True):
+            transition(self.order, status='cancelled', force=True)
+        self.assertFalse(self.review().is_verified_purchase)
+
+
+# ============ MODERATION ============
+
+class ReviewModerationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = make_product('camera')
+        cls.reviews = [
+            Review.objects.create(user=make_user(n), product=cls.product, rating=5, title='t', comment='c')
+            for n in range(3)
+        ]
+        cls.admin = User.objects.create_user(email='admin@example.com', username='admin', is_staff=True)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def moderate(self, ids, action):
+        return self.client.post('/api/reviews/moderate/', {'ids': ids, 'action': action}, format='json', secure=True)
+
+    def test_reject_then_approve(self):
+        self.client.force_authenticate(self.admin)
+        ids = [review.pk for review in self.reviews[:2]]
+
+        response = self.moderate(ids, 'reject')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'updated': 2, 'products_refreshed': 1})
+        self.assertEqual(Review.objects.filter(is_approved=False).count(), 2)
+        self.assertEqual(ProductReviewStats.objects.get(product=self.product).review_count, 1)
+
+        # Already approved reviews aren't touched again
+        response = self.moderate([review.pk for review in self.reviews], 'approve')
+        self.assertEqual(response.json(), {'updated': 2, 'products_refreshed': 1})
+        self.assertEqual(ProductReviewStats.objects.get(product=self.product).review_count, 3)
+
+    def test_admin_only(self):
+        self.client.force_authenticate(self.reviews[0].user)
+        self.assertEqual(self.moderate([self.reviews[0].pk], 'reject').status_code, 403)
+        self.assertTrue(Review.objects.get(pk=self.reviews[0].pk).is_approved)
+
+
+# ============ HELPFUL VOTES ============
+
+class HelpfulVoteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.review = Review.objects.create(
+            user=make_user(1), product=make_product('speaker'), rating=4, title='t', comment='c',
+        )
+        cls.voter = make_user(2)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.voter)
+
+    def vote(self):
+        return self.client.post(f'/api/reviews/{self.review.pk}/helpful/', secure=True).json()
+
+    def test_count_is_read_back(self):
+        create_vote = ReviewVote.objects.create
+
+        def concurrent_vote(**kwargs):
+            # Someone else's vote lands after the view loaded the review
+            Review.objects.filter(pk=self.review.pk).update(helpful_count=F('helpful_count') + 1)
+            return create_vote(**kwargs)
+
+        with mock.patch.object(ReviewVote.objects, 'create', side_effect=concurrent_vote):
+            self.assertEqual(self.vote(), {'helpful_count': 2, 'voted': True})
 
-# Create your tests here.
+    def test_second_vote_is_ignored(self):
+        self.assertEqual(self.vote(), {'helpful_count': 1, 'voted': True})
+        self.assertEqual(self.vote(), {'helpful_count': 1, 'voted': False})
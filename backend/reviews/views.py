@@ -1,11 +1,31 @@
+import hashlib
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Avg, Count
-from drf_spectacular.utils import extend_schema, extend_schema_view
-from .models import Review
-from .serializers import ReviewSerializer, CreateReviewSerializer, ProductReviewStatsSerializer
-from products.models import Product
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
+from .aggregates import set_approval, stats_for_slugs
+from .models import Review, ReviewVote
+from .serializers import (
+    ReviewSerializer, CreateReviewSerializer, ProductReviewStatsSerializer, ReviewModerationSerializer,
+)
+from products.cache import product_id_for_slug
+from nextshopsphere.routers import ReplicaReadMixin
+
+# ?sort= modes, each backed by a (product, is_approved, ...) index
+REVIEW_SORTS = {
+    'newest': ['-created_at', '-id'],
+    'rating': ['-rating', '-created_at', '-id'],
+    'helpful': ['-helpful_count', '-created_at', '-id'],
+}
+
+# Only the user columns the review serializer reads
+REVIEW_USER_FIELDS = [
+    'user__id', 'user__email', 'user__username', 'user__first_name', 'user__last_name', 'user__avatar',
+]
 
 
 @extend_schema_view(
@@ -15,24 +35,38 @@ from products.models import Product
     update=extend_schema(tags=['Reviews']),
     destroy=extend_schema(tags=['Reviews']),
 )
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """ViewSet for product reviews"""
 
     serializer_class = ReviewSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    replica_actions = ('list', 'retrieve', 'product_stats', 'batch_stats')
 
     def get_queryset(self):
         """Filter reviews by product if specified"""
-        queryset = Review.objects.filter(is_approved=True).select_related('user')
+        review_fields = [f.name for f in Review._meta.concrete_fields]
+        queryset = (
+            Review.objects.filter(is_approved=True)
+            .select_related('user')
+            .only(*review_fields, *REVIEW_USER_FIELDS)
+        )
 
         product_slug = self.request.query_params.get('product', None)
         if product_slug:
-            queryset = queryset.filter(product__slug=product_slug)
+            # Resolved from cache so the list query filters on product_id, no join
+            product_id = product_id_for_slug(product_slug)
+            if product_id is None:
+                return queryset.none()
+            queryset = queryset.filter(product_id=product_id)
 
         product_id = self.request.query_params.get('product_id', None)
         if product_id:
             queryset = queryset.filter(product_id=product_id)
 
+        sort = self.request.query_params.get('sort')
+        if sort in REVIEW_SORTS:
+            queryset = queryset.order_by(*REVIEW_SORTS[sort])
+
         return queryset
 
     def get_serializer_class(self):
@@ -83,37 +117,94 @@ class ReviewViewSet(viewsets.ModelViewSet):
         serializer = ReviewSerializer(reviews, many=True, context={'request': request})
         return Response(serializer.data)
 
-    @extend_schema(tags=['Reviews'])
+    @extend_schema(tags=['Reviews'], request=None)
+    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
+    def helpful(self, request, pk=None):
+        """Mark a review as helpful (once per user)"""
+        review = self.get_object()
+        if review.user_id == request.user.id:
+            return Response(
+                {'detail': 'You cannot vote on your own review'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            with transaction.atomic():
+                ReviewVote.objects.create(review=review, user=request.user)
+                Review.objects.filter(pk=review.pk).update(helpful_count=F('helpful_count') + 1)
+            voted = True
+        except IntegrityError:
+            voted = False
+
+        # Concurrent votes also moved the counter: read it back
+        review.refresh_from_db(fields=['helpful_count'])
+        return Response({'helpful_count': review.helpful_count, 'voted': voted})
+
+    @extend_schema(tags=['Reviews'], request=ReviewModerationSerializer)
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAdminUser])
+    def moderate(self, request):
+        """Approve or reject many reviews at once (admin only)"""
+        serializer = ReviewModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        approved = serializer.validated_data['action'] == 'approve'
+        updated, products = set_approval(serializer.validated_data['ids'], approved)
+
+        return Response({
+            'updated': updated,
+            'products_refreshed': products,
+        })
+
+    def stats_response(self, request, payload, versions):
+        """Response with an ETag derived from the stats versions, or a 304 if unchanged"""
+        etag = '"{}"'.format(hashlib.md5(','.join(versions).encode()).hexdigest())
+        if etag in request.headers.get('If-None-Match', ''):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(payload)
+        response['ETag'] = etag
+        response['Cache-Control'] = f'public, max-age={settings.REVIEW_STATS_MAX_AGE}'
+        return response
+
+    @extend_schema(tags=['Reviews'], responses=ProductReviewStatsSerializer)
     @action(detail=False, methods=['get'], url_path='product/(?P<product_slug>[^/.]+)/stats')
     def product_stats(self, request, product_slug=None):
         """Get review statistics for a product"""
-        try:
-            product = Product.objects.get(slug=product_slug)
-        except Product.DoesNotExist:
+        stats = stats_for_slugs([product_slug]).get(product_slug)
+        if stats is None:
             return Response(
                 {'detail': 'Product not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        reviews = Review.objects.filter(product=product, is_approved=True)
-
-        # Calculate stats
-        stats = reviews.aggregate(
-            average_rating=Avg('rating'),
-            total_reviews=Count('id')
-        )
-
-        # Rating distribution
-        distribution = {}
-        for i in range(1, 6):
-            count = reviews.filter(rating=i).count()
-            distribution[str(i)] = count
+        payload, version = stats
+        return self.stats_response(request, payload, [version])
+
+    @extend_schema(
+        tags=['Reviews'],
+        parameters=[OpenApiParameter('products', str, description="Comma-separated product slugs")],
+    )
+    @action(detail=False, methods=['get'], url_path='stats')
+    def batch_stats(self, request):
+        """Get review statistics for many products: ?products=a,b,c"""
+        slugs = list(dict.fromkeys(
+            slug.strip() for slug in request.query_params.get('products', '').split(',') if slug.strip()
+        ))
+        if not slugs:
+            return Response(
+                {'detail': 'products parameter is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(slugs) > settings.REVIEW_STATS_BATCH_LIMIT:
+            return Response(
+                {'detail': f'At most {settings.REVIEW_STATS_BATCH_LIMIT} products per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        return Response({
-            'average_rating': round(stats['average_rating'] or 0, 1),
-            'total_reviews': stats['total_reviews'],
-            'rating_distribution': distribution
-        })
+        stats = stats_for_slugs(slugs)
+        payload = {slug: stats[slug][0] for slug in slugs if slug in stats}
+        versions = [f"{slug}:{stats[slug][1]}" for slug in slugs if slug in stats]
+        return self.stats_response(request, payload, versions)
 
     @extend_schema(tags=['Reviews'])
     @action(detail=False, methods=['get'], url_path='check/(?P<product_id>[^/.]+)')
@@ -0,0 +1,54 @@
+# wishlist/cache.py
+"""
+Per-user wishlist product id sets.
+
+Product grids need "is this in my wishlist?" for every card. The full set of
+a user's wishlisted product ids is small, so it is cached and answered from
+memory; every write path (toggle, create, destroy, clear, bulk) invalidates it
+once the write has committed, so a concurrent read can't re-cache the old set.
+
+Without a shared cache (settings.SHARED_CACHE) each worker keeps its own copy
+and only sees its own invalidations, so entries there live only briefly.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+WISHLIST_CACHE_TIMEOUT = 60 * 30
+LOCAL_CACHE_TIMEOUT = 30
+
+
+def _cache_key(user_id):
+    return f"wishlist-ids:{user_id}"
+
+
+def wishlist_product_ids(user_id):
+    """frozenset of product ids in the user's wishlist (one query on a miss)"""
+    key = _cache_key(user_id)
+    product_ids = cache.get(key)
+    if product_ids is None:
+        from .models import WishlistItem
+        product_ids = frozenset(
+            WishlistItem.objects.filter(user_id=user_id).values_list('product_id', flat=True)
+        )
+        timeout = WISHLIST_CACHE_TIMEOUT if settings.SHARED_CACHE else LOCAL_CACHE_TIMEOUT
+        cache.set(key, product_ids, timeout)
+    return product_ids
+
+
+def invalidate_wishlist(user_id):
+    """Drop the cached set after the current transaction commits (immediately outside one)"""
+    key = _cache_key(user_id)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def parse_product_ids(raw, limit=None):
+    """'1,2,3' -> [1, 2, 3], ignoring blanks and non-numeric values"""
+    ids = []
+    for part in (raw or '').split(','):
+        part = part.strip()
+        if part.isdigit():
+            ids.append(int(part))
+    ids = list(dict.fromkeys(ids))
+    return ids[:limit] if limit else ids
@@ -3,10 +3,25 @@ from .models import WishlistItem
 from products.serializers import ProductListSerializer
 
 
+def wishlist_queryset(user):
+    """Wishlist items with everything the listing serializer reads loaded up front"""
+    return (
+        WishlistItem.objects.filter(user=user)
+        .select_related('product', 'product__category', 'product__brand', 'product__review_stats')
+    )
+
+
+class WishlistProductSerializer(ProductListSerializer):
+    """ProductListSerializer fed from select_related data (no per-row queries)"""
+
+    def get_in_wishlist(self, obj):
+        return True
+
+
 class WishlistItemSerializer(serializers.ModelSerializer):
     """Serializer for wishlist items with product details"""
 
-    product_details = ProductListSerializer(source='product', read_only=True)
+    product_details = WishlistProductSerializer(source='product', read_only=True)
 
     class Meta:
         model = WishlistItem
@@ -29,4 +44,14 @@ class AddToWishlistSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
-        return super().create(validated_data)
\ No newline at end of file
+        return super().create(validated_data)
+
+
+class BulkWishlistSerializer(serializers.Serializer):
+    """Product ids for bulk add/remove"""
+
+    products = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=500,
+    )
\ No newline at end of file
@@ -1,3 +1,142 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from nextshopsphere.querybudget import query_budget
+from products.models import Brand, Category, Product
+
+from .models import WishlistItem
+
+
+# ============ QUERY BUDGETS ============
+
+class WishlistQueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='shopper@example.com', username='shopper')
+        brand = Brand.objects.create(name='Acme', slug='acme')
+        categories = [Category.objects.create(name=f'Cat {i}', slug=f'cat-{i}') for i in range(3)]
+        cls.products = [
+            Product.objects.create(
+                name=f'Product {i}', slug=f'product-{i}', description='-', price=Decimal('5.00'),
+                sku=f'SKU-{i}', category=categories[i % 3], brand=brand,
+            )
+            for i in range(10)
+        ]
+        WishlistItem.objects.bulk_create(WishlistItem(user=cls.user, product=p) for p in cls.products)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertWithinBudget(self, view_name, path):
+        with query_budget(settings.QUERY_BUDGETS[view_name]):
+            response = self.client.get(path, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_wishlist_list(self):
+        response = self.assertWithinBudget('wishlist-list', '/api/wishlist/')
+        self.assertEqual(response.json()['count'], 10)
+
+    def test_check(self):
+        response = self.assertWithinBudget('wishlist-check', f'/api/wishlist/check/{self.products[0].id}/')
+        self.assertTrue(response.json()['in_wishlist'])
+
+    def test_check_many(self):
+        ids = ','.join(str(p.id) for p in self.products[:5])
+        response = self.assertWithinBudget('wishlist-check-many', f'/api/wishlist/check/?products={ids}')
+        self.assertEqual(len(response.json()['in_wishlist']), 5)
+
+
+# ============ CACHE INVALIDATION ============
+
+class WishlistCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Phones', slug='phones')
+        cls.product = Product.objects.create(
+            name='Phone', slug='phone', description='-', price=Decimal('10.00'), sku='PHONE-1', category=category,
+        )
+        cls.user = User.objects.create_user(email='user@example.com', username='user')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def in_wishlist(self):
+        response = self.client.get(f'/api/wishlist/check/{self.product.id}/', secure=True)
+        return response.data['in_wishlist']
+
+    def test_toggle_invalidates_after_commit(self):
+        self.assertFalse(self.in_wishlist())
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(f'/api/wishlist/toggle/{self.product.id}/', secure=True)
+        self.assertEqual(response.data['action'], 'added')
+        # Still cached until the write commits
+        self.assertFalse(self.in_wishlist())
+        for callback in callbacks:
+            callback()
+        self.assertTrue(self.in_wishlist())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/wishlist/toggle/{self.product.id}/', secure=True)
+        self.assertFalse(self.in_wishlist())
+
+
+# ============ BULK ============
+
+class WishlistBulkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Phones', slug='phones')
+        cls.products = [
+            Product.objects.create(
+                name=f'Phone {i}', slug=f'phone-{i}', description='-', price=Decimal('10.00'), sku=f'PHONE-{i}',
+                category=category,
+            )
+            for i in range(3)
+        ]
+        cls.user = User.objects.create_user(email='user@example.com', username='user')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, action, product_ids):
+        return self.client.post(f'/api/wishlist/{action}/', {'products': product_ids}, format='json', secure=True)
+
+    def test_bulk_add_skips_saved_products(self):
+        ids = [p.id for p in self.products]
+        self.post('bulk_add', ids[:1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post('bulk_add', ids + [999999])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, {'added': 2, 'not_found': [999999]})
+        self.assertEqual(WishlistItem.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(self.client.get('/api/wishlist/ids/', secure=True).data['product_ids'], sorted(ids))
+
+    def test_bulk_add_ignores_a_stale_cache(self):
+        self.client.get('/api/wishlist/ids/', secure=True)  # caches the empty set
+        WishlistItem.objects.create(user=self.user, product=self.products[0])  # e.g. from another worker
+
+        response = self.post('bulk_add', [self.products[0].id])
+        self.assertEqual(response.data['added'], 0)
+
+    def test_bulk_remove(self):
+        WishlistItem.objects.bulk_create(WishlistItem(user=self.user, product=p) for p in self.products[:2])
+        self.client.get('/api/wishlist/ids/', secure=True)
 
-# Create your tests here.
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post('bulk_remove', [p.id for p in self.products])
+        self.assertEqual(response.data, {'removed': 2})
+        self.assertEqual(self.client.get('/api/wishlist/ids/', secure=True).data['product_ids'], [])
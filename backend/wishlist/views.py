@@ -3,11 +3,25 @@ from django.shortcuts import render
 # Create your views here.
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
-from drf_spectacular.utils import extend_schema, extend_schema_view
+from django.conf import settings
+from django.db import transaction
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
+from .cache import invalidate_wishlist, parse_product_ids, wishlist_product_ids
 from .models import WishlistItem
-from .serializers import WishlistItemSerializer, AddToWishlistSerializer
+from .serializers import (
+    WishlistItemSerializer, AddToWishlistSerializer, BulkWishlistSerializer,
+    wishlist_queryset,
+)
 from products.models import Product
+from products.serializers import listing_context
+
+
+class WishlistPagination(PageNumberPagination):
+    page_size = 12
+    page_size_query_param = 'page_size'
+    max_page_size = 100
 
 
 @extend_schema_view(
@@ -21,11 +35,27 @@ class WishlistViewSet(viewsets.ModelViewSet):
     serializer_class = WishlistItemSerializer
     permission_classes = [permissions.IsAuthenticated]
     http_method_names = ['get', 'post', 'delete']
+    pagination_class = WishlistPagination
 
     def get_queryset(self):
         """Return only current user's wishlist"""
+        if self.action in ('list', 'retrieve'):
+            return wishlist_queryset(self.request.user)
         return WishlistItem.objects.filter(user=self.request.user)
 
+    def list(self, request, *args, **kwargs):
+        """Paginated wishlist with products, categories, brands and images in constant queries"""
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        items = page if page is not None else list(queryset)
+
+        context = {**self.get_serializer_context(), **listing_context(item.product for item in items)}
+        data = WishlistItemSerializer(items, many=True, context=context).data
+
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
     def get_serializer_class(self):
         if self.action == 'create':
             return AddToWishlistSerializer
@@ -37,6 +67,7 @@ class WishlistViewSet(viewsets.ModelViewSet):
 
         if serializer.is_valid():
             item = serializer.save()
+            invalidate_wishlist(request.user.id)
             return Response(
                 WishlistItemSerializer(item).data,
                 status=status.HTTP_201_CREATED
@@ -44,6 +75,10 @@ class WishlistViewSet(viewsets.ModelViewSet):
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def perform_destroy(self, instance):
+        instance.delete()
+        invalidate_wishlist(self.request.user.id)
+
     @extend_schema(tags=['Wishlist'])
     @action(detail=False, methods=['post'], url_path='toggle/(?P<product_id>[^/.]+)')
     def toggle(self, request, product_id=None):
@@ -63,12 +98,14 @@ class WishlistViewSet(viewsets.ModelViewSet):
 
         if wishlist_item:
             wishlist_item.delete()
+            invalidate_wishlist(request.user.id)
             return Response({
                 'action': 'removed',
                 'message': 'Product removed from wishlist'
             })
         else:
             item = WishlistItem.objects.create(user=request.user, product=product)
+            invalidate_wishlist(request.user.id)
             return Response({
                 'action': 'added',
                 'message': 'Product added to wishlist',
@@ -79,18 +116,77 @@ class WishlistViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], url_path='check/(?P<product_id>[^/.]+)')
     def check(self, request, product_id=None):
         """Check if product is in user's wishlist"""
-        is_in_wishlist = WishlistItem.objects.filter(
+        try:
+            product_id = int(product_id)
+        except (TypeError, ValueError):
+            return Response({'in_wishlist': False})
+
+        return Response({'in_wishlist': product_id in wishlist_product_ids(request.user.id)})
+
+    @extend_schema(
+        tags=['Wishlist'],
+        parameters=[OpenApiParameter('products', str, description="Comma-separated product ids")],
+    )
+    @action(detail=False, methods=['get'], url_path='check')
+    def check_many(self, request):
+        """Check many products at once: ?products=1,2,3 -> ids that are in the wishlist"""
+        product_ids = parse_product_ids(request.query_params.get('products'), settings.WISHLIST_CHECK_LIMIT)
+        members = wishlist_product_ids(request.user.id)
+        return Response({'in_wishlist': [pid for pid in product_ids if pid in members]})
+
+    @extend_schema(tags=['Wishlist'])
+    @action(detail=False, methods=['get'])
+    def ids(self, request):
+        """All product ids in the user's wishlist (for client-side badges)"""
+        return Response({'product_ids': sorted(wishlist_product_ids(request.user.id))})
+
+    @extend_schema(tags=['Wishlist'], request=BulkWishlistSerializer)
+    @action(detail=False, methods=['post'])
+    def bulk_add(self, request):
+        """Add many products in one insert; ones already saved are skipped"""
+        serializer = BulkWishlistSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        requested = serializer.validated_data['products']
+
+        product_ids = set(Product.objects.filter(id__in=requested).values_list('id', flat=True))
+        with transaction.atomic():
+            # Not the cached set: it may be stale, and "added" must match what was written
+            existing = set(
+                WishlistItem.objects.filter(user=request.user, product_id__in=product_ids)
+                .values_list('product_id', flat=True)
+            )
+            WishlistItem.objects.bulk_create(
+                [WishlistItem(user=request.user, product_id=pid) for pid in product_ids - existing],
+                ignore_conflicts=True,
+            )
+            invalidate_wishlist(request.user.id)
+
+        return Response({
+            'added': len(product_ids - existing),
+            'not_found': sorted(set(requested) - product_ids),
+        }, status=status.HTTP_201_CREATED)
+
+    @extend_schema(tags=['Wishlist'], request=BulkWishlistSerializer)
+    @action(detail=False, methods=['post'])
+    def bulk_remove(self, request):
+        """Remove many products with a single delete"""
+        serializer = BulkWishlistSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        count = WishlistItem.objects.filter(
             user=request.user,
-            product_id=product_id
-        ).exists()
+            product_id__in=serializer.validated_data['products']
+        ).delete()[0]
+        invalidate_wishlist(request.user.id)
 
-        return Response({'in_wishlist': is_in_wishlist})
+        return Response({'removed': count})
 
     @extend_schema(tags=['Wishlist'])
     @action(detail=False, methods=['delete'])
     def clear(self, request):
         """Clear entire wishlist"""
         count = WishlistItem.objects.filter(user=request.user).delete()[0]
+        invalidate_wishlist(request.user.id)
         return Response({
             'message': f'Removed {count} items from wishlist'
         })
\ No newline at end of file
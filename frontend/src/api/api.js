@@ -144,6 +144,7 @@ export const wishlistAPI = {
     remove: (id) => api.delete(`/wishlist/${id}/`),
     toggle: (productId) => api.post(`/wishlist/toggle/${productId}/`),
     check: (productId) => api.get(`/wishlist/check/${productId}/`),
+    checkMany: (productIds) => api.get('/wishlist/check/', { params: { products: productIds.join(',') } }),
     clear: () => api.delete('/wishlist/clear/'),
 };
 
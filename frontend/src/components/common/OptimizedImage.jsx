@@ -10,7 +10,9 @@ const OptimizedImage = ({
                             width = 400,
                             height = 400,
                             quality = 'auto',
-                            format = 'auto'
+                            format = 'auto',
+                            srcSet = null,
+                            sizes = '(min-width: 1024px) 25vw, (min-width: 640px) 33vw, 50vw'
                         }) => {
     const [isLoaded, setIsLoaded] = useState(false);
     const [isInView, setIsInView] = useState(false);
@@ -81,6 +83,11 @@ const OptimizedImage = ({
     const optimizedSrc = getOptimizedUrl(src);
     const placeholderSrc = getPlaceholderUrl(src);
 
+    // Server-generated derivatives ({avif: "url 320w, ...", webp: ...}), best format first
+    const sources = srcSet
+        ? ['avif', 'webp', 'jpeg'].filter((type) => srcSet[type])
+        : [];
+
     return (
         <div ref={imgRef} className={`relative overflow-hidden ${placeholderClassName}`}>
             {/* Blur placeholder */}
@@ -100,20 +107,30 @@ const OptimizedImage = ({
 
             {/* Main image - only load when in view */}
             {isInView && !hasError && (
-                <img
-                    src={optimizedSrc}
-                    alt={alt}
-                    loading="lazy"
-                    decoding="async"
-                    onLoad={() => setIsLoaded(true)}
-                    onError={() => {
-                        setHasError(true);
-                        setIsLoaded(true);
-                    }}
-                    className={`${className} transition-opacity duration-300 ${
-                        isLoaded ? 'opacity-100' : 'opacity-0'
-                    }`}
-                />
+                <picture className="contents">
+                    {sources.map((type) => (
+                        <source
+                            key={type}
+                            type={`image/${type}`}
+                            srcSet={srcSet[type]}
+                            sizes={sizes}
+                        />
+                    ))}
+                    <img
+                        src={optimizedSrc}
+                        alt={alt}
+                        loading="lazy"
+                        decoding="async"
+                        onLoad={() => setIsLoaded(true)}
+                        onError={() => {
+                            setHasError(true);
+                            setIsLoaded(true);
+                        }}
+                        className={`${className} transition-opacity duration-300 ${
+                            isLoaded ? 'opacity-100' : 'opacity-0'
+                        }`}
+                    />
+                </picture>
             )}
 
             {/* Error fallback */}
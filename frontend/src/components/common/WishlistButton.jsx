@@ -5,10 +5,10 @@ import { HiHeart, HiOutlineHeart } from 'react-icons/hi';
 import { wishlistAPI } from '../../api/api';
 import toast from 'react-hot-toast';
 
-const WishlistButton = ({ productId, size = 'md', showText = false }) => {
+const WishlistButton = ({ productId, inWishlist, size = 'md', showText = false }) => {
     const { isAuthenticated } = useSelector((state) => state.auth);
     const navigate = useNavigate();
-    const [isWishlisted, setIsWishlisted] = useState(false);
+    const [isWishlisted, setIsWishlisted] = useState(Boolean(inWishlist));
     const [isLoading, setIsLoading] = useState(false);
 
     const sizes = {
@@ -18,10 +18,13 @@ const WishlistButton = ({ productId, size = 'md', showText = false }) => {
     };
 
     useEffect(() => {
-        if (isAuthenticated && productId) {
+        // Product list responses already carry in_wishlist; only ask the API when it's missing
+        if (inWishlist !== undefined) {
+            setIsWishlisted(Boolean(inWishlist));
+        } else if (isAuthenticated && productId) {
             checkWishlist();
         }
-    }, [isAuthenticated, productId]);
+    }, [isAuthenticated, productId, inWishlist]);
 
     const checkWishlist = async () => {
         try {
@@ -49,6 +49,7 @@ const ProductCard = memo(({ product }) => {
                 {/* Optimized Product Image */}
                 <OptimizedImage
                     src={imageUrl}
+                    srcSet={product.primary_image?.srcset}
                     alt={product.name}
                     className="w-full h-full object-cover transition-transform duration-500 sm:group-hover:scale-105"
                     placeholderClassName="w-full h-full"
@@ -82,7 +83,7 @@ const ProductCard = memo(({ product }) => {
                 {/* Wishlist Button - Top Right */}
                 <div className="absolute top-2 sm:top-3 right-2 sm:right-3 opacity-100 sm:opacity-0 sm:group-hover:opacity-100 transition-opacity duration-300 z-10">
                     <div className="bg-white/90 backdrop-blur-sm rounded-full p-1 sm:p-1.5 shadow-md border border-gray-100 sm:border-2">
-                        <WishlistButton productId={product.id} size="sm" />
+                        <WishlistButton productId={product.id} inWishlist={product.in_wishlist} size="sm" />
                     </div>
                 </div>
 
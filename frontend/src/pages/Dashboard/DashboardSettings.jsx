@@ -19,7 +19,7 @@ import {
 } from 'react-icons/hi';
 import { useTheme } from '../../context/ThemeContext';
 import { authAPI } from '../../api/api';
-import { loadUser } from '../../store/authSlice';
+import { loadUser, waitForAvatar } from '../../store/authSlice';
 import toast from 'react-hot-toast';
 
 const DashboardSettings = () => {
@@ -184,9 +184,19 @@ const DashboardSettings = () => {
         formData.append('avatar', file);
 
         try {
-            await authAPI.updateProfilePicture(formData);
-            await dispatch(loadUser());
-            toast.success('Profile picture updated successfully!');
+            const response = await authAPI.updateProfilePicture(formData);
+            if (response.data?.avatar_status === 'processing') {
+                // The upload finishes in the background; pick the new avatar up when it lands
+                toast.success('Profile picture uploaded - it will appear in a moment');
+                dispatch(waitForAvatar()).then(({ payload }) => {
+                    if (payload?.avatar_status === 'failed') {
+                        toast.error(payload.avatar_error || 'Profile picture upload failed');
+                    }
+                });
+            } else {
+                await dispatch(loadUser());
+                toast.success('Profile picture updated successfully!');
+            }
             setShowAvatarModal(false);
             setPreviewImage(null);
         } catch (error) {
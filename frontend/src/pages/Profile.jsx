@@ -8,7 +8,7 @@ import {
     HiUpload, HiHome
 } from 'react-icons/hi';
 import { authAPI } from '../api/api';
-import { loadUser } from '../store/authSlice';
+import { loadUser, waitForAvatar } from '../store/authSlice';
 import toast from 'react-hot-toast';
 import Loader from '../components/common/Loader';
 
@@ -136,9 +136,19 @@ const Profile = () => {
         formData.append('avatar', fileInputRef.current.files[0]);
 
         try {
-            await authAPI.updateProfilePicture(formData);
-            await dispatch(loadUser());
-            toast.success('Profile picture updated!');
+            const response = await authAPI.updateProfilePicture(formData);
+            if (response.data?.avatar_status === 'processing') {
+                // The upload finishes in the background; pick the new avatar up when it lands
+                toast.success('Profile picture uploaded - it will appear in a moment');
+                dispatch(waitForAvatar()).then(({ payload }) => {
+                    if (payload?.avatar_status === 'failed') {
+                        toast.error(payload.avatar_error || 'Profile picture upload failed');
+                    }
+                });
+            } else {
+                await dispatch(loadUser());
+                toast.success('Profile picture updated!');
+            }
             setShowAvatarModal(false);
             setPreviewImage(null);
         } catch (error) {
@@ -60,6 +60,19 @@ export const loadUser = createAsyncThunk(
     }
 );
 
+// Avatar uploads are stored by the backend worker; reload the profile until it's done
+export const waitForAvatar = createAsyncThunk(
+    'auth/waitForAvatar',
+    async (_, { dispatch }) => {
+        for (let attempt = 0; attempt < 20; attempt++) {
+            await new Promise((resolve) => setTimeout(resolve, 3000));
+            const { payload } = await dispatch(loadUser());
+            if (payload?.avatar_status !== 'processing') return payload;
+        }
+        return null;
+    }
+);
+
 const authSlice = createSlice({
     name: 'auth',
     initialState: {